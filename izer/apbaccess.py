@@ -95,6 +95,7 @@ class APB():
         self.rollover = 0
 
         self.data_mem = self.kernel_mem = self.output_data_mem = None
+        self.emulator = None  # Optional emulator.Emulator that records writes and expectations
 
         if state.rtl_preload_weights or state.new_kernel_loader:
             if not state.compact_weights:
@@ -381,6 +382,8 @@ class APB():
         """
         Verify that memory at address `addr` contains data `val`.
         """
+        if self.emulator is not None:
+            self.emulator.expect(addr, val, mask, num_bytes, first_proc)
         return self.verify(
             addr,
             val,
@@ -1001,6 +1004,8 @@ class APBBlockLevel(APB):
         """
         assert val >= 0
         assert addr >= 0
+        if self.emulator is not None and fifo is None and base is None:
+            self.emulator.write(addr, val)
         if base is None:
             addr += state.apb_base
 
@@ -1151,6 +1156,9 @@ class APBTopLevel(APB):
         `verify_writes` is globally enabled.
         An optional `comment` can be added to the output.
         """
+        if self.emulator is not None and fifo is None and base is None \
+           and not isinstance(val, str):
+            self.emulator.write(addr, val)
         if not isinstance(val, str):
             assert val >= 0
             val = f'0x{val:08x}'
@@ -1221,6 +1229,8 @@ class APBTopLevel(APB):
         in RTL simulation. For normal cases, it is equivalent to `write()`.
         """
         if self.data_mem is not None and fifo is None:
+            if self.emulator is not None:
+                self.emulator.write(addr, val)
             group, proc, mem, offs = tc.dev.datainstance_from_addr(addr)
             self.data_mem[group][proc][mem].append((offs, f'{val:08x}'))
             return
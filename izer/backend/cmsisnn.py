@@ -13,7 +13,7 @@ from typing import Any, List
 
 import numpy as np
 
-from izer import assets, op, state, stats, toplevel
+from izer import assets, logwriter, op, state, stats, toplevel
 from izer import tornadocnn as tc
 from izer.eprint import eprint, wprint
 from izer.simulate import (conv1d_layer, conv2d_layer, convtranspose2d_layer, eltwise_layer,
@@ -130,10 +130,8 @@ class Backend(backend.Backend):
         # Redirect stdout?
         if log:
             state.output_is_console = False
-            sys.stdout = open(
+            sys.stdout = logwriter.open_log(
                 os.path.join(base_directory, test_name, log_filename),
-                mode='w',
-                encoding='utf-8',
             )
             print(f'{" ".join(str(x) for x in sys.argv)}')
             assert tc.dev is not None
@@ -7,6 +7,8 @@
 """
 Backend for MAX7800X embedded code generation and RTL simulations
 """
+import collections
+import concurrent.futures
 import copy
 import hashlib
 import os
@@ -16,12 +18,13 @@ from typing import List, Tuple
 import numpy as np
 
 from izer import (apbaccess, assets, compute, console, datamem, kbias, kdedup, kernels, latency,
-                  load, op, rtlsim, state, stats)
+                  emulator, load, logwriter, op, rtlsim, schedule, simcache, state, stats,
+                  stream, tensorfile)
 from izer import tornadocnn as tc
 from izer.eprint import eprint, nprint, wprint
 from izer.names import layer_pfx, layer_str
 from izer.simulate import (conv1d_layer, conv2d_layer, convtranspose2d_layer, eltwise_layer,
-                           passthrough_layer, pooling_layer, print_data, show_data)
+                           passthrough_layer, pooling_layer, print_data, save_data, show_data)
 from izer.utils import ffs, fls, overlap, plural, popcount
 
 from . import backend
@@ -852,10 +855,8 @@ class Backend(backend.Backend):
         # Redirect stdout?
         if log:
             state.output_is_console = False
-            sys.stdout = open(
+            sys.stdout = logwriter.open_log(
                 os.path.join(base_directory, test_name, log_filename),
-                mode='w',
-                encoding='utf-8',
             )
             print(f'{" ".join(str(x) for x in sys.argv)}')
             print(f'{tc.dev.partnum}\n')
@@ -1059,9 +1060,8 @@ class Backend(backend.Backend):
                 passfile = open(os.path.join(base_directory, test_name,
                                 f'{state.output_pass_filename}.csv'),
                                 mode='w', encoding='utf-8')
-            datafile = open(os.path.join(base_directory, test_name,
-                            f'{state.output_data_filename}.npy'),
-                            mode='wb')
+            datafile = tensorfile.Writer(os.path.join(base_directory, test_name,
+                                                      f'{state.output_data_filename}.bin'))
             weightsfile = open(os.path.join(base_directory, test_name,
                                f'{state.output_weights_filename}.npy'),
                                mode='wb')
@@ -1099,6 +1099,8 @@ class Backend(backend.Backend):
                 bias=any(b is not None for b in bias),
                 test_name=test_name,
             )
+            if state.emulate:
+                apb.emulator = emulator.Emulator()
 
             apb.copyright_header()
 
@@ -2865,15 +2867,517 @@ class Backend(backend.Backend):
 
             return data
 
+        def layer_input(
+                ll,
+                buf,
+        ):
+            """
+            Return the input data of layer `ll`, concatenated if needed, from the layer outputs
+            in `buf` (see data_buf)
+            """
+            if in_sequences[ll] is not None:
+                if len(in_sequences[ll]) > 1:
+                    err_concat = None
+                    try:
+                        data = np.concatenate([buf[i + 1] for i in in_sequences[ll]],
+                                              axis=0)
+                    except ValueError as err:
+                        err_concat = err
+                    if err_concat is not None:
+                        try:
+                            data = np.hstack(
+                                [buf[i + 1].reshape(buf[i + 1].shape[0], -1)
+                                 for i in in_sequences[ll]]
+                            ).reshape(buf[in_sequences[ll][0] + 1].shape[0],
+                                      input_dim[ll][0], input_dim[ll][1])
+                        except ValueError as err:
+                            eprint(f'{layer_pfx(ll)}Input data concatenation unsuccessful: ',
+                                   err_concat, err)
+                elif in_sequences[ll][0] == -2:
+                    data = data_buffer
+                else:
+                    data = buf[in_sequences[ll][0]+1]
+            else:
+                data = buf[ll]
+            return data
+
+        def simulate_layer(
+                ll,
+                data,
+        ):
+            """
+            Simulate layer `ll` with input `data`, and return the output and its size
+            """
+            # Split data into multiple inputs if needed
+            if operands[ll] > 1:
+                if ll == start_layer and legacy_test:
+                    data = np.array(np.split(data, operands[ll], axis=0))
+                elif legacy_test:
+                    d = np.empty((operands[ll],
+                                  data.shape[0], data.shape[1], data.shape[2] // operands[ll]),
+                                 dtype=np.int64)
+                    for i in range(operands[ll]):
+                        d[i, :, :, :] = data[:, :, i::operands[ll]]
+                    data = d
+                else:
+                    data = np.array(np.split(data, operands[ll], axis=0))
+            else:
+                data = np.expand_dims(data, 0)
+
+            in_chan = input_chan[ll]
+
+            # Drop input channels?
+            if reshape_inputs:
+                if input_channel_skip[ll] > 0:
+                    data = np.delete(data, np.s_[:input_channel_skip[ll]], axis=1)
+                data = np.delete(data, np.s_[in_chan:], axis=1)
+
+            if datafile is not None:
+                # Log input to the tensor container
+                save_data(datafile, ll, 'input', data)
+
+            show_data(
+                ll,
+                data.shape,
+                data,
+                expand=in_expand[ll],
+                expand_thresh=in_expand_thresh[ll],
+                operation=operator[ll],
+                operands=operands[ll],
+            )
+
+            # Run in-flight element-wise operations first?
+            if operands[ll] > 1 and not pool_first[ll]:
+                data = np.expand_dims(run_eltwise(data, ll), 0)
+
+            # Allow 1D <-> 2D and 2D W/L conversions, and skipping/subsetting
+            if input_crop[ll][0] != 0 or input_crop[ll][1] != 0:  # line skip count
+                data = data[:, :, input_crop[ll][0]:-input_crop[ll][1], :]
+            if operator[ll] == op.CONV1D:
+                if in_sequences[ll] != [-2]:
+                    assert input_dim[ll][1] == 1
+                    data = data.reshape(data.shape[0], -1, input_dim[ll][0])
+                else:
+                    data = data.transpose(0, 2, 3, 1)
+                    data = data.reshape(data.shape[0], -1, input_dim[ll][0])
+            elif buffer_shift[ll] is None:
+                data = data.reshape(data.shape[0], -1, input_dim[ll][0], input_dim[ll][1])
+
+            # In-flight pooling
+            data, out_size = pooling_layer(
+                ll,
+                data[0].shape,
+                pool[ll],
+                pool_stride[ll],
+                pool_average[ll],
+                data,
+                dilation=pool_dilation[ll],
+                expand=in_expand[ll],
+                expand_thresh=in_expand_thresh[ll],
+                operation=operator[ll],
+                operands=data.shape[0],
+                rounding=avg_pool_rounding,
+                debug_data=None if not log_pooling else os.path.join(base_directory,
+                                                                     test_name),
+            )
+
+            if datafile is not None:
+                # Pooling output (pre-elementwise)
+                if pool[ll][0] > 1 or pool[ll][1] > 1 \
+                   or pool_stride[ll][0] > 1 or pool_stride[ll][1] > 1 \
+                   or pool_dilation[ll][0] > 1 or pool_dilation[ll][1] > 1:
+                    save_data(datafile, ll, 'pooled', data)
+
+            if operator[ll] == op.CONV1D:
+                if out_size[0] != in_chan \
+                   or out_size[1] != pooled_dim[ll][0] or pooled_dim[ll][1] != 1:
+                    eprint(f'{layer_pfx(ll)}Input dimensions do not match. '
+                           f'Expected: {in_chan}x{pooled_dim[ll][0]}, '
+                           f'got {out_size[0]}x{out_size[1]}.')
+            elif buffer_shift[ll] is None:
+                if out_size[0] != in_chan \
+                   or out_size[1] != pooled_dim[ll][0] or out_size[2] != pooled_dim[ll][1]:
+                    eprint(f'{layer_pfx(ll)}Input dimensions do not match. '
+                           f'Expected: {in_chan}x{pooled_dim[ll][0]}x{pooled_dim[ll][1]}, '
+                           f'got {out_size[0]}x{out_size[1]}x{out_size[2]}.')
+
+            if operands[ll] > 1 and pool_first[ll]:
+                data = run_eltwise(data, ll)
+            else:
+                data = np.squeeze(data, axis=0)
+
+            if datafile is not None:
+                # Operator input (after pooling and element-wise operations)
+                save_data(datafile, ll, 'operator-input', data)
+
+            # Convolution or passthrough
+            if operator[ll] in [op.CONV2D, op.LINEAR]:
+                if flatten[ll]:
+                    in_chan *= pooled_dim[ll][0] * pooled_dim[ll][1]
+                    data = data.reshape(in_chan, 1, 1)
+                    if verbose:
+                        print_data(
+                            verbose,
+                            f'FLATTEN TO {in_chan}x1x1',
+                            data,
+                            data.shape,
+                            1,
+                            in_chan,
+                        )
+
+                if not bypass[ll]:
+                    k = kernel[kernel_ptrs[ll]].reshape(
+                            output_chan[ll],
+                            in_chan // conv_groups[ll],
+                            kernel_size[ll][0],
+                            kernel_size[ll][1],
+                        )
+                else:
+                    k = np.full(
+                            (output_chan[ll], in_chan, kernel_size[ll][0], kernel_size[ll][0]),
+                            1,
+                            dtype=np.int64,
+                        )
+
+                out_buf, out_size = conv2d_layer(
+                    ll,
+                    data.shape,
+                    kernel_size[ll],
+                    output_shift[ll],
+                    output_chan[ll],
+                    padding[ll],
+                    dilation[ll],
+                    stride[ll],
+                    activation[ll],
+                    k,
+                    bias[bias_ptrs[ll]],
+                    data,
+                    output_width=output_width[ll],
+                    groups=conv_groups[ll],
+                    bypass=bypass[ll],
+                    datafile=datafile,
+                )
+            elif operator[ll] == op.CONVTRANSPOSE2D:
+                if not bypass[ll]:
+                    k = kernel[kernel_ptrs[ll]].reshape(
+                            output_chan[ll],
+                            in_chan // conv_groups[ll],
+                            kernel_size[ll][0],
+                            kernel_size[ll][1],
+                        )
+                else:
+                    k = np.full(
+                            (output_chan[ll], in_chan, kernel_size[ll][0], kernel_size[ll][0]),
+                            1,
+                            dtype=np.int64,
+                        )
+
+                out_buf, out_size = convtranspose2d_layer(
+                    ll,
+                    data.shape,
+                    kernel_size[ll],
+                    output_shift[ll],
+                    output_chan[ll],
+                    padding[ll],
+                    dilation[ll],
+                    stride[ll],
+                    output_padding[ll],
+                    activation[ll],
+                    k,
+                    bias[bias_ptrs[ll]],
+                    data,
+                    output_width=output_width[ll],
+                    groups=conv_groups[ll],
+                    bypass=bypass[ll],
+                    datafile=datafile,
+                )
+            elif operator[ll] == op.CONV1D:
+                if not bypass[ll]:
+                    k = kernel[kernel_ptrs[ll]].reshape(
+                            output_chan[ll],
+                            input_chan[ll] // conv_groups[ll],
+                            kernel_size[ll][0],
+                        )
+                else:
+                    k = np.full(
+                            (output_chan[ll], input_chan[ll], kernel_size[ll][0],),
+                            1,
+                            dtype=np.int64,
+                        )
+
+                out_buf, out_size = conv1d_layer(
+                    ll,
+                    data.shape,
+                    kernel_size[ll][0],
+                    output_shift[ll],
+                    output_chan[ll],
+                    padding[ll][0],
+                    dilation[ll][0],
+                    stride[ll][0],
+                    activation[ll],
+                    k,
+                    bias[bias_ptrs[ll]],
+                    data,
+                    output_width=output_width[ll],
+                    groups=conv_groups[ll],
+                    bypass=bypass[ll],
+                    datafile=datafile,
+                )
+            elif operator[ll] == op.NONE:  # '0'D (pooling only or passthrough)
+                out_buf, out_size = passthrough_layer(
+                    ll,
+                    data.shape,
+                    data,
+                    datafile=datafile,
+                )
+            else:
+                eprint(f'Unknown operator `{op.string(operator[ll])}`.')
+
+            return out_buf, out_size
+
+        def simulate_cached(
+                ll,
+                data,
+        ):
+            """
+            Simulate layer `ll` with input `data` like simulate_layer(), using the simulation
+            cache when enabled
+            """
+            if not use_cache:
+                return simulate_layer(ll, data)
+
+            # The key covers the input, weights, bias and all parameters simulate_layer() uses
+            cache_key = simcache.key(
+                [data, kernel[kernel_ptrs[ll]], bias[bias_ptrs[ll]]],
+                [tc.dev.partnum, tc.dev.BIAS_DIV, ll == start_layer, legacy_test, reshape_inputs,
+                 avg_pool_rounding]
+                + [p[ll] for p in (operands, input_channel_skip, input_chan, input_crop,
+                                   operator, in_sequences, input_dim, buffer_shift, pool,
+                                   pool_stride, pool_average, pool_dilation, pooled_dim,
+                                   pool_first, eltwise, output_shift, output_width, flatten,
+                                   kernel_size, output_chan, conv_groups, bypass, padding,
+                                   dilation, stride, output_padding, activation)],
+            )
+            cached = simcache.load(cache_key)
+            if cached is not None:
+                out_buf, out_size, ops = cached
+                for operation, val in ops.items():
+                    stats.account(ll, operation, val)
+                return np.asarray(out_buf, dtype=np.int64), out_size
+
+            ops = {operation: stats.get(ll, operation) for operation in stats.statsdict}
+            out_buf, out_size = simulate_layer(ll, data)
+            ops = {operation: stats.get(ll, operation) - val for operation, val in ops.items()}
+            simcache.store(cache_key, compute.narrow(out_buf), out_size,
+                           {operation: val for operation, val in ops.items() if val != 0})
+            return out_buf, out_size
+
+        def simulate_branches():
+            """
+            Simulate the layers of `sim_order` on `state.sim_branch_threads` workers, starting
+            each layer as soon as all layers it reads from are done, so that independent
+            branches of the network run concurrently. Return a dictionary of the outputs and
+            output sizes, which the layer loop consumes in the original order.
+            """
+            deps = schedule.dependencies(sim_order, in_sequences)
+            if deps is None:
+                return {}
+            reads = [schedule.buffer_reads(ll, in_sequences) for ll in sim_order]
+            readers = collections.Counter(i for r in reads for i in r)
+            buf = {start_layer: data_buf[start_layer]}
+            results = {}
+            stats.reserve(layers)  # Allow concurrent accounting
+
+            def run(step):
+                ll = sim_order[step]
+                return simulate_cached(ll, layer_input(ll, buf))
+
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=state.sim_branch_threads,
+                thread_name_prefix='izer-branch',
+            ) as pool:
+                waiting = dict(enumerate(deps))
+                running = {}
+                while waiting or running:
+                    # Start all layers whose inputs are available, in order
+                    for step in sorted(s for s, d in waiting.items() if not d):
+                        del waiting[step]
+                        running[pool.submit(run, step)] = step
+                    done, _ = concurrent.futures.wait(
+                        running,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    for future in sorted(done, key=running.get):
+                        step = running.pop(future)
+                        out_buf, out_size = future.result()
+                        # Keep the output in a narrow type until the layer loop consumes it
+                        results[sim_order[step]] = (compute.narrow(out_buf), out_size)
+                        if step + 1 < len(sim_order):
+                            buf[sim_order[step + 1]] = results[sim_order[step]][0] \
+                                .reshape(out_size)
+                        for i in reads[step]:
+                            readers[i] -= 1
+                            if readers[i] == 0:
+                                buf.pop(i, None)
+                        for d in waiting.values():
+                            d.discard(step)
+            return results
+
+        def simulate_streaming():
+            """
+            Simulate the chain of streaming layers at the start of `sim_order` row by row (see
+            izer.stream), so that each layer holds only the input rows of its pooling and
+            convolution windows instead of full-resolution frames. Return a dictionary of the
+            (narrow) outputs and output sizes, which the layer loop consumes in order. Outputs
+            that the layer loop does not need are not kept (None).
+            """
+            frames = {}
+            needed = set()
+            collectors = []
+            rows, size = None, None
+
+            def keep(ll, rows, size, dtype):
+                """
+                Collect the rows of layer `ll` into a frame when the layer loop needs it. This
+                is decided when the first row is pulled, after the chain is known.
+                """
+                if ll in needed:
+                    frames[ll] = np.empty(size, dtype=dtype)
+                    rows = stream.collect(rows, frames[ll])
+                yield from rows
+
+            for step, ll in enumerate(sim_order):
+                if not streaming[ll] or operator[ll] != op.CONV2D or operands[ll] != 1 \
+                   or flatten[ll] or bypass[ll] or reshape_inputs \
+                   or buffer_shift[ll] is not None or buffer_insert[ll] is not None \
+                   or input_crop[ll][0] != 0 or input_crop[ll][1] != 0:
+                    break
+                if step == 0:
+                    if -2 in (in_sequences[ll] or []):
+                        break
+                    data = layer_input(ll, data_buf)
+                    if data.ndim != 3:
+                        break
+                    rows, size = stream.rows(data), data.shape
+                elif in_sequences[ll] is not None and in_sequences[ll] != [sim_order[step - 1]]:
+                    break
+                if tuple(size[1:]) != tuple(input_dim[ll]):
+                    break
+
+                # The generators are lazy, so a layer that ends the chain is not simulated here
+                pooled, pooled_size = stream.pool_rows(
+                    ll,
+                    rows,
+                    size,
+                    pool[ll],
+                    pool_stride[ll],
+                    pool_average[ll],
+                    dilation=pool_dilation[ll],
+                    rounding=avg_pool_rounding,
+                )
+                if pooled_size != [input_chan[ll], pooled_dim[ll][0], pooled_dim[ll][1]]:
+                    break
+                k = kernel[kernel_ptrs[ll]].reshape(
+                        output_chan[ll],
+                        input_chan[ll] // conv_groups[ll],
+                        kernel_size[ll][0],
+                        kernel_size[ll][1],
+                    )
+                rows, size = stream.conv2d_rows(
+                    ll,
+                    pooled,
+                    pooled_size,
+                    kernel_size[ll],
+                    output_shift[ll],
+                    output_chan[ll],
+                    padding[ll],
+                    dilation[ll],
+                    stride[ll],
+                    activation[ll],
+                    k,
+                    bias[bias_ptrs[ll]],
+                    output_width=output_width[ll],
+                    groups=conv_groups[ll],
+                )
+                # 8-bit outputs are clipped by the requantization
+                rows = keep(ll, rows, size, np.int8 if output_width[ll] == 8
+                            and output_shift[ll] is not None else np.int64)
+                collectors.append((ll, rows, size))
+
+            # The known-answer test, the emulator and the saved intermediates use every output.
+            # Otherwise, only the outputs read by later layers and the output of the last layer
+            # of the chain are kept, so that the memory of the other layers is bounded by their
+            # windows.
+            keep_all = state.generate_kat or apb.emulator is not None \
+                or state.save_intermediates is not None
+            read_later = set()
+            for ll in sim_order[len(collectors):]:
+                read_later.update(schedule.buffer_reads(ll, in_sequences))
+            for step, (ll, _, _) in enumerate(collectors):
+                if keep_all or step == len(collectors) - 1 or sim_order[step + 1] in read_later:
+                    needed.add(ll)
+
+            # Pulling the rows of the last layer runs the chain; then complete the rows of
+            # earlier kept layers that no later window needed
+            for ll, rows, _ in reversed(collectors):
+                if ll in needed:
+                    collections.deque(rows, maxlen=0)
+            return {ll: (compute.narrow(frames[ll]) if ll in needed else None, list(size))
+                    for ll, _, size in collectors}
+
         # The data_buf list contains the output of each layer, with the exception of the
         # first element which is the input to layer 0 (so everything is shifted right by one):
         # data_buf[0]: Input to layer 0
         # data_buf[1]: Output of layer 0
         # data_buf[2]: Output of layer 1
         # data_buf[ll + 1]: Output of layer ll
+        # Activations are stored in the narrowest exact integer type (int8 for 8-bit output,
+        # int32 for 32-bit output), and widened to int64 by the compute functions.
+        # Each entry is released after the last layer that reads it.
         data_buf = [None] * (layers + 1)
         ll = start_layer
-        data_buf[ll] = data
+        data_buf[ll] = compute.narrow(data)
+        stats.account_data(data_buf[ll])
+        sim_order = schedule.simulation_order(start_layer, layers, next_sequence,
+                                              simulated_sequence)
+        last_read = schedule.last_reads(sim_order, in_sequences)
+        step = 0
+
+        # The saved data buffer entries are named by their index in the full yaml file, so a
+        # run with a different --skip-yaml-layers can use them
+        skip = state.skip_yaml_layers
+        if state.seed_intermediates is not None:
+            # Seed the outputs of earlier layers that are read by the simulated layers
+            saved = tensorfile.Reader(state.seed_intermediates)
+            for i in last_read:
+                if i < start_layer:
+                    if f'buffer-{i + skip}' not in saved:
+                        eprint(f'The saved intermediates {state.seed_intermediates} do not '
+                               f'contain data buffer entry {i + skip} used by the simulation.')
+                    data_buf[i] = np.array(saved[f'buffer-{i + skip}'])
+                    stats.account_data(data_buf[i])
+        intermediates = None
+        if state.save_intermediates is not None:
+            intermediates = tensorfile.Writer(state.save_intermediates)
+            intermediates.add(f'buffer-{ll + skip}', data_buf[ll], index=ll + skip)
+
+        # Reuse cached layer results unless the simulation has side effects (logs and verbose
+        # output)
+        use_cache = state.sim_cache is not None and not verbose and datafile is None \
+            and not state.debug_computation and not log_pooling
+
+        # Simulate independent branches concurrently when the simulation has no side effects
+        # that depend on the layer order (logs, verbose output, and the data buffer)
+        simulated_ahead = {}
+        if state.sim_branch_threads > 1 and not verbose and datafile is None \
+           and not state.debug_computation \
+           and all(buffer_shift[ll] is None and buffer_insert[ll] is None
+                   and -2 not in (in_sequences[ll] or []) for ll in sim_order):
+            simulated_ahead = simulate_branches()
+        # Otherwise, simulate the initial streaming layers row by row when requested
+        if not simulated_ahead and state.sim_stream_rows and not verbose and datafile is None \
+           and not state.debug_computation and not log_pooling:
+            simulated_ahead = simulate_streaming()
 
         with console.Progress(start=True) as progress:
             task = progress.add_task(description='Creating network... ', total=layers)
@@ -2927,260 +3431,13 @@ class Backend(backend.Backend):
 
                 compute.debug_open(ll, base_directory, test_name, log_filename)
 
-                # Concatenate input data if needed
-                if in_sequences[ll] is not None:
-                    if len(in_sequences[ll]) > 1:
-                        err_concat = None
-                        try:
-                            data = np.concatenate([data_buf[i + 1] for i in in_sequences[ll]],
-                                                  axis=0)
-                        except ValueError as err:
-                            err_concat = err
-                        if err_concat is not None:
-                            try:
-                                data = np.hstack(
-                                    [data_buf[i + 1].reshape(data_buf[i + 1].shape[0], -1)
-                                     for i in in_sequences[ll]]
-                                ).reshape(data_buf[in_sequences[ll][0] + 1].shape[0],
-                                          input_dim[ll][0], input_dim[ll][1])
-                            except ValueError as err:
-                                eprint(f'{layer_pfx(ll)}Input data concatenation unsuccessful: ',
-                                       err_concat, err)
-                    elif in_sequences[ll][0] == -2:
-                        data = data_buffer
-                    else:
-                        data = data_buf[in_sequences[ll][0]+1]
-                else:
-                    data = data_buf[ll]
-
-                # Split data into multiple inputs if needed
-                if operands[ll] > 1:
-                    if ll == start_layer and legacy_test:
-                        data = np.array(np.split(data, operands[ll], axis=0))
-                    elif legacy_test:
-                        d = np.empty((operands[ll],
-                                      data.shape[0], data.shape[1], data.shape[2] // operands[ll]),
-                                     dtype=np.int64)
-                        for i in range(operands[ll]):
-                            d[i, :, :, :] = data[:, :, i::operands[ll]]
-                        data = d
-                    else:
-                        data = np.array(np.split(data, operands[ll], axis=0))
-                else:
-                    data = np.expand_dims(data, 0)
-
-                in_chan = input_chan[ll]
-
-                # Drop input channels?
-                if reshape_inputs:
-                    if input_channel_skip[ll] > 0:
-                        data = np.delete(data, np.s_[:input_channel_skip[ll]], axis=1)
-                    data = np.delete(data, np.s_[in_chan:], axis=1)
-
-                if datafile is not None:
-                    # Log input to npy
-                    np.save(datafile, data, allow_pickle=False, fix_imports=False)
-
-                show_data(
-                    ll,
-                    data.shape,
-                    data,
-                    expand=in_expand[ll],
-                    expand_thresh=in_expand_thresh[ll],
-                    operation=operator[ll],
-                    operands=operands[ll],
-                )
-
-                # Run in-flight element-wise operations first?
-                if operands[ll] > 1 and not pool_first[ll]:
-                    data = np.expand_dims(run_eltwise(data, ll), 0)
-
-                # Allow 1D <-> 2D and 2D W/L conversions, and skipping/subsetting
-                if input_crop[ll][0] != 0 or input_crop[ll][1] != 0:  # line skip count
-                    data = data[:, :, input_crop[ll][0]:-input_crop[ll][1], :]
-                if operator[ll] == op.CONV1D:
-                    if in_sequences[ll] != [-2]:
-                        assert input_dim[ll][1] == 1
-                        data = data.reshape(data.shape[0], -1, input_dim[ll][0])
-                    else:
-                        data = data.transpose(0, 2, 3, 1)
-                        data = data.reshape(data.shape[0], -1, input_dim[ll][0])
-                elif buffer_shift[ll] is None:
-                    data = data.reshape(data.shape[0], -1, input_dim[ll][0], input_dim[ll][1])
-
-                # In-flight pooling
-                data, out_size = pooling_layer(
-                    ll,
-                    data[0].shape,
-                    pool[ll],
-                    pool_stride[ll],
-                    pool_average[ll],
-                    data,
-                    dilation=pool_dilation[ll],
-                    expand=in_expand[ll],
-                    expand_thresh=in_expand_thresh[ll],
-                    operation=operator[ll],
-                    operands=data.shape[0],
-                    rounding=avg_pool_rounding,
-                    debug_data=None if not log_pooling else os.path.join(base_directory,
-                                                                         test_name),
-                )
-
-                if datafile is not None:
-                    # Pooling output (pre-elementwise)
-                    if pool[ll][0] > 1 or pool[ll][1] > 1 \
-                       or pool_stride[ll][0] > 1 or pool_stride[ll][1] > 1 \
-                       or pool_dilation[ll][0] > 1 or pool_dilation[ll][1] > 1:
-                        np.save(datafile, data, allow_pickle=False, fix_imports=False)
-                    else:
-                        np.save(datafile, np.empty((0)), allow_pickle=False, fix_imports=False)
-
-                if operator[ll] == op.CONV1D:
-                    if out_size[0] != in_chan \
-                       or out_size[1] != pooled_dim[ll][0] or pooled_dim[ll][1] != 1:
-                        eprint(f'{layer_pfx(ll)}Input dimensions do not match. '
-                               f'Expected: {in_chan}x{pooled_dim[ll][0]}, '
-                               f'got {out_size[0]}x{out_size[1]}.')
-                elif buffer_shift[ll] is None:
-                    if out_size[0] != in_chan \
-                       or out_size[1] != pooled_dim[ll][0] or out_size[2] != pooled_dim[ll][1]:
-                        eprint(f'{layer_pfx(ll)}Input dimensions do not match. '
-                               f'Expected: {in_chan}x{pooled_dim[ll][0]}x{pooled_dim[ll][1]}, '
-                               f'got {out_size[0]}x{out_size[1]}x{out_size[2]}.')
-
-                if operands[ll] > 1 and pool_first[ll]:
-                    data = run_eltwise(data, ll)
-                else:
-                    data = np.squeeze(data, axis=0)
-
-                if datafile is not None:
-                    # if operands[ll] > 1 and pool_first[ll]:
-                    np.save(datafile, data, allow_pickle=False, fix_imports=False)
-                    # else:
-                    #    np.save(datafile, np.empty((0)), allow_pickle=False, fix_imports=False)
-
-                # Convolution or passthrough
-                if operator[ll] in [op.CONV2D, op.LINEAR]:
-                    if flatten[ll]:
-                        in_chan *= pooled_dim[ll][0] * pooled_dim[ll][1]
-                        data = data.reshape(in_chan, 1, 1)
-                        if verbose:
-                            print_data(
-                                verbose,
-                                f'FLATTEN TO {in_chan}x1x1',
-                                data,
-                                data.shape,
-                                1,
-                                in_chan,
-                            )
-
-                    if not bypass[ll]:
-                        k = kernel[kernel_ptrs[ll]].reshape(
-                                output_chan[ll],
-                                in_chan // conv_groups[ll],
-                                kernel_size[ll][0],
-                                kernel_size[ll][1],
-                            )
-                    else:
-                        k = np.full(
-                                (output_chan[ll], in_chan, kernel_size[ll][0], kernel_size[ll][0]),
-                                1,
-                                dtype=np.int64,
-                            )
-
-                    out_buf, out_size = conv2d_layer(
-                        ll,
-                        data.shape,
-                        kernel_size[ll],
-                        output_shift[ll],
-                        output_chan[ll],
-                        padding[ll],
-                        dilation[ll],
-                        stride[ll],
-                        activation[ll],
-                        k,
-                        bias[bias_ptrs[ll]],
-                        data,
-                        output_width=output_width[ll],
-                        groups=conv_groups[ll],
-                        bypass=bypass[ll],
-                        datafile=datafile,
-                    )
-                elif operator[ll] == op.CONVTRANSPOSE2D:
-                    if not bypass[ll]:
-                        k = kernel[kernel_ptrs[ll]].reshape(
-                                output_chan[ll],
-                                in_chan // conv_groups[ll],
-                                kernel_size[ll][0],
-                                kernel_size[ll][1],
-                            )
-                    else:
-                        k = np.full(
-                                (output_chan[ll], in_chan, kernel_size[ll][0], kernel_size[ll][0]),
-                                1,
-                                dtype=np.int64,
-                            )
-
-                    out_buf, out_size = convtranspose2d_layer(
-                        ll,
-                        data.shape,
-                        kernel_size[ll],
-                        output_shift[ll],
-                        output_chan[ll],
-                        padding[ll],
-                        dilation[ll],
-                        stride[ll],
-                        output_padding[ll],
-                        activation[ll],
-                        k,
-                        bias[bias_ptrs[ll]],
-                        data,
-                        output_width=output_width[ll],
-                        groups=conv_groups[ll],
-                        bypass=bypass[ll],
-                        datafile=datafile,
-                    )
-                elif operator[ll] == op.CONV1D:
-                    if not bypass[ll]:
-                        k = kernel[kernel_ptrs[ll]].reshape(
-                                output_chan[ll],
-                                input_chan[ll] // conv_groups[ll],
-                                kernel_size[ll][0],
-                            )
-                    else:
-                        k = np.full(
-                                (output_chan[ll], input_chan[ll], kernel_size[ll][0],),
-                                1,
-                                dtype=np.int64,
-                            )
-
-                    out_buf, out_size = conv1d_layer(
-                        ll,
-                        data.shape,
-                        kernel_size[ll][0],
-                        output_shift[ll],
-                        output_chan[ll],
-                        padding[ll][0],
-                        dilation[ll][0],
-                        stride[ll][0],
-                        activation[ll],
-                        k,
-                        bias[bias_ptrs[ll]],
-                        data,
-                        output_width=output_width[ll],
-                        groups=conv_groups[ll],
-                        bypass=bypass[ll],
-                        datafile=datafile,
-                    )
-                elif operator[ll] == op.NONE:  # '0'D (pooling only or passthrough)
-                    out_buf, out_size = passthrough_layer(
-                        ll,
-                        data.shape,
-                        data,
-                        datafile=datafile,
-                    )
+                if ll in simulated_ahead:
+                    # See simulate_branches() and simulate_streaming()
+                    out_buf, out_size = simulated_ahead.pop(ll)
+                    if out_buf is not None:  # None when the output is not needed
+                        out_buf = np.asarray(out_buf, dtype=np.int64)
                 else:
-                    eprint(f'Unknown operator `{op.string(operator[ll])}`.')
+                    out_buf, out_size = simulate_cached(ll, layer_input(ll, data_buf))
 
                 if buffer_shift[ll] is not None:
                     data_buffer = np.roll(data_buffer, -buffer_shift[ll], axis=0)
@@ -3223,7 +3480,7 @@ class Backend(backend.Backend):
 
                 if datafile is not None:
                     # Operator output
-                    np.save(datafile, out_buf, allow_pickle=False, fix_imports=False)
+                    save_data(datafile, ll, 'output', out_buf)
 
                 if buffer_shift[ll] is None:
                     assert out_size[0] == output_chan[ll] \
@@ -3238,6 +3495,31 @@ class Backend(backend.Backend):
                         and out_size[0] - buffer_shift[ll] == output_size[ll][1] \
                         and out_size[2] == output_size[ll][2]
 
+                if apb.emulator is not None:
+                    # Layers without 32-bit output, element-wise operations, data buffers and
+                    # local output (see izer.emulator)
+                    omap = output_processor_map[ll] >> ffs(output_processor_map[ll])
+                    emulated = hw_operator[ll] in [op.CONV2D, op.CONV1D, op.LINEAR] \
+                        and operands[ll] == 1 and output_width[ll] == 8 and not big_data[ll] \
+                        and conv_groups[ll] == 1 and not flatten[ll] and input_skip[ll] == 0 \
+                        and buffer_shift[ll] is None and buffer_insert[ll] is None \
+                        and (in_sequences[ll] is None or len(in_sequences[ll]) == 1
+                             and in_sequences[ll][0] != -2) \
+                        and omap & (omap + 1) == 0
+                    apb.emulator.run_layer(
+                        ll,
+                        ll + hw_add_layers[ll],
+                        None if ll == start_layer and fifo or streaming[ll]
+                        else layer_input(ll, data_buf),
+                        out_buf,
+                        processor_map[ll],
+                        output_processor_map[ll],
+                        out_ignore=out_ignore[ll],
+                        supported=emulated,
+                        loaded=ll != start_layer and state.generate_kat,
+                        streaming=streaming[ll],
+                    )
+
                 # Write .mem file for output or create the C check_output() function to
                 # verify the output
                 out_map = datamem.allocate()
@@ -3332,7 +3614,10 @@ class Backend(backend.Backend):
                     if memfile:
                         memfile.close()
 
-                if not np.any(out_buf) and state.warn_zero:
+                if apb.emulator is not None:
+                    apb.emulator.check(ll, supported=emulated and not streaming[ll])
+
+                if out_buf is not None and not np.any(out_buf) and state.warn_zero:
                     wprint(f'{layer_pfx(ll)}All output values for the given sample input are '
                            'zero. The generated known-answer test for this network may not be '
                            'meaningful. See the log file for details.')
@@ -3362,6 +3647,14 @@ class Backend(backend.Backend):
 
                 compute.debug_close()
 
+                # Release the data that no later layer reads
+                assert sim_order[step] == ll
+                for i, buf in enumerate(data_buf):
+                    if buf is not None and last_read.get(i, -1) <= step:
+                        stats.release_data(buf)
+                        data_buf[i] = None
+                step += 1
+
                 if simulated_sequence[ll] is not None:
                     if simulated_sequence[ll] == -1:
                         break
@@ -3371,11 +3664,27 @@ class Backend(backend.Backend):
                         break
                     ll = next_sequence[ll]
 
-                data_buf[ll] = out_buf.reshape(out_size)
+                if out_buf is None:
+                    continue  # Not read by any later layer (see simulate_streaming())
+                data_buf[ll] = compute.narrow(out_buf.reshape(out_size))
+                stats.account_data(data_buf[ll])
+                if intermediates is not None:
+                    intermediates.add(f'buffer-{ll + skip}', data_buf[ll],
+                                      index=ll + skip, source=sim_order[step - 1] + skip)
 
             progress.update(task, completed=layers)
 
-        data = data_buf[ll]
+        if intermediates is not None:
+            intermediates.close()
+
+        if use_cache:
+            simcache.evict()
+
+        if apb.emulator is not None:
+            if apb.emulator.errors == 0:
+                nprint(apb.emulator.summary())
+            else:
+                wprint(apb.emulator.summary())
 
         try:
             if filename:
@@ -3611,5 +3920,8 @@ class Backend(backend.Backend):
                                  test_name, board_name)
 
         print(stats.summary(factor=repeat_layers, group_bias_max=group_bias_max))
+        sim_summary = stats.sim_summary()
+        if sim_summary:
+            print(sim_summary)
 
         return test_name
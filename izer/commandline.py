@@ -8,6 +8,7 @@
 Command line parser for Tornado CNN
 """
 import argparse
+import os
 
 from . import camera, state
 from .devices import device
@@ -244,10 +245,22 @@ def get_parser() -> argparse.Namespace:
                        help="log data for output layers only (default: all layers)")
     group.add_argument('--log-filename', default='log.txt', metavar='S',
                        help="log file name (default: 'log.txt')")
+    group.add_argument('--log-max-elements', type=int, metavar='N',
+                       help="summarize arrays with more than N elements in the log file, and "
+                            "save them in full to a .npz file of the same name "
+                            "(default: log all elements)")
     group.add_argument('-D', '--debug', action='store_true', default=False,
                        help="debug mode (default: false)")
     group.add_argument('--debug-computation', action='store_true', default=False,
                        help="debug computation -- SLOW (default: false)")
+    group.add_argument('--debug-computation-format', choices=['csv', 'npy'], default='csv',
+                       help="write the computation debug log as text, or as binary trace "
+                            "records in .npy chunks (default: csv)")
+    group.add_argument('--emulate', action='store_true', default=False,
+                       help="check the data memory placement of the generated register "
+                            "program (processor enables, read/write pointers, multi-pass "
+                            "layout) against the expected output; layers are not computed "
+                            "from the kernel memory (default: false)")
     group.add_argument('--debug-latency', action='store_true', default=False,
                        help="debug latency calculations (default: false)")
     group.add_argument('--no-error-stop', action='store_true', default=False,
@@ -258,6 +271,13 @@ def get_parser() -> argparse.Namespace:
                        help="ignore first N layers in the checkpoint (default: 0)")
     group.add_argument('--skip-yaml-layers', type=int, metavar='N', default=0,
                        help="ignore first N layers in the yaml file (default: 0)")
+    group.add_argument('--save-intermediates', metavar='FILE',
+                       help="save the input of every simulated layer to the indexed container "
+                            "FILE (and its .json manifest) (default: off)")
+    group.add_argument('--seed-intermediates', metavar='FILE',
+                       help="use the saved layer inputs in FILE (see --save-intermediates) "
+                            "instead of the sample input, starting at --start-layer "
+                            "(default: off)")
     group.add_argument('--stop-start', action='store_true', default=False,
                        help="stop and then restart the accelerator (default: false)")
     group.add_argument('--one-shot', action='store_true', default=False,
@@ -346,7 +366,8 @@ def get_parser() -> argparse.Namespace:
     group.add_argument('--output-config-filename', default='config', metavar='S',
                        help="output config file name base (default: 'config' -> 'config.csv')")
     group.add_argument('--output-data-filename', default='data', metavar='S',
-                       help="output data file name base (default: 'data' -> 'data.npy')")
+                       help="output data file name base (default: 'data' -> 'data.bin' and "
+                            "manifest 'data.json')")
     group.add_argument('--output-weights-filename', default='weights', metavar='S',
                        help="output weights file name base (default: 'weights' -> 'weights.npy')")
     group.add_argument('--output-bias-filename', default='bias', metavar='S',
@@ -443,6 +464,46 @@ def get_parser() -> argparse.Namespace:
     group.add_argument('--ready-sel-aon', type=int, metavar='N',
                        help="specify AON waitstates")
 
+    # Simulation
+    group = parser.add_argument_group('Simulation')
+    group.add_argument('--compute-engine', choices=['numpy', 'blas', 'torch'], default='numpy',
+                       help="engine used to simulate convolutions and linear layers: integer "
+                            "NumPy, exact float64 BLAS GEMM, or float64 PyTorch CPU, both with "
+                            "integer fallback (default: numpy)")
+    group.add_argument('--compute-verify', choices=['numpy', 'blas', 'torch'], metavar='ENGINE',
+                       help="also simulate every layer using ENGINE and stop at the first layer "
+                            "where the results differ (default: off)")
+    group.add_argument('--sim-branch-threads', type=int, metavar='N', default=1,
+                       choices=range(1, 1025),
+                       help="simulate independent branches of networks with `in_sequences` on "
+                            "N threads (default: 1)")
+    group.add_argument('--sim-cache', action='store_true', default=False,
+                       help="reuse simulated layer results from earlier runs, and cache new "
+                            "results (default: off unless the IZER_SIM_CACHE environment "
+                            "variable is set)")
+    group.add_argument('--no-sim-cache', action='store_true', default=False,
+                       help="do not use the simulation cache, even when --sim-cache or "
+                            "IZER_SIM_CACHE is set")
+    group.add_argument('--sim-cache-dir', metavar='DIR',
+                       default=os.path.join('~', '.cache', 'izer'),
+                       help="simulation cache directory (default: ~/.cache/izer)")
+    group.add_argument('--sim-cache-size', type=int, metavar='MB', default=4096,
+                       help="evict the least recently used simulation results when the cache "
+                            "exceeds MB megabytes (default: 4096)")
+    group.add_argument('--sim-memory-budget', type=int, metavar='MB', default=256,
+                       help="limit temporary memory per simulated convolution to MB megabytes "
+                            "(default: 256)")
+    group.add_argument('--sim-stream-rows', action='store_true', default=False,
+                       help="simulate the initial streaming layers row by row, holding only "
+                            "the rows of the pooling and convolution windows (the layer outputs "
+                            "are kept for the known-answer test unless --no-kat is used)")
+    group.add_argument('--sim-threads', type=int, metavar='N', default=1, choices=range(1, 1025),
+                       help="split convolutions and linear layers across N threads by output "
+                            "channel (default: 1)")
+    group.add_argument('--no-winograd', action='store_false', dest='sim_winograd', default=True,
+                       help="do not use the Winograd algorithm to simulate 3x3 convolutions "
+                            "(default: use Winograd for stride 1)")
+
     # Various
     group = parser.add_argument_group('Various')
     group.add_argument('--input-split', type=int, default=1, metavar='N', choices=range(1, 1025),
@@ -598,8 +659,11 @@ def set_state(args: argparse.Namespace) -> None:
     state.compact_data = args.compact_data and \
         (not args.rtl_preload or args.fifo or args.fast_fifo or args.fast_fifo_quad)
     state.compact_weights = args.compact_weights
+    state.compute_engine = args.compute_engine
+    state.compute_verify = args.compute_verify
     state.debug = args.debug
     state.debug_computation = args.debug_computation
+    state.debug_computation_format = args.debug_computation_format
     state.debug_latency = args.debug_latency
     state.debug_new_streaming = args.debug_new_streaming
     state.debug_snoop = args.debug_snoop
@@ -612,6 +676,7 @@ def set_state(args: argparse.Namespace) -> None:
     state.eclipse_openocd_args = args.eclipse_openocd_args
     state.eclipse_variables = args.eclipse_variables
     state.embedded_code = args.embedded_code
+    state.emulate = args.emulate
     state.enable_delay = args.enable_delay
     state.energy_warning = not args.ignore_energy_warning
     state.ext_rdy = args.ext_rdy
@@ -646,6 +711,7 @@ def set_state(args: argparse.Namespace) -> None:
     state.link_layer = args.link_layer
     state.log = args.log
     state.log_filename = args.log_filename
+    state.log_max_elements = args.log_max_elements
     state.log_intermediate = args.log_intermediate
     state.log_pooling = args.log_pooling
     state.max_count = args.max_count
@@ -691,12 +757,23 @@ def set_state(args: argparse.Namespace) -> None:
     state.rtl_preload_weights = args.rtl_preload_weights
     state.runtest_filename = args.runtest_filename
     state.sample_filename = args.sample_filename
+    state.sim_branch_threads = args.sim_branch_threads
+    if not args.no_sim_cache and (args.sim_cache or os.environ.get('IZER_SIM_CACHE')):
+        state.sim_cache = os.path.expanduser(args.sim_cache_dir)
+    state.sim_cache_size = args.sim_cache_size * 1024 * 1024
+    state.sim_memory_budget = args.sim_memory_budget * 1024 * 1024
+    state.sim_stream_rows = args.sim_stream_rows
+    state.sim_threads = args.sim_threads
+    state.sim_winograd = args.sim_winograd
     state.simple1b = args.simple1b
     state.sleep = args.deepsleep
     state.slow_load = args.slow_load
     state.snoop_loop = args.snoop_loop
     state.softmax = args.softmax
     state.split = args.input_split
+    state.save_intermediates = args.save_intermediates
+    state.seed_intermediates = args.seed_intermediates
+    state.skip_yaml_layers = args.skip_yaml_layers
     state.start_layer = args.start_layer
     state.stopstart = args.stop_start
     state.synthesize_input = args.synthesize_input
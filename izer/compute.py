@@ -9,15 +9,44 @@ Python implementation of Conv1d, Conv2d, ConvTranspose1d, ConvTranspose2d, Pool1
 Eltwise, and Linear.
 Compatible with PyTorch.
 """
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 from numpy.typing import ArrayLike
 
-from . import op, state, stats
+from . import op, state
 from .eprint import eprint
 
+_SAT_POOL = 4  # Minimum pool size for summed-area table average pooling
+_TRACE_CHUNK = 1 << 20  # Maximum number of records per binary trace chunk
+
+# One record of the --debug-computation trace. Bias records have `in` == -1, the bias in
+# `weight`, and the output value in `accumulator`.
+TRACE_DTYPE = np.dtype([
+    ('sample', np.int64),
+    ('out', np.int64),
+    ('in', np.int64),
+    ('weight', np.int64),
+    ('data', np.int64),
+    ('accumulator', np.int64),
+])
+
+# Element-wise operators
+_ELTWISE_UFUNCS = {
+    op.ELTWISE_ADD: np.add,
+    op.ELTWISE_MUL: np.multiply,
+    op.ELTWISE_OR: np.bitwise_or,
+    op.ELTWISE_SUB: np.subtract,
+    op.ELTWISE_XOR: np.bitwise_xor,
+}
+
+# Winograd F(2x2, 3x3) kernel transform, scaled by 2 so that all elements are integers
+_WINOGRAD_G = np.array([[2, 0, 0], [1, 1, 1], [1, -1, 1], [0, 0, 2]], dtype=np.int64)
+
 
 def debug_open(
         layer: int,
@@ -26,15 +55,22 @@ def debug_open(
         log_filename: str,  # pylint: disable=unused-argument
 ) -> None:
     """
-    Create debug log for a layer
+    Create debug log for a layer, a text file, or a file of binary .npy chunks of trace records
+    when `state.debug_computation_format` is 'npy'
     """
     if not state.debug_computation:
         return
-    state.debug_log = open(
-        os.path.join(base_directory, test_name, f'compute-{layer}.csv'),
-        mode='w',
-        encoding='utf-8',
-    )
+    if state.debug_computation_format == 'npy':
+        state.debug_log = open(
+            os.path.join(base_directory, test_name, f'compute-{layer}.npy'),
+            mode='wb',
+        )
+    else:
+        state.debug_log = open(
+            os.path.join(base_directory, test_name, f'compute-{layer}.csv'),
+            mode='w',
+            encoding='utf-8',
+        )
 
 
 def debug_print(
@@ -48,6 +84,47 @@ def debug_print(
     print(t, file=state.debug_log)
 
 
+def trace_lines(
+        records,
+) -> Iterator[str]:
+    """
+    Render trace `records` (TRACE_DTYPE) as the lines of the text compute debug log
+    """
+    for r in records:
+        if r['in'] < 0:
+            yield f"+bias {r['weight']} --> output[{r['out']}] = {r['accumulator']}"
+        else:
+            yield f"w={r['out']}, n={r['in']}, weight={r['weight']}, data={r['data']} " \
+                  f"-> accumulator = {r['accumulator']} "
+
+
+def debug_trace(
+        records,
+) -> None:
+    """
+    Write a chunk of trace `records` (TRACE_DTYPE) to the compute debug log
+    """
+    if not state.debug_computation:
+        return
+    if state.debug_computation_format == 'npy':
+        np.save(state.debug_log, records, allow_pickle=False)
+    else:
+        for line in trace_lines(records):
+            print(line, file=state.debug_log)
+
+
+def load_trace(
+        filename: str,
+) -> Iterator[np.ndarray]:
+    """
+    Read the chunks of trace records from a binary compute debug log
+    """
+    with open(filename, mode='rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            yield np.load(f, allow_pickle=False)
+
+
 def debug_close() -> None:
     """
     Close the compute debug log
@@ -59,28 +136,337 @@ def debug_close() -> None:
     state.debug_log = None
 
 
+def batched(
+        data,
+        input_size,
+) -> bool:
+    """
+    Return whether `data` has a leading batch axis in addition to the dimensions of a single
+    sample of size `input_size`.
+    """
+    return np.ndim(data) == len(input_size) + 1
+
+
+def narrow(
+        data,
+) -> np.ndarray:
+    """
+    Return integer `data` as the narrowest of int8, int32 and int64 that represents all values
+    exactly. This is used to store activations between layers; the compute functions widen
+    their inputs to int64.
+    """
+    data = np.asarray(data)
+    if data.size == 0:
+        return data
+    low, high = int(data.min()), int(data.max())
+    for dtype in (np.int8, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return data.astype(dtype)
+    return data.astype(np.int64)
+
+
+@functools.lru_cache(maxsize=None)
+def _executor(
+        threads: int,
+) -> ThreadPoolExecutor:
+    """
+    Return a thread pool with `threads` workers, shared by all layers.
+    """
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix='izer-compute')
+
+
+def _parallel(
+        func,
+        count: int,
+) -> None:
+    """
+    Call `func(start, stop)` for up to `state.sim_threads` contiguous blocks that cover
+    range(`count`), using one thread per block. NumPy releases the GIL inside the contractions,
+    so the blocks run concurrently. `func` must write its results to disjoint locations.
+    """
+    threads = max(1, min(state.sim_threads, count))
+    if threads == 1:
+        func(0, count)
+        return
+
+    futures = [_executor(threads).submit(func, count * i // threads, count * (i + 1) // threads)
+               for i in range(threads)]
+    for f in futures:
+        f.result()  # Re-raise exceptions
+
+
+def float64_exact(
+        data,
+        weight,
+        terms,
+) -> bool:
+    """
+    Return whether float64 arithmetic computes a layer with input `data`, `weight` and `terms`
+    products per output value exactly. This is the case when the largest possible accumulator
+    magnitude does not exceed 2**53, so that every partial sum is an integer that float64
+    represents exactly.
+    """
+    if data.size == 0 or weight.size == 0:
+        return False
+
+    max_data = max(-int(data.min()), int(data.max()))
+    max_weight = max(-int(weight.min()), int(weight.max()))
+    return terms * max_data * max_weight <= 2**53
+
+
+def _use_gemm(
+        data,
+        weight,
+        terms,
+        blas,
+) -> bool:
+    """
+    Return whether `blas` (the float64 BLAS GEMM engine) is selected and computes the layer
+    exactly.
+    """
+    return blas and float64_exact(data, weight, terms)
+
+
+def _convolve_gemm(
+        view,
+        weight,
+        groups=1,
+) -> np.ndarray:
+    """
+    Same as _convolve(), using im2col and a float64 (BLAS) matrix multiplication.
+    The caller must check that the result is exact using _use_gemm().
+    """
+    kdims = weight.ndim - 2  # Number of kernel dimensions
+    odims = view.ndim - kdims - 1  # Number of output dimensions
+    out_channels = weight.shape[0]
+    row_size = weight[0].size * groups
+
+    # im2col: (output pixels, groups, channels per group * kernel elements)
+    cols = np.asarray(view, dtype=np.float64).reshape(-1, groups, row_size // groups)
+    gweight = weight.reshape(groups, out_channels // groups, -1).astype(np.float64)
+
+    output = np.matmul(cols.transpose(1, 0, 2), gweight.transpose(0, 2, 1))
+    return output.transpose(1, 0, 2).reshape(view.shape[:odims] + (out_channels,)) \
+        .astype(np.int64)
+
+
+def _convolve_block(
+        view,
+        weight,
+        groups=1,
+        gemm=False,
+) -> np.ndarray:
+    """
+    Contract a strided window `view` of shape (<output dims>, C, <kernel dims>) with
+    `weight` of shape (O, C // groups, <kernel dims>) and return (<output dims>, O).
+
+    For grouped (depthwise) convolutions, the channel axes of both the view and the weights are
+    split into (groups, channels per group) and each group is contracted separately, so the
+    weights are never expanded to a dense (O, C, <kernel dims>) tensor.
+
+    When `gemm` is set, use the exact float64 GEMM path instead of integer arithmetic.
+    """
+    if gemm:
+        return _convolve_gemm(view, weight, groups)
+
+    kdims = weight.ndim - 2  # Number of kernel dimensions
+    odims = view.ndim - kdims - 1  # Number of output dimensions
+
+    if groups == 1:
+        return np.tensordot(view, weight,
+                            axes=(tuple(range(odims, view.ndim)), tuple(range(1, weight.ndim))))
+
+    out_channels = weight.shape[0]
+    in_channels = view.shape[odims]
+    assert in_channels % groups == 0 and out_channels % groups == 0
+
+    # Splitting an axis of a strided view does not copy the data
+    gview = view.reshape(view.shape[:odims] + (groups, in_channels // groups)
+                         + view.shape[odims + 1:])
+    gweight = weight.reshape((groups, out_channels // groups) + weight.shape[1:])
+
+    o = 'abcdef'[:odims]
+    k = 'ijkl'[:kdims]
+    output = np.einsum(f'{o}gc{k},goc{k}->{o}go', gview, gweight)
+
+    return output.reshape(view.shape[:odims] + (out_channels,))
+
+
+def _convolve(
+        view,
+        weight,
+        groups=1,
+        gemm=False,
+) -> np.ndarray:
+    """
+    Same as _convolve_block(), splitting the output channels into blocks (of whole groups for
+    grouped convolutions) that are computed by `state.sim_threads` threads. The results are
+    identical to the serial path.
+    """
+    if state.sim_threads <= 1:
+        return _convolve_block(view, weight, groups, gemm)
+
+    kdims = weight.ndim - 2  # Number of kernel dimensions
+    odims = view.ndim - kdims - 1  # Number of output dimensions
+    out_channels = weight.shape[0]
+    output = np.empty(view.shape[:odims] + (out_channels,), dtype=np.int64)
+
+    if groups == 1:
+        # Copy the windows once (im2col) and share them between the threads
+        cols = np.asarray(view, dtype=np.float64 if gemm else np.int64) \
+            .reshape(-1, weight[0].size)
+        rows = weight.reshape(out_channels, -1).astype(cols.dtype)
+        flat = output.reshape(-1, out_channels)
+
+        def block(start, stop):
+            flat[:, start:stop] = cols @ rows[start:stop].T
+
+        _parallel(block, out_channels)
+    else:
+        in_group = view.shape[odims] // groups
+        out_group = out_channels // groups
+
+        def block(start, stop):
+            channels = (slice(None),) * odims + (slice(start * in_group, stop * in_group),)
+            output[..., start * out_group:stop * out_group] = _convolve_block(
+                view[channels], weight[start * out_group:stop * out_group], stop - start, gemm,
+            )
+
+        _parallel(block, groups)
+
+    return output
+
+
+def _convolve_tiled(
+        view,
+        weight,
+        groups,
+        output,
+        gemm=False,
+) -> None:
+    """
+    Contract a strided window `view` of shape (H, W, C, <kernel dims>) with `weight` and store
+    the result in `output` of shape (O, H, W). The work is split into tiles of output rows so
+    that the temporary arrays stay within `state.sim_memory_budget` bytes, regardless of the
+    size of the feature map.
+    """
+    # Bytes per output row for the flattened window copy and the partial result (int64)
+    row_bytes = view.shape[1] * (np.prod(view.shape[2:]) + weight.shape[0]) * 8
+    rows = max(1, state.sim_memory_budget // max(1, row_bytes))
+
+    for r in range(0, view.shape[0], rows):
+        output[:, r:r + rows] = \
+            _convolve(view[r:r + rows], weight, groups, gemm).transpose(2, 0, 1)
+
+
+def _winograd_input(
+        x,
+        axis,
+) -> np.ndarray:
+    """
+    Apply the Winograd F(2, 3) input transform B^T to the 4-element `axis` of `x`.
+    """
+    d = [np.take(x, i, axis=axis) for i in range(4)]
+    return np.stack((d[0] - d[2], d[1] + d[2], d[2] - d[1], d[1] - d[3]), axis=axis)
+
+
+def _winograd_output(
+        m,
+        axis,
+) -> np.ndarray:
+    """
+    Apply the Winograd F(2, 3) output transform A^T to the 4-element `axis` of `m`.
+    """
+    d = [np.take(m, i, axis=axis) for i in range(4)]
+    return np.stack((d[0] + d[1] + d[2], d[1] - d[2] - d[3]), axis=axis)
+
+
+def _winograd(
+        data,
+        weight,
+        output,
+) -> None:
+    """
+    Compute a stride 1, 3x3 convolution of padded `data` (C, H, W) with `weight` (O, C, 3, 3)
+    using the Winograd F(2x2, 3x3) algorithm, and store the result in `output` of shape
+    (O, H - 2, W - 2). This takes 16 instead of 36 multiplications per 2x2 output tile.
+
+    The kernel transform uses 2 * G, which has integer elements, so all arithmetic is integer
+    and the result is exactly four times the convolution. The work is split into tiles of output
+    rows to stay within `state.sim_memory_budget` bytes.
+    """
+    out_channels, in_channels = weight.shape[:2]
+    h, w = output.shape[1:]
+    th, tw = (h + 1) // 2, (w + 1) // 2  # Number of 2x2 output tiles
+
+    # Pad odd output sizes to complete tiles
+    data = np.pad(data, pad_width=((0, 0), (0, 2 * th + 2 - data.shape[1]),
+                                   (0, 2 * tw + 2 - data.shape[2])),
+                  mode='constant', constant_values=0)
+    tiles = as_strided(data,
+                       shape=(th, tw, in_channels, 4, 4),
+                       strides=(data.strides[1] * 2, data.strides[2] * 2, data.strides[0],
+                                data.strides[1], data.strides[2]),
+                       writeable=False)
+
+    # (16, C, O)
+    u = np.einsum('ik,ockl,jl->ijco', _WINOGRAD_G, weight, _WINOGRAD_G) \
+        .reshape(16, in_channels, out_channels)
+
+    # Bytes per row of tiles for the transformed input and the products (int64)
+    row_bytes = tw * 16 * (in_channels + out_channels) * 8
+    rows = max(1, state.sim_memory_budget // max(1, row_bytes))
+
+    for r in range(0, th, rows):
+        t = tiles[r:r + rows]
+        v = _winograd_input(_winograd_input(t, 3), 4)  # (rows, W tiles, C, 4, 4)
+        v = v.transpose(3, 4, 0, 1, 2).reshape(16, -1, in_channels)
+
+        m = np.empty((16, v.shape[1], out_channels), dtype=np.int64)
+
+        def block(start, stop, v=v, m=m):
+            m[:, :, start:stop] = np.matmul(v, u[:, :, start:stop])
+
+        _parallel(block, out_channels)
+
+        y = _winograd_output(_winograd_output(m.reshape((4, 4, t.shape[0], tw, out_channels)),
+                                              0), 1)
+        y //= 4  # Exact
+        y = y.transpose(4, 2, 0, 3, 1).reshape(out_channels, 2 * t.shape[0], 2 * tw)
+        output[:, 2 * r:2 * (r + rows)] = y[:, :output.shape[1] - 2 * r, :w]
+
+
 def conv2d(
         data,
         weight,
         bias,
         input_size,
         output_size,
-        kernel_size,
+        kernel_size,  # pylint: disable=unused-argument
         stride,
         pad,
         dilation,
         fractional_stride,
         output_pad,
         groups=1,
+        blas=False,
 ) -> ArrayLike:
     """
     Compute a 2D convolution.
 
-    Note that all PyTorch numbers are ordered (C, H, W)
+    Note that all PyTorch numbers are ordered (C, H, W). `data` may have an additional leading
+    batch dimension (N, C, H, W). When `blas` is set, use exact float64 GEMM where possible.
     """
+    if batched(data, input_size):
+        return np.stack([conv2d(d, weight, bias, input_size, output_size, kernel_size, stride,
+                                pad, dilation, fractional_stride, output_pad, groups, blas)
+                         for d in data])
+
     assert data.shape == tuple(input_size)
-    in_channels = input_size[0]
+    data = np.asarray(data, dtype=np.int64)  # Activations may be stored in a narrower type
     out_channels = output_size[0]
+    gemm = _use_gemm(data, weight, weight[0].size, blas)
 
     # Stretch data for fractionally-strided convolution
     if fractional_stride[0] > 1 or fractional_stride[1] > 1:
@@ -98,33 +484,33 @@ def conv2d(
                                        (pad[1], pad[1] + output_pad[1])),
                       mode='constant', constant_values=0)
 
-    if dilation[0] > 1 or dilation[1] > 1:
-        # Stretch weights for dilation
-        nweight = np.zeros((weight.shape[0], weight.shape[1],
-                            (kernel_size[0] - 1) * dilation[0] + 1,
-                            (kernel_size[1] - 1) * dilation[1] + 1),
-                           dtype=weight.dtype)
-        nweight[:, :, 0::dilation[0], 0::dilation[1]] = weight
-        weight = nweight
-
-    h = (data.shape[1] - weight.shape[3]) // stride[0] + 1  # Resulting output height
-    w = (data.shape[2] - weight.shape[2]) // stride[1] + 1  # Resulting output width
+    # Dilation is handled by striding the kernel window over the input, so only the actual
+    # kernel taps are multiplied (instead of a zero-stretched kernel)
+    h = (data.shape[1] - (weight.shape[2] - 1) * dilation[0] - 1) \
+        // stride[0] + 1  # Resulting output height
+    w = (data.shape[2] - (weight.shape[3] - 1) * dilation[1] - 1) \
+        // stride[1] + 1  # Resulting output width
 
     view = as_strided(data,
                       shape=(h, w, data.shape[0], weight.shape[2], weight.shape[3]),
                       strides=((data.strides[1] * stride[0], data.strides[2] * stride[1],
-                                data.strides[0], data.strides[1], data.strides[2])),
+                                data.strides[0], data.strides[1] * dilation[0],
+                                data.strides[2] * dilation[1])),
                       writeable=False)
 
-    if groups > 1:
-        nweight = np.zeros((weight.shape[0], in_channels, weight.shape[2], weight.shape[3]),
-                           dtype=weight.dtype)
-        for i in range(weight.shape[0]):
-            for j in range(in_channels // groups):
-                nweight[i, i * (in_channels // groups) + j, :, :] = weight[i, j, :, :]
-        weight = nweight
-
-    output = np.tensordot(view, weight, axes=((2, 3, 4), (1, 2, 3))).transpose(2, 0, 1)
+    output = np.empty((weight.shape[0], h, w), dtype=np.int64)
+    if state.sim_winograd and not gemm and groups == 1 and weight.shape[2:] == (3, 3) \
+       and stride[0] == stride[1] == 1 and dilation[0] == dilation[1] == 1:
+        _winograd(data, weight, output)
+
+        if state.debug:
+            # Direct computation
+            ref = np.empty_like(output)
+            _convolve_tiled(view, weight, groups, ref)
+            if not np.array_equal(ref, output):
+                eprint('Winograd <-> direct mismatch in compute.conv2d')
+    else:
+        _convolve_tiled(view, weight, groups, output, gemm)
 
     # Apply bias
     if bias is not None:
@@ -137,6 +523,90 @@ def conv2d(
     return output
 
 
+def _transpose_phases(
+        out_len,
+        kernel_size,
+        dilation,
+        pad,
+        stride,
+):
+    """
+    Return the polyphase decomposition of one dimension of a transposed convolution with
+    fractional `stride`, as a list of (phase, taps, start, step, count) tuples.
+
+    Output position `q * stride + phase` is the sum over the kernel `taps` (with input indices
+    `q + start`, `q + start + step`, ...), so no multiplications by inserted zeros are needed.
+    Phases without any taps are omitted since their output is zero.
+    """
+    left = dilation * (kernel_size - 1) - pad  # Left padding of the zero-inserted input
+
+    phases = []
+    for r in range(stride):
+        count = (out_len - r + stride - 1) // stride
+        taps = [t for t in range(kernel_size) if (r + t * dilation - left) % stride == 0]
+        if count <= 0 or len(taps) == 0:
+            continue
+        start = (r + taps[0] * dilation - left) // stride
+        step = (taps[1] - taps[0]) * dilation // stride if len(taps) > 1 else 1
+        phases.append((r, taps, start, step, count))
+
+    return phases
+
+
+def _convtranspose_polyphase(
+        data,
+        weight,
+        output_size,
+        pad,
+        dilation,
+        fractional_stride,
+        output_pad,
+        groups=1,
+        blas=False,
+) -> np.ndarray:
+    """
+    Compute a transposed 2D convolution (without bias) of `data` (C, H, W) by computing each
+    output phase from the dense input with a sub-kernel, and interleaving the results.
+    This is bit-exact with convolving over zero-inserted data.
+    """
+    kernel_size = weight.shape[2:]
+    for i in range(2):
+        expected = (data.shape[i + 1] - 1) * fractional_stride[i] - 2 * pad[i] \
+            + dilation[i] * (kernel_size[i] - 1) + output_pad[i] + 1
+        assert output_size[i + 1] == expected, \
+            f'Shape mismatch: expected output dimension {expected} vs {output_size[i + 1]}'
+
+    phases = [_transpose_phases(output_size[i + 1], kernel_size[i], dilation[i], pad[i],
+                                fractional_stride[i]) for i in range(2)]
+
+    output = np.zeros((weight.shape[0], output_size[1], output_size[2]), dtype=np.int64)
+    if len(phases[0]) == 0 or len(phases[1]) == 0:
+        return output
+    gemm = _use_gemm(data, weight, weight[0].size, blas)
+
+    # Pad the input once so that every phase can read all of its input positions
+    pad_width = [(0, 0)]
+    for i in range(2):
+        first = min(start for _, _, start, _, _ in phases[i])
+        last = max(start + count - 1 + (len(taps) - 1) * step
+                   for _, taps, start, step, count in phases[i])
+        pad_width.append((max(0, -first), max(0, last - data.shape[i + 1] + 1)))
+    data = np.pad(data, pad_width=pad_width, mode='constant', constant_values=0)
+
+    for rh, taps_h, start_h, step_h, count_h in phases[0]:
+        for rw, taps_w, start_w, step_w, count_w in phases[1]:
+            base = data[:, start_h + pad_width[1][0]:, start_w + pad_width[2][0]:]
+            view = as_strided(base,
+                              shape=(count_h, count_w, base.shape[0], len(taps_h), len(taps_w)),
+                              strides=((base.strides[1], base.strides[2], base.strides[0],
+                                        base.strides[1] * step_h, base.strides[2] * step_w)),
+                              writeable=False)
+            _convolve_tiled(view, weight[:, :, taps_h, :][:, :, :, taps_w], groups,
+                            output[:, rh::fractional_stride[0], rw::fractional_stride[1]], gemm)
+
+    return output
+
+
 def convtranspose2d(
         data,
         weight,
@@ -150,29 +620,84 @@ def convtranspose2d(
         fractional_stride,
         output_pad,
         groups=1,
+        blas=False,
 ) -> ArrayLike:
     """
     Compute a transposed 2D convolution.
+    When `blas` is set, use exact float64 GEMM where possible.
     """
+    if batched(data, input_size):
+        return np.stack([convtranspose2d(d, weight, bias, input_size, output_size, kernel_size,
+                                         stride, pad, dilation, fractional_stride, output_pad,
+                                         groups, blas)
+                         for d in data])
+
+    data = np.asarray(data, dtype=np.int64)  # Activations may be stored in a narrower type
+
+    if stride[0] > 1 or stride[1] > 1:
+        # Not supported by the polyphase implementation, use zero insertion
+        return conv2d(
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            (
+                dilation[0] * (kernel_size[0] - 1) - pad[0],
+                dilation[1] * (kernel_size[1] - 1) - pad[1]
+            ),
+            dilation,
+            fractional_stride,
+            output_pad,
+            groups,
+            blas,
+        )
+
+    assert data.shape == tuple(input_size)
 
-    return conv2d(
+    output = _convtranspose_polyphase(
         data,
         weight,
-        bias,
-        input_size,
         output_size,
-        kernel_size,
-        stride,
-        (
-            dilation[0] * (kernel_size[0] - 1) - pad[0],
-            dilation[1] * (kernel_size[1] - 1) - pad[1]
-        ),
+        pad,
         dilation,
         fractional_stride,
         output_pad,
         groups,
+        blas,
     )
 
+    # Apply bias
+    if bias is not None:
+        for k in range(output_size[0]):
+            output[k] += bias[k]
+
+    if state.debug:
+        # Slow, using zero insertion
+        ref = conv2d(
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            (
+                dilation[0] * (kernel_size[0] - 1) - pad[0],
+                dilation[1] * (kernel_size[1] - 1) - pad[1]
+            ),
+            dilation,
+            fractional_stride,
+            output_pad,
+            groups,
+        )
+        if not np.array_equal(ref, output):
+            eprint('Polyphase <-> zero insertion mismatch in compute.convtranspose2d')
+
+    return output
+
 
 def conv1d(
         data,
@@ -180,27 +705,32 @@ def conv1d(
         bias,
         input_size,
         output_size,
-        kernel_size,
+        kernel_size,  # pylint: disable=unused-argument
         stride,
         pad,
         dilation,
         fractional_stride=1,
         output_pad=0,
         groups=1,
+        blas=False,
 ) -> ArrayLike:
     """
     Compute a 1D convolution.
 
-    Note that all PyTorch numbers are ordered (C, L)
+    Note that all PyTorch numbers are ordered (C, L). `data` may have an additional leading
+    batch dimension (N, C, L). When `blas` is set, use exact float64 GEMM where possible.
     """
+    if batched(data, input_size):
+        return np.stack([conv1d(d, weight, bias, input_size, output_size, kernel_size, stride,
+                                pad, dilation, fractional_stride, output_pad, groups, blas)
+                         for d in data])
+
     assert data.shape == tuple(input_size)
-    in_channels = input_size[0]
     out_channels = output_size[0]
 
     weight = weight.reshape(out_channels, input_size[0] // groups, -1)
-    data = data.reshape(input_size[0], -1)
-
-    output = np.empty(shape=(output_size[0], output_size[1]), dtype=np.int64)
+    data = np.asarray(data, dtype=np.int64).reshape(input_size[0], -1)
+    gemm = _use_gemm(data, weight, weight[0].size, blas)
 
     # Stretch data for fractionally-strided convolution
     if fractional_stride > 1:
@@ -215,31 +745,17 @@ def conv1d(
         data = np.pad(data, pad_width=((0, 0), (pad, pad + output_pad)),
                       mode='constant', constant_values=0)
 
-    if dilation > 1:
-        # Stretch weights for dilation
-        nweight = np.zeros((weight.shape[0], weight.shape[1],
-                            (kernel_size - 1) * dilation + 1),
-                           dtype=weight.dtype)
-        nweight[:, :, 0::dilation] = weight
-        weight = nweight
-
-    ll = (data.shape[1] - weight.shape[2]) // stride + 1  # Resulting output length
+    # Dilation is handled by striding the kernel window over the input
+    ll = (data.shape[1] - (weight.shape[2] - 1) * dilation - 1) \
+        // stride + 1  # Resulting output length
 
     view = as_strided(data,
                       shape=(ll, data.shape[0], weight.shape[2]),
                       strides=((data.strides[1] * stride,
-                                data.strides[0], data.strides[1])),
+                                data.strides[0], data.strides[1] * dilation)),
                       writeable=False)
 
-    if groups > 1:
-        nweight = np.zeros((weight.shape[0], in_channels, weight.shape[2]),
-                           dtype=weight.dtype)
-        for i in range(weight.shape[0]):
-            for j in range(in_channels // groups):
-                nweight[i, i * (in_channels // groups) + j, :] = weight[i, j, :]
-        weight = nweight
-
-    output = np.tensordot(view, weight, axes=((1, 2), (1, 2))).transpose(1, 0)
+    output = _convolve(view, weight, groups, gemm).transpose(1, 0)
 
     # Apply bias
     if bias is not None:
@@ -265,59 +781,259 @@ def convtranspose1d(
         fractional_stride,
         output_pad,
         groups=1,
+        blas=False,
 ) -> ArrayLike:
     """
     Compute a transposed 1D convolution.
+    When `blas` is set, use exact float64 GEMM where possible.
     """
+    if batched(data, input_size):
+        return np.stack([convtranspose1d(d, weight, bias, input_size, output_size, kernel_size,
+                                         stride, pad, dilation, fractional_stride, output_pad,
+                                         groups, blas)
+                         for d in data])
+
+    data = np.asarray(data, dtype=np.int64)  # Activations may be stored in a narrower type
+
+    if stride > 1:
+        # Not supported by the polyphase implementation, use zero insertion
+        return conv1d(
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            dilation * (kernel_size - 1) - pad,
+            dilation,
+            fractional_stride=fractional_stride,
+            output_pad=output_pad,
+            groups=groups,
+            blas=blas,
+        )
 
-    return conv1d(
-        data,
-        weight,
-        bias,
-        input_size,
-        output_size,
-        kernel_size,
-        stride,
-        dilation * (kernel_size - 1) - pad,
-        dilation,
-        fractional_stride=fractional_stride,
-        output_pad=output_pad,
-        groups=groups,
-    )
+    assert data.shape == tuple(input_size)
+    out_channels = output_size[0]
+
+    # Use the 2D implementation with a trailing dimension of 1
+    output = _convtranspose_polyphase(
+        data.reshape(input_size[0], -1, 1),
+        weight.reshape(out_channels, input_size[0] // groups, -1, 1),
+        (out_channels, output_size[1], 1),
+        (pad, 0),
+        (dilation, 1),
+        (fractional_stride, 1),
+        (output_pad, 0),
+        groups,
+        blas,
+    ).reshape(out_channels, output_size[1])
+
+    # Apply bias
+    if bias is not None:
+        for k in range(out_channels):
+            output[k] += bias[k]
+
+    if state.debug:
+        # Slow, using zero insertion
+        ref = conv1d(
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            dilation * (kernel_size - 1) - pad,
+            dilation,
+            fractional_stride=fractional_stride,
+            output_pad=output_pad,
+            groups=groups,
+        )
+        if not np.array_equal(ref, output):
+            eprint('Polyphase <-> zero insertion mismatch in compute.convtranspose1d')
+
+    return output
 
 
 def linear(
-        layer,
+        layer,  # pylint: disable=unused-argument
         data,
         weight,
         bias,
         in_features,
         out_features,
+        blas=False,
 ) -> ArrayLike:
     """
     Compute a fully connected layer.
+    `data` may have an additional leading batch dimension (N, in_features). When `blas` is set,
+    use exact float64 GEMM where possible.
     """
-    output = np.empty(out_features, dtype=np.int64)
+    batch = batched(data, (in_features,))
+    data = np.asarray(data, dtype=np.int64).reshape(-1, in_features)
+    weight = np.asarray(weight, dtype=np.int64).reshape(out_features, in_features)
 
-    for w in range(out_features):
-        val = np.int64(0)
-        for n in range(in_features):
-            val += data[n] * weight[w][n]
-            stats.account(
-                layer,
-                "true_sw_macc",
-                1,
-            )
-            debug_print(
-                f'w={w}, n={n}, weight={weight[w][n]}, data={data[n]} '
-                f'-> accumulator = {val} '
-            )
-        if bias is not None:
-            val += bias[w]
-            debug_print(f'+bias {bias[w]} --> output[{w}] = {val}')
-        output[w] = val
+    if _use_gemm(data, weight, in_features, blas):
+        # float64 BLAS matmul, exact for these magnitudes
+        mdata, mweight = data.astype(np.float64), weight.astype(np.float64)
+    else:
+        # Integer matmul is exact (no BLAS, no floating point)
+        mdata, mweight = data, weight
+
+    output = np.empty((data.shape[0], out_features), dtype=np.int64)
+
+    def block(start, stop):
+        output[:, start:stop] = mdata @ mweight[start:stop].T
+
+    # Split the output features between `state.sim_threads` threads
+    _parallel(block, out_features)
+
+    if state.debug_computation:
+        # Trace every MAC, using running sums instead of a scalar accumulator, followed by the
+        # bias for each output, in chunks of whole outputs
+        columns = in_features + (bias is not None)
+        rows = max(1, _TRACE_CHUNK // columns)
+        for b in range(data.shape[0]):
+            for start in range(0, out_features, rows):
+                w = weight[start:start + rows]
+                records = np.empty((w.shape[0], columns), dtype=TRACE_DTYPE)
+                records['sample'] = b
+                records['out'] = np.arange(start, start + w.shape[0])[:, np.newaxis]
+                records['in'][:, :in_features] = np.arange(in_features)
+                records['weight'][:, :in_features] = w
+                records['data'][:, :in_features] = data[b]
+                records['accumulator'][:, :in_features] = np.cumsum(w * data[b], axis=1)
+                if bias is not None:
+                    records['in'][:, -1] = -1
+                    records['weight'][:, -1] = bias[start:start + rows]
+                    records['data'][:, -1] = 1
+                    records['accumulator'][:, -1] = \
+                        output[b, start:start + rows] + bias[start:start + rows]
+                debug_trace(records.reshape(-1))
+
+    if bias is not None:
+        output += np.asarray(bias, dtype=np.int64)
+
+    return output if batch else output[0]
+
+
+def _pool_axis(
+        data,
+        axis,
+        length,
+        pool,
+        stride,
+        dilation,
+        average,
+) -> np.ndarray:
+    """
+    Reduce `length` windows of `pool` elements (every `dilation`-th element, windows `stride`
+    elements apart) along `axis` of integer `data`. Return the window sums when `average` is
+    set, and the window maxima otherwise.
+
+    Windows that extend past the end of the data only use the available elements. Sums of
+    pools with at least _SAT_POOL elements are the difference of two prefix sums (a summed-area
+    table when applied to both axes) instead of a reduction over all window elements.
+    """
+    data = np.moveaxis(data, axis, -1)
+    span = (length - 1) * stride + (pool - 1) * dilation + 1
+
+    if average and pool >= _SAT_POOL:
+        # Prefix sums over every dilation-th element, preceded by `dilation` zeros
+        steps = -(-span // dilation)
+        used = min(data.shape[-1], steps * dilation)
+        table = np.zeros(data.shape[:-1] + ((steps + 1) * dilation,), dtype=np.int64)
+        table[..., dilation:dilation + used] = data[..., :used]
+        residues = table.reshape(data.shape[:-1] + (steps + 1, dilation))
+        np.cumsum(residues, axis=-2, out=residues)
+
+        start = np.arange(length) * stride
+        reduced = table[..., start + pool * dilation] - table[..., start]
+    else:
+        fill = 0 if average else np.iinfo(data.dtype).min
+        if span > data.shape[-1]:
+            data = np.pad(data, [(0, 0)] * (data.ndim - 1) + [(0, span - data.shape[-1])],
+                          mode='constant', constant_values=fill)
+        view = as_strided(data,
+                          shape=data.shape[:-1] + (length, pool),
+                          strides=data.strides[:-1] + (data.strides[-1] * stride,
+                                                       data.strides[-1] * dilation),
+                          writeable=False)
+        reduced = np.sum(view, axis=-1, dtype=np.int64) if average else np.amax(view, axis=-1)
+
+    return np.moveaxis(reduced, -1, axis)
+
+
+def _window_counts(
+        size,
+        length,
+        pool,
+        stride,
+        dilation,
+) -> np.ndarray:
+    """
+    Return the number of elements that each of `length` pooling windows covers along an axis
+    of `size` elements.
+    """
+    start = np.arange(length) * stride
+    return np.minimum(pool, (size - 1 - start) // dilation + 1)
 
-    return output
+
+def _average(
+        sums,
+        count,
+        floor=True,
+) -> np.ndarray:
+    """
+    Divide the integer `sums` of pooling windows by the window element `count`, truncating
+    towards zero when `floor` is set, or rounding half away from zero otherwise, and clip the
+    result to 8 bits. This matches the hardware average pooling for both `--avg-pool-rounding`
+    modes.
+    """
+    magnitude = np.abs(sums)
+    if floor:
+        magnitude //= count
+    else:
+        magnitude = (2 * magnitude + count) // (2 * count)
+
+    return np.where(sums < 0, -magnitude, magnitude).clip(min=-128, max=127)
+
+
+def _pool2d_reference(
+        data,
+        output_size,
+        pool,
+        stride,
+        average,
+        dilation,
+        floor,
+) -> np.ndarray:
+    """
+    Independent reference for pool2d() in debug mode. All pooling windows are gathered using
+    explicit index arrays, and averages are computed in floating point.
+    """
+    def indices(size, length, axis):
+        # (length, pool) element indices and whether they are inside the data
+        index = np.arange(length)[:, np.newaxis] * stride[axis] \
+            + np.arange(pool[axis])[np.newaxis, :] * dilation[axis]
+        return np.minimum(index, size - 1), index < size
+
+    rows, row_valid = indices(data.shape[1], output_size[1], 0)
+    cols, col_valid = indices(data.shape[2], output_size[2], 1)
+
+    # (C, H, W, pool rows, pool cols)
+    windows = data[:, rows[:, np.newaxis, :, np.newaxis], cols[np.newaxis, :, np.newaxis, :]]
+    valid = row_valid[:, np.newaxis, :, np.newaxis] & col_valid[np.newaxis, :, np.newaxis, :]
+
+    if not average:
+        return np.where(valid, windows, np.iinfo(windows.dtype).min).max(axis=(3, 4))
+
+    avg = np.where(valid, windows, 0).sum(axis=(3, 4)) / valid.sum(axis=(2, 3))
+    if not floor:
+        avg += np.where(avg < 0., -0.5, 0.5)
+    return np.where(avg < 0., np.ceil(avg), np.floor(avg)).astype(np.int64) \
+        .clip(min=-128, max=127)
 
 
 def pool2d(
@@ -332,62 +1048,37 @@ def pool2d(
 ):
     """
     Compute 2D Pooling (Average or Max)
+    `data` may have an additional leading batch dimension (N, C, H, W).
     """
+    if batched(data, input_size):
+        # Pool the batch as N * C channels
+        return pool2d(
+            data.reshape((-1,) + tuple(input_size[1:])),
+            (data.shape[0] * input_size[0],) + tuple(input_size[1:]),
+            (data.shape[0] * output_size[0],) + tuple(output_size[1:]),
+            pool,
+            stride,
+            average,
+            dilation=dilation,
+            floor=floor,
+        ).reshape((data.shape[0],) + tuple(output_size))
+
     assert data.shape == tuple(input_size)
+    data = np.asarray(data, dtype=np.int64)  # Activations may be stored in a narrower type
 
     if state.debug:
-        # Slow using pure Python
-        ref = np.empty(shape=output_size, dtype=np.int64)
-
-        for c in range(input_size[0]):
-            for row in range(0, output_size[1]*stride[0], stride[0]):
-                for col in range(0, output_size[2]*stride[1], stride[1]):
-                    if average:
-                        avg = np.mean(data[c][row:row+pool[0]*dilation[0]:dilation[0],
-                                              col:col+pool[1]*dilation[1]:dilation[1]])
-                        if floor:
-                            if avg < 0.:
-                                val = np.ceil(avg).astype(np.int64).clip(min=-128, max=127)
-                            else:
-                                val = np.floor(avg).astype(np.int64).clip(min=-128, max=127)
-                        else:
-                            if avg < 0.:
-                                val = np.ceil(avg - 0.5).astype(np.int64).clip(min=-128, max=127)
-                            else:
-                                val = np.floor(avg + 0.5).astype(np.int64).clip(min=-128, max=127)
-                    else:
-                        val = np.amax(data[c][row:row+pool[0]*dilation[0]:dilation[0],
-                                              col:col+pool[1]*dilation[1]:dilation[1]])
-                    ref[c][row//stride[0]][col//stride[1]] = val
-
-    # Fast computation using NumPy
-    data_pad = data[
-        :,
-        :(data.shape[1] - pool[0] + dilation[0] - 1) // stride[0] * stride[0] + pool[0],
-        :(data.shape[2] - pool[1] + dilation[1] - 1) // stride[1] * stride[1] + pool[1],
-        ...
-    ]
-    h, w = data_pad.strides[1:]
-
-    view = as_strided(data_pad,
-                      shape=(data_pad.shape[0],
-                             1 + (data_pad.shape[1] - pool[0] - dilation[0] + 1) // stride[0],
-                             1 + (data_pad.shape[2] - pool[1] - dilation[1] + 1) // stride[1],
-                             pool[0], pool[1]),
-                      strides=(data_pad.strides[0], stride[0] * h,
-                               stride[1] * w, h * dilation[0], w * dilation[1]),
-                      writeable=False)
+        ref = _pool2d_reference(data, output_size, pool, stride, average, dilation, floor)
+
+    # Fast computation using NumPy, separable: reduce the rows, then the columns
+    pooled = _pool_axis(data, 1, output_size[1], pool[0], stride[0], dilation[0], average)
+    pooled = _pool_axis(pooled, 2, output_size[2], pool[1], stride[1], dilation[1], average)
 
     if average:
-        if floor:
-            pooled = np.nanmean(view, dtype=np.int64, axis=(3, 4))
-        else:
-            pooled = np.mean(view, axis=(3, 4))
-            pooled = np.ceil(pooled - 0.5, where=pooled < 0., out=pooled)
-            pooled = np.floor(pooled + 0.5, where=pooled >= 0., out=pooled) \
-                .astype(np.int64).clip(min=-128, max=127)
-    else:
-        pooled = np.nanmax(view, axis=(3, 4))
+        count = np.outer(
+            _window_counts(input_size[1], output_size[1], pool[0], stride[0], dilation[0]),
+            _window_counts(input_size[2], output_size[2], pool[1], stride[1], dilation[1]),
+        )
+        pooled = _average(pooled, count, floor)
 
     if state.debug:
         match = (ref == pooled).all()
@@ -407,25 +1098,34 @@ def pool1d(
         stride,
         average,
         dilation=1,
-        floor=True,  # pylint: disable=unused-argument
+        floor=True,
 ) -> ArrayLike:
     """
     Compute 1D Pooling (Average or Max)
+    `data` may have an additional leading batch dimension (N, C, L).
+    Average pooling truncates towards zero when `floor` is set, and rounds to nearest otherwise.
     """
+    if batched(data, input_size):
+        # Pool the batch as N * C channels
+        return pool1d(
+            data.reshape((-1,) + tuple(input_size[1:])),
+            (data.shape[0] * input_size[0],) + tuple(input_size[1:]),
+            (data.shape[0] * output_size[0],) + tuple(output_size[1:]),
+            pool,
+            stride,
+            average,
+            dilation=dilation,
+            floor=floor,
+        ).reshape((data.shape[0],) + tuple(output_size))
+
     assert data.shape == tuple(input_size)
+    data = np.asarray(data, dtype=np.int64)  # Activations may be stored in a narrower type
 
-    pooled = np.empty(shape=output_size, dtype=np.int64)
-    for c in range(input_size[0]):
-        for x in range(0, output_size[1]*stride, stride):
-            if average:
-                avg = np.average(data[c][x:x+pool*dilation:dilation])
-                if avg < 0:
-                    val = np.ceil(avg).astype(np.int64).clip(min=-128, max=127)
-                else:
-                    val = np.floor(avg).astype(np.int64).clip(min=-128, max=127)
-            else:
-                val = np.amax(data[c][x:x+pool])
-            pooled[c][x//stride] = val
+    pooled = _pool_axis(data, 1, output_size[1], pool, stride, dilation, average)
+    if average:
+        pooled = _average(pooled,
+                          _window_counts(input_size[1], output_size[1], pool, stride, dilation),
+                          floor)
 
     return pooled
 
@@ -437,25 +1137,18 @@ def eltwise(
 ) -> ArrayLike:
     """
     Compute element-wise operation.
+    The operands may have an additional leading batch dimension (N, C, H, W).
+    All operands are combined in a single reduction over the leading operand axis of `data`,
+    into a newly allocated output.
     """
-    assert data[0].shape == tuple(input_size)
-    operands = len(data)
-
-    output = data[0]
-    for i in range(1, operands):
-        if operator == op.ELTWISE_ADD:
-            output = np.add(output, data[i])
-        elif operator == op.ELTWISE_MUL:
-            output = np.multiply(output, data[i])
-        elif operator == op.ELTWISE_OR:
-            output = np.bitwise_or(output, data[i])
-        elif operator == op.ELTWISE_SUB:
-            output = np.subtract(output, data[i])
-        elif operator == op.ELTWISE_XOR:
-            output = np.bitwise_xor(output, data[i])
-        else:
-            print(f"Unknown operator `{op.string(operator)}`")
-            raise NotImplementedError
+    assert data[0].shape[-len(input_size):] == tuple(input_size)
+
+    ufunc = _ELTWISE_UFUNCS.get(operator)
+    if ufunc is None:
+        print(f"Unknown operator `{op.string(operator)}`")
+        raise NotImplementedError
+
+    output = np.empty(data[0].shape, dtype=np.int64)
+    ufunc.reduce(np.asarray(data), axis=0, dtype=np.int64, out=output)
 
-    assert output.shape == tuple(input_size)
     return output
@@ -0,0 +1,333 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Data memory placement check of the generated register program.
+The emulator records the register and data memory writes of an apbaccess.APB object. For each
+layer, it reads the input from the emulated data memory using the programmed read pointer,
+processor enables and input passes, and writes the simulated output to the processors and
+addresses that the programmed write pointer and output passes select. The data memory is then
+compared to the expected output emitted by unload.verify(). This checks processor maps, memory
+offsets, multi-pass layout and layer chaining without an RTL simulation.
+The layers are not computed from the kernel and bias memories, so the kernel map, kernel
+offsets and bias placement are not checked.
+Conv2d, Conv1d and linear layers in HWC format with 8-bit output and contiguous output
+processors are emulated. For streaming layers, whose input and output are circular buffers,
+only the processor enables, write pointer and rollover buffer are checked. The output of
+layers that are not emulated is taken from the expected data.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import tornadocnn as tc
+from .names import layer_str
+from .utils import ffs
+
+MAX_MESSAGES = 10  # Number of mismatches that are reported individually
+
+
+class Emulator:
+    """
+    Emulated data memory and registers of the CNN accelerator.
+    """
+    def __init__(self):
+        self.instances = tc.dev.P_NUMPRO // tc.dev.P_SHARED  # Data memories per group
+        self.words = tc.dev.INSTANCE_SIZE * 4  # Address space per data memory, in words
+        shape = (tc.dev.P_NUMGROUPS, self.instances, self.words)
+        self.data = np.zeros(shape, dtype=np.uint32)
+        self.valid = np.zeros(shape, dtype=bool)
+        self.registers: Dict[int, int] = {}
+        self.expected: List[Tuple[int, int, int]] = []
+
+        self.layers = self.skipped = self.streamed = self.compared = 0
+        self.messages: List[str] = []
+        self.errors = 0
+
+    def _index(
+            self,
+            addr: int,
+    ) -> Optional[Tuple[int, int, int]]:
+        """
+        Return the group, data memory and word of the data memory address `addr`, or None when
+        `addr` is not in the data memory.
+        """
+        offs = addr - tc.dev.C_SRAM_BASE
+        if offs < 0:
+            return None
+        group, offs = divmod(offs, tc.dev.C_GROUP_OFFS)
+        instance, offs = divmod(offs, self.words * 4)
+        if group >= tc.dev.P_NUMGROUPS or instance >= self.instances:
+            return None
+        return group, instance, offs // 4
+
+    def _report(
+            self,
+            message: str,
+    ) -> None:
+        """
+        Count an error, and keep the first MAX_MESSAGES messages.
+        """
+        self.errors += 1
+        if len(self.messages) < MAX_MESSAGES:
+            self.messages.append(message)
+
+    def write(
+            self,
+            addr: int,
+            val: int,
+    ) -> None:
+        """
+        Record the write of `val` to address `addr` (without the APB base).
+        """
+        index = self._index(addr)
+        if index is None:
+            self.registers[addr] = val
+        else:
+            self.data[index] = val
+            self.valid[index] = True
+
+    def register(
+            self,
+            group: int,
+            layer: int,
+            reg: int,
+    ) -> int:
+        """
+        Return the value of layer register `reg` of hardware layer `layer` in `group`.
+        Registers that were not written keep their reset value of 0.
+        """
+        return self.registers.get(tc.lreg_addr(group, reg, layer), 0)
+
+    def expect(
+            self,
+            addr: int,
+            val: int,
+            mask: Optional[int] = None,
+            num_bytes: int = 4,
+            first_proc: int = 0,
+    ) -> None:
+        """
+        Record that the data memory at `addr` should contain `val` (see APB.verify()).
+        """
+        if mask is None:
+            mask = 2**(8 * num_bytes) - 1
+        mask = mask << 8 * first_proc & 0xffffffff
+        self.expected.append((addr, val & mask, mask))
+
+    def _processors(
+            self,
+            processor_map: int,
+    ) -> np.ndarray:
+        """
+        Return the processors in `processor_map`.
+        """
+        return np.array([p for p in range(tc.dev.MAX_PROC) if processor_map >> p & 1],
+                        dtype=np.int64)
+
+    def run_layer(
+            self,
+            ll: int,
+            hw_layer: int,
+            data: Optional[np.ndarray],
+            out_buf: np.ndarray,
+            processor_map: int,
+            output_processor_map: int,
+            out_ignore: int = 0,
+            supported: bool = True,
+            loaded: bool = True,
+            streaming: bool = False,
+    ) -> None:
+        """
+        Emulate layer `ll` (hardware layer `hw_layer`) with the input `data` (C, H, W) or
+        (C, L) (None when unknown) and the simulated output `out_buf` (C, H, W) or (C, L).
+        The output is not computed from the kernel memory. When the input is `loaded`,
+        it must have been written to the data memory (otherwise, such as for input data that
+        is loaded by the application, only the values that were written are compared).
+        The input and output of `streaming` layers are circular buffers, so only their
+        pointers are checked. When the layer is not `supported` or `streaming`, its expected
+        output is copied to the data memory by check().
+        """
+        self.layers += 1
+        if not supported:
+            self.skipped += 1
+            return
+        group = ffs(processor_map) // tc.dev.P_NUMPRO
+        # 1D data is stored like 2D data with a width of 1
+        if data is not None and data.ndim == 2:
+            data = data[:, :, np.newaxis]
+        if out_buf.ndim == 2:
+            out_buf = out_buf[:, :, np.newaxis]
+
+        # Processor enables (the upper half of the register contains the mask enables)
+        enables = 0
+        for g in range(tc.dev.P_NUMGROUPS):
+            enables |= (self.register(g, hw_layer, tc.dev.LREG_ENA)
+                        & 2**tc.dev.P_NUMPRO - 1) << g * tc.dev.P_NUMPRO
+        if enables != processor_map:
+            self._report(f'Layer {layer_str(ll)}: The processor enables 0x{enables:016x} do '
+                         f'not match the processor map 0x{processor_map:016x}.')
+
+        # Multi-pass: LCTL2 contains the number of input passes and the output pixel stride,
+        # WPTR_CHOFFS the offset between output passes
+        lctl2 = self.register(group, hw_layer, tc.dev.LREG_LCTL2)
+        in_expand = (lctl2 & 0x0f) + 1
+        out_stride = (lctl2 >> 4 & 2**tc.dev.MAX_WPTRINC_BITS - 1) + 1
+        choffs = self.register(group, hw_layer, tc.dev.LREG_WPTR_CHOFFS)
+        out_expand = out_stride // choffs if choffs > 0 else 1
+
+        # The write pointer selects the data memory of the first output channel; the byte
+        # lane follows the kernel placement of the first output processor
+        wptr = self.register(group, hw_layer, tc.dev.LREG_WPTR_BASE)
+        offs = (wptr & 2**tc.dev.WRITE_PTR_SHIFT - 1) + out_ignore // 4
+        out_thresh = (out_buf.shape[0] + out_expand - 1) // out_expand
+        first = (wptr >> tc.dev.WRITE_PTR_SHIFT) * tc.dev.P_SHARED \
+            + ffs(output_processor_map) % tc.dev.P_SHARED
+        written = (2**out_thresh - 1) << first
+        if written != output_processor_map:
+            self._report(f'Layer {layer_str(ll)}: The write pointer 0x{wptr:08x} writes '
+                         f'{out_expand} {"passes" if out_expand > 1 else "pass"} to '
+                         f'processors 0x{written:016x} instead of the output processor map '
+                         f'0x{output_processor_map:016x}.')
+
+        rptr = self.register(group, hw_layer, tc.dev.LREG_RPTR_BASE)
+        if streaming:
+            self.streamed += 1
+            rollover = self.register(group, hw_layer, tc.dev.LREG_FMAX)
+            if rollover > 0:
+                self._check_rollover(ll, rptr, rollover, enables, offs - out_ignore // 4,
+                                     written)
+            return
+
+        # Read the input using the read pointer. Channel c of multi-pass input is in pass
+        # c // in_thresh, and each pixel contains all passes.
+        if data is not None:
+            in_thresh = (data.shape[0] + in_expand - 1) // in_expand
+            procs = self._processors(enables)
+            if len(procs) < in_thresh \
+               or rptr + data.shape[1] * data.shape[2] * in_expand > self.words:
+                self._report(f'Layer {layer_str(ll)}: The input of {data.shape[0]} channels '
+                             f'in {in_expand} {"passes" if in_expand > 1 else "pass"} at read '
+                             f'pointer 0x{rptr:04x} does not fit the enabled processors and '
+                             'data memory.')
+            else:
+                index, shift = self._locate(procs[:in_thresh], data.shape, rptr, in_expand, 1)
+                read = self.data[index] >> shift & 0xff
+                expected = data.reshape(data.shape[0], -1).astype(np.int64) & 0xff
+                mismatch = np.argwhere(~self.valid[index] & loaded
+                                       | self.valid[index] & (read != expected))
+                if len(mismatch) > 0:
+                    c, doffs = mismatch[0]
+                    row, col = divmod(int(doffs), data.shape[2])
+                    self._report(f'Layer {layer_str(ll)}: {len(mismatch)} input values read '
+                                 f'using read pointer 0x{rptr:04x} do not match the output of '
+                                 f'the previous layer, first at CHW={c},{row},{col} (processor '
+                                 f'{procs[c % in_thresh]}): 0x{int(read[c, doffs]):02x} '
+                                 f'instead of 0x{int(expected[c, doffs]):02x}.')
+
+        # Write the output using the write pointer
+        if first + out_thresh > tc.dev.MAX_PROC \
+           or offs + out_buf.shape[1] * out_buf.shape[2] * out_stride > self.words:
+            self._report(f'Layer {layer_str(ll)}: The output of {out_buf.shape[0]} channels at '
+                         f'write pointer 0x{wptr:08x} does not fit the output processors and '
+                         'data memory.')
+            return
+        index, shift = self._locate(np.arange(first, first + out_thresh, dtype=np.int64),
+                                    out_buf.shape, offs, out_stride, choffs)
+        values = out_buf.reshape(out_buf.shape[0], -1).astype(np.int64) & 0xff
+        for lane in range(tc.dev.P_SHARED):
+            # Channels in the same byte lane are in different data memories or passes
+            sel = shift[:, 0] == 8 * lane
+            if not np.any(sel):
+                continue
+            lane_index = tuple(i[sel] for i in index)
+            self.data[lane_index] = self.data[lane_index] \
+                & np.uint32(~(0xff << 8 * lane) & 0xffffffff) \
+                | (values[sel] << 8 * lane).astype(np.uint32)
+            self.valid[lane_index] = True
+
+    def _locate(
+            self,
+            procs: np.ndarray,
+            shape: Tuple[int, ...],
+            offs: int,
+            stride: int,
+            pass_offs: int,
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Return the data memory index (C, H*W) and byte shift (C, 1) of each value of a tensor
+        of `shape` (C, H, W) on processors `procs`, starting at word `offs`, with `stride`
+        words per pixel and `pass_offs` words between the passes of multi-pass data.
+        """
+        c = np.arange(shape[0])
+        proc = procs[c % len(procs)][:, np.newaxis]
+        words = offs + (c // len(procs) * pass_offs)[:, np.newaxis] \
+            + np.arange(shape[1] * shape[2])[np.newaxis, :] * stride
+        index = (np.broadcast_to(proc // tc.dev.P_NUMPRO, words.shape),
+                 np.broadcast_to(proc % tc.dev.P_NUMPRO // tc.dev.P_SHARED, words.shape),
+                 words)
+        return index, (8 * (proc % tc.dev.P_SHARED)).astype(np.uint32)
+
+    def _check_rollover(
+            self,
+            ll: int,
+            rptr: int,
+            rollover: int,
+            enables: int,
+            wptr: int,
+            written: int,
+    ) -> None:
+        """
+        Check the circular input buffer of streaming layer `ll` of `rollover` words at read
+        pointer `rptr` on the `enables` processors against the data memory size, and against
+        an output buffer of the same size at word `wptr` on the `written` processors.
+        """
+        if rptr + rollover > self.words:
+            self._report(f'Layer {layer_str(ll)}: The streaming input buffer at read pointer '
+                         f'0x{rptr:04x} with rollover 0x{rollover:04x} exceeds the data memory.')
+        if enables & written != 0 \
+           and rptr < wptr + rollover and wptr < rptr + rollover:
+            self._report(f'Layer {layer_str(ll)}: The streaming input buffer at read pointer '
+                         f'0x{rptr:04x} with rollover 0x{rollover:04x} overlaps the output at '
+                         f'0x{wptr:04x}.')
+
+    def check(
+            self,
+            ll: int,
+            supported: bool = True,
+    ) -> None:
+        """
+        Compare the data memory to the expected output of layer `ll` recorded since the last
+        check. When the layer is not `supported`, store the expected output instead.
+        """
+        expected, self.expected = self.expected, []
+        for addr, val, mask in expected:
+            index = self._index(addr)
+            if index is None:
+                continue  # Not in the data memory (such as the mlator registers)
+            if not supported:
+                self.data[index] = int(self.data[index]) & ~mask | val
+                self.valid[index] = True
+                continue
+            self.compared += 1
+            read = int(self.data[index]) & mask
+            if not self.valid[index] or read != val:
+                self._report(f'Layer {layer_str(ll)}: Data memory address 0x{addr:08x} '
+                             + (f'contains 0x{read:08x}' if self.valid[index] else
+                                'was not written')
+                             + f' instead of the expected 0x{val:08x} (mask 0x{mask:08x}).')
+
+    def summary(self) -> str:
+        """
+        Return a summary of the emulation.
+        """
+        s = f'Emulated {self.layers - self.skipped} of {self.layers} layers ' \
+            f'({self.streamed} streaming, pointers only), and compared {self.compared} words ' \
+            'of expected output: '
+        if self.errors == 0:
+            return s + 'no mismatches.'
+        return s + f'{self.errors} mismatch{"es" if self.errors != 1 else ""}.\n' \
+            + '\n'.join(self.messages)
@@ -0,0 +1,358 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Compute engines for the simulator.
+Each engine provides the Conv1d, Conv2d, ConvTranspose2d, Pool1d, Pool2d, Eltwise, and Linear
+operators used by izer.simulate. `state.compute_engine` selects the engine. When
+`state.compute_verify` names a second engine, every operator is computed by both engines and
+the first mismatching layer is reported.
+"""
+from typing import Dict
+
+import numpy as np
+import torch
+
+from . import compute, state
+from .eprint import eprint
+from .names import layer_str
+
+
+class Engine:
+    """
+    Integer NumPy engine (izer.compute). This is the bit-exact reference, and the base class of
+    all engines; other engines override the operators they compute differently.
+    """
+    def conv2d(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute a 2D convolution, see compute.conv2d()
+        """
+        return compute.conv2d(*args, **kwargs)
+
+    def convtranspose2d(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute a transposed 2D convolution, see compute.convtranspose2d()
+        """
+        return compute.convtranspose2d(*args, **kwargs)
+
+    def conv1d(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute a 1D convolution, see compute.conv1d()
+        """
+        return compute.conv1d(*args, **kwargs)
+
+    def linear(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute a fully connected layer, see compute.linear()
+        """
+        return compute.linear(*args, **kwargs)
+
+    def eltwise(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute an element-wise operation, see compute.eltwise()
+        """
+        return compute.eltwise(*args, **kwargs)
+
+    def pool2d(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute 2D pooling, see compute.pool2d()
+        """
+        return compute.pool2d(*args, **kwargs)
+
+    def pool1d(self, *args, **kwargs) -> np.ndarray:
+        """
+        Compute 1D pooling, see compute.pool1d()
+        """
+        return compute.pool1d(*args, **kwargs)
+
+
+class BLASEngine(Engine):
+    """
+    Exact float64 BLAS GEMM engine. Convolutions and linear layers fall back to integer
+    arithmetic when the result might not be exact.
+    """
+    def conv2d(self, *args, **kwargs) -> np.ndarray:
+        return compute.conv2d(*args, blas=True, **kwargs)
+
+    def convtranspose2d(self, *args, **kwargs) -> np.ndarray:
+        return compute.convtranspose2d(*args, blas=True, **kwargs)
+
+    def conv1d(self, *args, **kwargs) -> np.ndarray:
+        return compute.conv1d(*args, blas=True, **kwargs)
+
+    def linear(self, *args, **kwargs) -> np.ndarray:
+        return compute.linear(*args, blas=True, **kwargs)
+
+
+class TorchEngine(Engine):
+    """
+    PyTorch CPU engine, computing convolutions and linear layers in float64. Layers where the
+    result might not be exact, and configurations that PyTorch does not support, fall back to
+    the integer NumPy engine.
+    """
+    @staticmethod
+    def _tensor(
+            data,
+            input_size,
+    ) -> torch.Tensor:
+        """
+        Return `data` as a float64 tensor with a batch dimension.
+        """
+        t = torch.from_numpy(np.asarray(data, dtype=np.float64))
+        return t if compute.batched(data, input_size) else t.unsqueeze(0)
+
+    @staticmethod
+    def _output(
+            t,
+            data,
+            input_size,
+            bias,
+    ) -> np.ndarray:
+        """
+        Convert the float64 result tensor `t` for `data` to int64, remove the batch dimension
+        if `data` has none, and add the per-channel `bias`.
+        """
+        output = t.numpy().astype(np.int64)
+        if not compute.batched(data, input_size):
+            output = output[0]
+        if bias is not None:
+            # Broadcast over the dimensions following the channel dimension
+            output += np.asarray(bias, dtype=np.int64) \
+                .reshape((-1,) + (1,) * (len(input_size) - 1))
+        return output
+
+    def conv2d(
+            self,
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            pad,
+            dilation,
+            fractional_stride,
+            output_pad,
+            groups=1,
+    ) -> np.ndarray:
+        if fractional_stride[0] > 1 or fractional_stride[1] > 1 \
+           or output_pad[0] or output_pad[1] \
+           or not compute.float64_exact(data, weight, weight[0].size):
+            return super().conv2d(data, weight, bias, input_size, output_size, kernel_size,
+                                  stride, pad, dilation, fractional_stride, output_pad, groups)
+
+        t = torch.nn.functional.conv2d(
+            self._tensor(data, input_size),
+            torch.from_numpy(weight.astype(np.float64)),
+            stride=tuple(stride),
+            padding=tuple(pad),
+            dilation=tuple(dilation),
+            groups=groups,
+        )
+        output = self._output(t, data, input_size, bias)
+
+        assert output.shape[-3:] == tuple(output_size), \
+            f'Shape mismatch: PyTorch result {output.shape} vs expected {output_size}'
+        return output
+
+    def convtranspose2d(
+            self,
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            pad,
+            dilation,
+            fractional_stride,
+            output_pad,
+            groups=1,
+    ) -> np.ndarray:
+        if stride[0] > 1 or stride[1] > 1 \
+           or output_pad[0] >= max(fractional_stride[0], dilation[0]) \
+           or output_pad[1] >= max(fractional_stride[1], dilation[1]) \
+           or not compute.float64_exact(data, weight, weight[0].size):
+            return super().convtranspose2d(data, weight, bias, input_size, output_size,
+                                           kernel_size, stride, pad, dilation,
+                                           fractional_stride, output_pad, groups)
+
+        # The hardware correlates the zero-inserted input with the kernel, while PyTorch
+        # convolves with the transposed (in, out // groups, H, W) kernel
+        out_channels, in_group = weight.shape[:2]
+        tweight = np.flip(weight, axis=(2, 3)) \
+            .reshape((groups, out_channels // groups, in_group) + weight.shape[2:]) \
+            .swapaxes(1, 2) \
+            .reshape((groups * in_group, out_channels // groups) + weight.shape[2:])
+
+        t = torch.nn.functional.conv_transpose2d(
+            self._tensor(data, input_size),
+            torch.from_numpy(tweight.astype(np.float64)),
+            stride=tuple(fractional_stride),
+            padding=tuple(pad),
+            output_padding=tuple(output_pad),
+            groups=groups,
+            dilation=tuple(dilation),
+        )
+        output = self._output(t, data, input_size, bias)
+
+        assert output.shape[-3:] == tuple(output_size), \
+            f'Shape mismatch: PyTorch result {output.shape} vs expected {output_size}'
+        return output
+
+    def conv1d(
+            self,
+            data,
+            weight,
+            bias,
+            input_size,
+            output_size,
+            kernel_size,
+            stride,
+            pad,
+            dilation,
+            fractional_stride=1,
+            output_pad=0,
+            groups=1,
+    ) -> np.ndarray:
+        weight = weight.reshape(output_size[0], input_size[0] // groups, -1)
+        if fractional_stride > 1 or output_pad \
+           or not compute.float64_exact(data, weight, weight[0].size):
+            return super().conv1d(data, weight, bias, input_size, output_size, kernel_size,
+                                  stride, pad, dilation, fractional_stride, output_pad, groups)
+
+        data = np.asarray(data).reshape(np.shape(data)[:-len(input_size)] + (input_size[0], -1))
+        t = torch.nn.functional.conv1d(
+            self._tensor(data, input_size[:2]),
+            torch.from_numpy(weight.astype(np.float64)),
+            stride=stride,
+            padding=pad,
+            dilation=dilation,
+            groups=groups,
+        )
+        output = self._output(t, data, input_size[:2], bias)
+
+        assert output.shape[-2:] == tuple(output_size[:2]), \
+            f'Shape mismatch: PyTorch result {output.shape} vs expected {output_size[:2]}'
+        return output
+
+    def linear(
+            self,
+            layer,
+            data,
+            weight,
+            bias,
+            in_features,
+            out_features,
+    ) -> np.ndarray:
+        weight = np.asarray(weight).reshape(out_features, in_features)
+        if state.debug_computation \
+           or not compute.float64_exact(np.asarray(data), weight, in_features):
+            # The per-MAC trace is only available from the NumPy engine
+            return super().linear(layer, data, weight, bias, in_features, out_features)
+
+        t = torch.nn.functional.linear(
+            torch.from_numpy(np.asarray(data, dtype=np.float64).reshape(-1, in_features)),
+            torch.from_numpy(weight.astype(np.float64)),
+        )
+        output = t.numpy().astype(np.int64)
+        if bias is not None:
+            output += np.asarray(bias, dtype=np.int64)
+
+        return output if compute.batched(data, (in_features,)) else output[0]
+
+
+registry: Dict[str, Engine] = {
+    'numpy': Engine(),
+    'blas': BLASEngine(),
+    'torch': TorchEngine(),
+}
+
+
+def _run(
+        operator: str,
+        layer: int,
+        /,
+        *args,
+        **kwargs,
+) -> np.ndarray:
+    """
+    Compute `operator` for `layer` using the selected engine. In verify mode, also compute it
+    using the verification engine and stop at the first mismatch.
+    """
+    output = getattr(registry[state.compute_engine], operator)(*args, **kwargs)
+
+    if state.compute_verify is not None and state.compute_verify != state.compute_engine:
+        debug_computation, state.debug_computation = state.debug_computation, False
+        try:  # Only trace the selected engine
+            ref = getattr(registry[state.compute_verify], operator)(*args, **kwargs)
+        finally:
+            state.debug_computation = debug_computation
+
+        if output.shape != ref.shape or not np.array_equal(output, ref):
+            if output.shape != ref.shape:
+                detail = f'shape {output.shape} vs {ref.shape}'
+            else:
+                mismatch = np.argwhere(output != ref)
+                index = tuple(mismatch[0])
+                detail = f'{len(mismatch)} mismatching values, first at index {index}: ' \
+                         f'{output[index]} vs {ref[index]}'
+            eprint(f'Layer {layer_str(layer)}: {operator} result of the '
+                   f'`{state.compute_engine}` compute engine does not match the '
+                   f'`{state.compute_verify}` compute engine ({detail}).')
+
+    return output
+
+
+def conv2d(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute a 2D convolution for `layer` using the selected engine
+    """
+    return _run('conv2d', layer, *args, **kwargs)
+
+
+def convtranspose2d(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute a transposed 2D convolution for `layer` using the selected engine
+    """
+    return _run('convtranspose2d', layer, *args, **kwargs)
+
+
+def conv1d(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute a 1D convolution for `layer` using the selected engine
+    """
+    return _run('conv1d', layer, *args, **kwargs)
+
+
+def linear(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute a fully connected `layer` using the selected engine
+    """
+    return _run('linear', layer, layer, *args, **kwargs)
+
+
+def eltwise(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute an element-wise operation for `layer` using the selected engine
+    """
+    return _run('eltwise', layer, *args, **kwargs)
+
+
+def pool2d(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute 2D pooling for `layer` using the selected engine
+    """
+    return _run('pool2d', layer, *args, **kwargs)
+
+
+def pool1d(layer, *args, **kwargs) -> np.ndarray:
+    """
+    Compute 1D pooling for `layer` using the selected engine
+    """
+    return _run('pool1d', layer, *args, **kwargs)
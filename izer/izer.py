@@ -18,7 +18,7 @@ import rich.console
 
 from . import checkpoint, commandline, console, onnxcp, op, rtlsim, sampledata, sampleweight, state
 from . import tornadocnn as tc
-from . import versioncheck, yamlcfg
+from . import logwriter, versioncheck, yamlcfg
 from .eprint import eprint, nprint, wprint
 from .names import layer_pfx, layer_str
 from .utils import plural
@@ -171,15 +171,20 @@ def main():
         eprint('All bias quantization configuration values must be 8.')
 
     print(f'Configuring data set: {cfg["dataset"]}.')
-    if args.sample_input is None:
-        sampledata_file = os.path.join('tests', f'sample_{cfg["dataset"].lower()}.npy')
+    if args.seed_intermediates is not None:
+        # Start with the saved input of the start layer instead of the sample input
+        sampledata_file = args.seed_intermediates
+        data = sampledata.seed(sampledata_file, args.start_layer + args.skip_yaml_layers)
     else:
-        sampledata_file = args.sample_input
-    data = sampledata.get(
-        sampledata_file,
-        synthesize_input=args.synthesize_input,
-        synthesize_words=args.synthesize_words,
-    )
+        if args.sample_input is None:
+            sampledata_file = os.path.join('tests', f'sample_{cfg["dataset"].lower()}.npy')
+        else:
+            sampledata_file = args.sample_input
+        data = sampledata.get(
+            sampledata_file,
+            synthesize_input=args.synthesize_input,
+            synthesize_words=args.synthesize_words,
+        )
     if np.max(data) > 127 or np.min(data) < -128:
         eprint(f'Input data {sampledata_file} contains values that are outside the limits of '
                f'signed 8-bit (data min={np.min(data)}, max={np.max(data)})!')
@@ -703,5 +708,9 @@ def main():
             args.autogen_list,
         )
 
+    # Write the remainder of the log
+    if isinstance(sys.stdout, logwriter.LogWriter):
+        sys.stdout.close()
+
     # Restore stdout in case we're wrapped in cProfile
     sys.stdout = saved_stdout
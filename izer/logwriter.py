@@ -0,0 +1,218 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Log file writer that formats arrays and writes to the log file on a background thread
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+import zipfile
+from typing import Callable, Optional
+
+import numpy as np
+
+from . import state
+
+_QUEUE_SIZE = 256  # Maximum number of pending writes before the producer blocks
+
+
+class LogWriter:
+    """
+    Text file replacement for `sys.stdout` that writes `filename` on a background thread.
+    Writes are queued (in order) in a bounded queue. Arrays printed using print_array() are
+    formatted on the background thread as well. When `state.log_max_elements` is set, larger
+    arrays are summarized in the log file, and stored in full in the side file `npz_filename`.
+    """
+    def __init__(
+            self,
+            filename: str,
+            npz_filename: Optional[str] = None,
+    ):
+        self._file = open(  # pylint: disable=consider-using-with
+            filename,
+            mode='w',
+            encoding='utf-8',
+        )
+        self.encoding = self._file.encoding
+        self.closed = False
+        self._npz_filename = npz_filename
+        self._npz: Optional[zipfile.ZipFile] = None
+        self._arrays = 0
+        self._error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name='izer-log', daemon=True)
+        self._thread.start()
+        # Do not lose pending output when the program exits early (for example, from eprint())
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        """
+        Background thread: format and write queued items until the queue receives None
+        """
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    if isinstance(item, str):
+                        self._file.write(item)
+                    else:
+                        func, args = item
+                        self._file.write(func(self, *args))
+            except Exception as exc:  # pylint: disable=broad-except
+                self._error = exc  # Raised on the main thread by flush() or close()
+            finally:
+                self._queue.task_done()
+
+    def _check(self) -> None:
+        """
+        Raise the first exception from the background thread
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def writable(self) -> bool:
+        """
+        The log file is writable
+        """
+        return True
+
+    def isatty(self) -> bool:
+        """
+        The log file is not a terminal
+        """
+        return False
+
+    def write(self, s: str) -> int:
+        """
+        Queue string `s` for writing
+        """
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        self._check()
+        self._queue.put(s)
+        return len(s)
+
+    def submit(self, func: Callable[..., str], *args) -> None:
+        """
+        Queue `func(self, *args)` to be called on the background thread, and write the string
+        it returns. `args` must not be modified after calling submit().
+        """
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        self._check()
+        self._queue.put((func, args))
+
+    def save_array(self, data: np.ndarray) -> str:
+        """
+        Store `data` in the side .npz file and return a reference to it, for example
+        "log.npz['arr_0']" (background thread only)
+        """
+        assert self._npz_filename is not None
+        if self._npz is None:
+            self._npz = zipfile.ZipFile(self._npz_filename, mode='w', allowZip64=True)
+        key = f'arr_{self._arrays}'
+        self._arrays += 1
+        with self._npz.open(key + '.npy', mode='w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(data), allow_pickle=False)
+        return f"{os.path.basename(self._npz_filename)}['{key}']"
+
+    def flush(self) -> None:
+        """
+        Wait until all queued writes are done, and flush the log file
+        """
+        if self.closed:
+            return
+        self._queue.join()
+        self._file.flush()
+        self._check()
+
+    def close(self) -> None:
+        """
+        Write all queued items, stop the background thread, and close the files
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._npz is not None:
+            self._npz.close()
+        atexit.unregister(self.close)
+        self._check()
+
+
+def open_log(
+        filename: str,
+) -> LogWriter:
+    """
+    Return a LogWriter for `filename`. Arrays that are summarized because of
+    `state.log_max_elements` are stored in a .npz file of the same name.
+    """
+    return LogWriter(filename, os.path.splitext(filename)[0] + '.npz')
+
+
+def _format_array(
+        writer: Optional[LogWriter],
+        data: np.ndarray,
+        options: dict,
+) -> str:
+    """
+    Return `data` formatted like print(data) using the numpy print `options`. Summarize arrays
+    larger than `state.log_max_elements` when writing to `writer`.
+    """
+    note = ''
+    if writer is not None and state.log_max_elements is not None \
+       and data.size > state.log_max_elements:
+        options = dict(options, threshold=state.log_max_elements)
+        note = f'(full data: {writer.save_array(data)})\n'
+    return f'{_array_str(data, options)}\n{note}'
+
+
+def _array_str(
+        data: np.ndarray,
+        options: dict,
+) -> str:
+    """
+    Return str(`data`) formatted using the numpy print `options`. The options are passed to
+    np.array2string() explicitly, since the global print options are shared by all threads.
+    """
+    if data.ndim == 0:
+        return str(data[()])
+    return np.array2string(
+        data,
+        max_line_width=options['linewidth'],
+        precision=options['precision'],
+        suppress_small=options['suppress'],
+        separator=' ',
+        formatter=options['formatter'] or {},  # None would use the global formatter
+        threshold=options['threshold'],
+        edgeitems=options['edgeitems'],
+        sign=options['sign'],
+        floatmode=options['floatmode'],
+        legacy=options['legacy'],
+    )
+
+
+def print_array(
+        data,
+) -> None:
+    """
+    Print `data` like print(data). When stdout is a LogWriter, formatting happens on its
+    background thread using the numpy print options in effect at the time of the call.
+    """
+    data = np.asanyarray(data)
+    if isinstance(sys.stdout, LogWriter):
+        # Copy, since simulation buffers are modified in place after printing
+        sys.stdout.submit(_format_array, data.copy(), np.get_printoptions())
+    else:
+        sys.stdout.write(_format_array(None, data, np.get_printoptions()))
@@ -13,7 +13,7 @@ from functools import reduce
 
 import numpy as np
 
-from . import stats
+from . import stats, tensorfile
 from .eprint import eprint
 from .utils import s2u, u2s
 
@@ -71,3 +71,25 @@ def get(
         data = data.reshape(shape)
 
     return data
+
+
+def seed(
+        filename,
+        layer,
+):
+    """
+    Return the saved input of `layer` from the container `filename` written using
+    --save-intermediates, in channel-first format (i.e., CL, CHW)
+    """
+    try:
+        saved = tensorfile.Reader(filename)
+    except (OSError, ValueError) as err:
+        eprint(f'Cannot read saved intermediates {filename}: {err}')
+    name = f'buffer-{layer}'
+    if name not in saved:
+        eprint(f'The saved intermediates {filename} do not contain the input of layer {layer}.')
+
+    data = np.asarray(saved[name], dtype=np.int64)
+    stats.resourcedict['input_size'] = data.size
+
+    return data
@@ -0,0 +1,83 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Layer order and data dependencies of the network simulation
+"""
+from typing import Dict, List, Optional, Set
+
+
+def simulation_order(
+        start_layer: int,
+        layers: int,
+        next_sequence: List[int],
+        simulated_sequence: List[Optional[int]],
+) -> List[int]:
+    """
+    Return the layers in the order they are simulated, starting at `start_layer` and following
+    `simulated_sequence` (where set) or `next_sequence` until the sequence ends (-1).
+    """
+    order: List[int] = []
+    ll = start_layer
+    while ll < layers and len(order) <= layers:
+        order.append(ll)
+        ll = simulated_sequence[ll] if simulated_sequence[ll] is not None else next_sequence[ll]
+        if ll == -1:
+            break
+    return order
+
+
+def buffer_reads(
+        ll: int,
+        in_sequences: List[Optional[List[int]]],
+) -> List[int]:
+    """
+    Return the indices of the simulation data buffer that layer `ll` reads. Entry i + 1 holds the
+    output of layer i, and entry 0 holds the network input (`in_sequences` value -1). The data
+    buffer of `in_sequences` value -2 is not part of the simulation data buffer.
+    """
+    if in_sequences[ll] is None:
+        return [ll]
+    return [i + 1 for i in in_sequences[ll] if i != -2]
+
+
+def last_reads(
+        order: List[int],
+        in_sequences: List[Optional[List[int]]],
+) -> Dict[int, int]:
+    """
+    Return, for each index of the simulation data buffer that is read, the step of the
+    simulation `order` that reads it for the last time. After that step, the entry can be
+    released.
+    """
+    last_read: Dict[int, int] = {}
+    for step, ll in enumerate(order):
+        for i in buffer_reads(ll, in_sequences):
+            last_read[i] = step
+    return last_read
+
+
+def dependencies(
+        order: List[int],
+        in_sequences: List[Optional[List[int]]],
+) -> Optional[List[Set[int]]]:
+    """
+    Return, for each step of the simulation `order`, the earlier steps whose output the layer of
+    that step reads. Entry `order[0]` of the simulation data buffer holds the input data, and
+    the entry of layer `order[step + 1]` holds the output of `order[step]`.
+    Return None when a layer reads data that is not produced before it.
+    """
+    producer = {order[step + 1]: step for step in range(len(order) - 1)}
+    deps: List[Set[int]] = []
+    for step, ll in enumerate(order):
+        deps.append(set())
+        for i in buffer_reads(ll, in_sequences):
+            if i == order[0]:
+                continue
+            if producer.get(i, step) >= step:
+                return None
+            deps[step].add(producer[i])
+    return deps
@@ -0,0 +1,140 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Content-addressed on-disk cache of simulated layer results.
+Each entry is stored in `state.sim_cache` as a memory-mappable .npy file with the layer output,
+and a .json file with the output size and the ops accounted for the layer. The least recently
+used entries are evicted when the cache exceeds `state.sim_cache_size` bytes.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import state
+
+_VERSION = 1  # Increase when simulation results change, to invalidate existing entries
+
+
+def key(
+        arrays: Sequence[Any],
+        params: Sequence[Any],
+) -> str:
+    """
+    Return the cache key for the layer input, weights and bias in `arrays` (any of which may be
+    None), and the layer parameters `params`.
+    """
+    h = hashlib.sha256(f'izer-sim-cache-{_VERSION}'.encode())
+    for a in arrays:
+        if a is None:
+            h.update(b'None;')
+        else:
+            a = np.ascontiguousarray(a)
+            h.update(f'{a.dtype.str}{a.shape};'.encode())
+            h.update(a.data)
+    h.update(repr(list(params)).encode())
+    return h.hexdigest()
+
+
+def _path(
+        k: str,
+) -> str:
+    """
+    Return the path of cache entry `k`, without extension.
+    """
+    return os.path.join(state.sim_cache, k[:2], k)
+
+
+def load(
+        k: str,
+) -> Optional[Tuple[np.ndarray, List[int], Dict[str, int]]]:
+    """
+    Return the memory-mapped output, the output size and the ops of cache entry `k`, or None
+    if the cache does not contain `k`.
+    """
+    path = _path(k)
+    try:
+        with open(path + '.json', mode='r', encoding='utf-8') as f:
+            info = json.load(f)
+        output = np.load(path + '.npy', mmap_mode='r', allow_pickle=False)
+        # Mark the entry as recently used
+        os.utime(path + '.json')
+        os.utime(path + '.npy')
+    except (OSError, ValueError):
+        return None
+    return output, info['output_size'], info['ops']
+
+
+def _write(
+        filename: str,
+        write,
+        binary: bool = False,
+) -> None:
+    """
+    Atomically create `filename` using `write(f)`, so concurrent runs never see partial entries.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode='wb' if binary else 'w') as f:
+            write(f)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def store(
+        k: str,
+        output: np.ndarray,
+        output_size: Sequence[int],
+        ops: Dict[str, int],
+) -> None:
+    """
+    Store `output` with `output_size` and the accounted `ops` as cache entry `k`.
+    Caching is best effort; errors (such as a full disk) are ignored.
+    """
+    path = _path(k)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write(path + '.npy', lambda f: np.save(f, output, allow_pickle=False), binary=True)
+        _write(path + '.json',
+               lambda f: json.dump({'output_size': [int(x) for x in output_size], 'ops': ops}, f))
+    except OSError:
+        pass
+
+
+def evict() -> None:
+    """
+    Remove the least recently used entries until the cache does not exceed
+    `state.sim_cache_size` bytes.
+    """
+    entries = {}
+    for dirpath, _, filenames in os.walk(state.sim_cache):
+        for name in filenames:
+            base, ext = os.path.splitext(name)
+            if ext not in ('.npy', '.json'):
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            size, used = entries.get(os.path.join(dirpath, base), (0, 0.))
+            entries[os.path.join(dirpath, base)] = (size + st.st_size, max(used, st.st_mtime))
+
+    total = sum(size for size, _ in entries.values())
+    for path, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):
+        if total <= state.sim_cache_size:
+            break
+        for ext in ('.json', '.npy'):
+            try:
+                os.unlink(path + ext)
+            except OSError:
+                pass
+        total -= size
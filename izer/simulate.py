@@ -13,9 +13,33 @@ import numpy as np
 
 from . import op, state, stats
 from . import tornadocnn as tc
-from .compute import conv1d, conv2d, convtranspose2d, eltwise, linear, pool1d, pool2d
+from .engines import conv1d, conv2d, convtranspose2d, eltwise, linear, pool1d, pool2d
+from .logwriter import print_array
 from .names import layer_str
 
+# Statistics category of the element-wise operators
+_ELTWISE_STATS = {
+    op.ELTWISE_ADD: 'add',
+    op.ELTWISE_SUB: 'add',
+    op.ELTWISE_MUL: 'mul',
+    op.ELTWISE_OR: 'bitwise',
+    op.ELTWISE_XOR: 'bitwise',
+}
+
+
+def save_data(
+        datafile,
+        layer,
+        stage,
+        data,
+):
+    """
+    Save `data` of `layer` at simulation `stage` (such as 'input' or 'output') to the
+    --log-intermediate tensor container `datafile`, as entry 'layer-<layer>/<stage>'.
+    """
+    datafile.add(f'layer-{layer}/{stage}', data, layer=layer, stage=stage,
+                 layer_name=state.layer_name[layer])
+
 
 def print_data(
         verbose_data,
@@ -27,8 +51,14 @@ def print_data(
 ):
     """
     Print `data` of dimensions `input_size` with `expand` and `expand_thresh`,
-    prefixed by `header`.
+    prefixed by `header`. When `data` has an additional leading batch dimension, print each
+    sample separately.
     """
+    if np.ndim(data) == len(input_size) + 1:
+        for n, d in enumerate(data):
+            print_data(verbose_data, f'{header}, SAMPLE {n}', d, input_size, expand, expand_thresh)
+        return
+
     int8_format = '{0:4}' if np.any(data < 0) else '{0:3}'
 
     print(header, end='')
@@ -46,7 +76,7 @@ def print_data(
                         print(f' (expansion: {(i // expand_thresh) + 1} of {expand})')
                     else:
                         print('')
-                    print(np.squeeze(data[i:last]))
+                    print_array(np.squeeze(data[i:last]))
             else:
                 for i in range(input_size[0]):
                     print(f'Channel #{i}', end='')
@@ -54,7 +84,7 @@ def print_data(
                         print(f' (expansion: {(i // expand_thresh) + 1} of {expand})')
                     else:
                         print('')
-                    print(data[i])
+                    print_array(data[i])
     print('')
 
 
@@ -84,7 +114,7 @@ def print_data1d(
                         print(f'Output channels #{i} to #{last-1}:')
                     else:
                         print(f'Output channel #{i}"')
-                    print(np.squeeze(data[i:last]))
+                    print_array(np.squeeze(data[i:last]))
         print('')
     elif size > 0:
         print(f"\n{header} SIZE: {size}")
@@ -92,6 +122,37 @@ def print_data1d(
         print('')
 
 
+def requantize(
+        buf,
+        output_shift,
+        bits=8,
+        activation=None,
+):
+    """
+    Requantize the integer accumulator `buf` in place and return it.
+    Unless `output_shift` is None, scale by 2**output_shift / 128 and round half up using
+    integer shifts, which is identical to floor(0.5 + buf / (128 / 2**output_shift)), and clip
+    to `bits` bit signed. Then apply `activation` (clipping to `bits` bit unsigned).
+    """
+    if output_shift is not None:
+        shift = 7 - int(output_shift)
+        if shift > 0:
+            buf += 1 << (shift - 1)
+            buf >>= shift
+        elif shift < 0:
+            buf <<= -shift
+
+    if activation == op.ACT_RELU:
+        np.clip(buf, 0, 2**(bits-1)-1, out=buf)
+    elif activation == op.ACT_ABS:
+        np.abs(buf, out=buf)
+        np.minimum(buf, 2**(bits-1)-1, out=buf)
+    elif output_shift is not None:
+        np.clip(buf, -(2**(bits-1)), 2**(bits-1)-1, out=buf)
+
+    return buf
+
+
 def conv2d_layer(
         layer,
         input_size,
@@ -113,6 +174,8 @@ def conv2d_layer(
 ):
     """
     Perform 2D convolution for one layer.
+    `data` may have an additional leading batch dimension; `input_size` is always the size of
+    a single sample, and ops are accounted per sample.
     """
     verbose_data = state.verbose_all or state.output_layer[layer]
 
@@ -126,16 +189,16 @@ def conv2d_layer(
                 for i in range(output_channels):
                     if kernel_size[0] == kernel_size[1] == 1:
                         print(f'Output channel #{i}')
-                        print(np.squeeze(kernel[i]))
+                        print_array(np.squeeze(kernel[i]))
                     else:
                         if kernel[i].shape[0] < 8:
                             print(f'Output channel #{i}')
-                            print(kernel[i])
+                            print_array(kernel[i])
                         else:
                             for j in range(0, kernel[i].shape[0], 8):
                                 print(f'Output channel #{i} (input channels {j}-'
                                       f'{min(kernel[i].shape[0], j+8) - 1})')
-                                print(kernel[i][j:j+8])
+                                print_array(kernel[i][j:j+8])
         print_data1d(state.verbose_all, "BIAS", bias)
 
     out_size = [output_channels,
@@ -148,6 +211,7 @@ def conv2d_layer(
         bias = bias * tc.dev.BIAS_DIV
 
     out_buf = conv2d(
+        layer,
         data=data,
         weight=kernel,
         bias=bias,
@@ -163,14 +227,14 @@ def conv2d_layer(
     )
 
     if datafile is not None:
-        np.save(datafile, out_buf, allow_pickle=False, fix_imports=False)
+        save_data(datafile, layer, 'full-res', out_buf)
 
     if state.verbose and verbose_data:
         print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} FULL-RES OUTPUT:")
         if out_size[1] == out_size[2] == 1:
-            print(np.squeeze(out_buf))
+            print_array(np.squeeze(out_buf))
         else:
-            print(out_buf)
+            print_array(out_buf)
         print('')
 
     stats.account(
@@ -180,32 +244,31 @@ def conv2d_layer(
         * out_size[1] * out_size[2],
     )
 
+    # Fuse the activation into the requantization unless the output before activation is shown
+    activated = output_width != 32 and not (state.verbose and verbose_data)
     if output_width != 32:
-        out_buf = np.floor(0.5 + out_buf / (128 / 2.0**output_shift)).astype(np.int64). \
-            clip(-(2**(bits-1)), 2**(bits-1)-1)
+        requantize(out_buf, output_shift, bits, activation if activated else None)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} OUTPUT "
                   f"{'BEFORE ACTIVATION' if activation is not None else '(NO ACTIVATION)'}:")
             if out_size[1] == out_size[2] == 1:
-                print(np.squeeze(out_buf))
+                print_array(np.squeeze(out_buf))
             else:
-                print(out_buf)
+                print_array(out_buf)
             print('')
 
     if activation is not None:
-        if activation == op.ACT_RELU:
-            np.clip(out_buf, 0, 2**(bits-1)-1, out_buf)
-        elif activation == op.ACT_ABS:
-            out_buf = np.abs(out_buf).clip(0, 2**(bits-1)-1)
+        if not activated:
+            requantize(out_buf, None, bits, activation)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} ACTIVATED OUTPUT"
                   f" ({op.act_string(activation).upper()}):")
             if out_size[1] == out_size[2] == 1:
-                print(np.squeeze(out_buf))
+                print_array(np.squeeze(out_buf))
             else:
-                print(out_buf)
+                print_array(out_buf)
             print('')
 
         stats.account(
@@ -243,6 +306,8 @@ def convtranspose2d_layer(
 ):
     """
     Perform a fractionally strided 2D convolution for one layer.
+    `data` may have an additional leading batch dimension; `input_size` is always the size of
+    a single sample, and ops are accounted per sample.
     """
     verbose_data = state.verbose_all or state.output_layer[layer]
 
@@ -256,16 +321,16 @@ def convtranspose2d_layer(
                 for i in range(output_channels):
                     if kernel_size[0] == kernel_size[1] == 1:
                         print(f'Output channel #{i}')
-                        print(np.squeeze(kernel[i]))
+                        print_array(np.squeeze(kernel[i]))
                     else:
                         if kernel[i].shape[0] < 8:
                             print(f'Output channel #{i}')
-                            print(kernel[i])
+                            print_array(kernel[i])
                         else:
                             for j in range(0, kernel[i].shape[0], 8):
                                 print(f'Output channel #{i} (input channels {j}-'
                                       f'{min(kernel[i].shape[0], j+8) - 1})')
-                                print(kernel[i][j:j+8])
+                                print_array(kernel[i][j:j+8])
 
         print_data1d(state.verbose_all, "BIAS", bias)
 
@@ -281,6 +346,7 @@ def convtranspose2d_layer(
         bias = bias * tc.dev.BIAS_DIV
 
     out_buf = convtranspose2d(
+        layer,
         data=data,
         weight=kernel,
         bias=bias,
@@ -296,14 +362,14 @@ def convtranspose2d_layer(
     )
 
     if datafile is not None:
-        np.save(datafile, out_buf, allow_pickle=False, fix_imports=False)
+        save_data(datafile, layer, 'full-res', out_buf)
 
     if state.verbose and verbose_data:
         print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} FULL-RES OUTPUT:")
         if out_size[1] == out_size[2] == 1:
-            print(np.squeeze(out_buf))
+            print_array(np.squeeze(out_buf))
         else:
-            print(out_buf)
+            print_array(out_buf)
         print('')
 
     stats.account(
@@ -313,32 +379,31 @@ def convtranspose2d_layer(
         * out_size[1] * out_size[2],
     )
 
+    # Fuse the activation into the requantization unless the output before activation is shown
+    activated = output_width != 32 and not (state.verbose and verbose_data)
     if output_width != 32:
-        out_buf = np.floor(0.5 + out_buf / (128 / 2.0**output_shift)).astype(np.int64). \
-            clip(-(2**(bits-1)), 2**(bits-1)-1)
+        requantize(out_buf, output_shift, bits, activation if activated else None)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} OUTPUT "
                   f"{'BEFORE ACTIVATION' if activation is not None else '(NO ACTIVATION)'}:")
             if out_size[1] == out_size[2] == 1:
-                print(np.squeeze(out_buf))
+                print_array(np.squeeze(out_buf))
             else:
-                print(out_buf)
+                print_array(out_buf)
             print('')
 
     if activation is not None:
-        if activation == op.ACT_RELU:
-            np.clip(out_buf, 0, 2**(bits-1)-1, out_buf)
-        elif activation == op.ACT_ABS:
-            out_buf = np.abs(out_buf).clip(0, 2**(bits-1)-1)
+        if not activated:
+            requantize(out_buf, None, bits, activation)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]}x{out_size[2]} ACTIVATED OUTPUT"
                   f" ({op.act_string(activation).upper()}):")
             if out_size[1] == out_size[2] == 1:
-                print(np.squeeze(out_buf))
+                print_array(np.squeeze(out_buf))
             else:
-                print(out_buf)
+                print_array(out_buf)
             print('')
 
         stats.account(
@@ -375,6 +440,8 @@ def conv1d_layer(
 ):
     """
     Perform 1D convolution for one layer.
+    `data` may have an additional leading batch dimension; `input_size` is always the size of
+    a single sample, and ops are accounted per sample.
     """
     verbose_data = state.verbose_all or state.output_layer[layer]
 
@@ -385,7 +452,7 @@ def conv1d_layer(
         if state.verbose_all and not bypass:
             print(':')
             with np.printoptions(formatter={'int': state.kernel_format.format}):
-                print(kernel)
+                print_array(kernel)
         print_data1d(state.verbose_all, "BIAS", bias)
 
     out_size = [output_channels,
@@ -397,6 +464,7 @@ def conv1d_layer(
         bias = bias * tc.dev.BIAS_DIV
 
     out_buf = conv1d(
+        layer,
         data=data,
         weight=kernel,
         bias=bias,
@@ -409,14 +477,14 @@ def conv1d_layer(
         fractional_stride=1,
         output_pad=0,
         groups=groups,
-    )[:, :, np.newaxis]
+    )[..., np.newaxis]
 
     if datafile is not None:
-        np.save(datafile, out_buf, allow_pickle=False, fix_imports=False)
+        save_data(datafile, layer, 'full-res', out_buf)
 
     if state.verbose and verbose_data:
         print(f"{out_size[0]}x{out_size[1]} FULL-RES OUTPUT:")
-        print(out_buf.squeeze(axis=-1))
+        print_array(out_buf.squeeze(axis=-1))
         print('')
 
     stats.account(
@@ -425,26 +493,25 @@ def conv1d_layer(
         (input_size[0] // groups) * kernel_size * out_size[0] * out_size[1],
     )
 
+    # Fuse the activation into the requantization unless the output before activation is shown
+    activated = output_width != 32 and not (state.verbose and verbose_data)
     if output_width != 32:
-        out_buf = np.floor(0.5 + out_buf / (128 / 2.0**output_shift)).astype(np.int64). \
-            clip(-(2**(bits-1)), 2**(bits-1)-1)
+        requantize(out_buf, output_shift, bits, activation if activated else None)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]} OUTPUT "
                   f"{'BEFORE ACTIVATION' if activation is not None else '(NO ACTIVATION)'}:")
-            print(out_buf.squeeze(axis=-1))
+            print_array(out_buf.squeeze(axis=-1))
             print('')
 
     if activation is not None:
-        if activation == op.ACT_RELU:
-            np.clip(out_buf, 0, 2**(bits-1)-1, out_buf)
-        elif activation == op.ACT_ABS:
-            out_buf = np.abs(out_buf).clip(0, 2**(bits-1)-1)
+        if not activated:
+            requantize(out_buf, None, bits, activation)
 
         if state.verbose and verbose_data:
             print(f"{out_size[0]}x{out_size[1]} ACTIVATED OUTPUT"
                   f" ({op.act_string(activation).upper()}):")
-            print(out_buf.squeeze(axis=-1))
+            print_array(out_buf.squeeze(axis=-1))
             print('')
 
         stats.account(
@@ -470,12 +537,13 @@ def linear_layer(
 ):
     """
     Perform one software linear layer.
+    `data` may have an additional leading batch dimension (N, in_features).
     """
     verbose_data = state.verbose_all or state.output_layer[layer]
     verbose_input = state.verbose_all or layer == state.start_layer \
         or state.in_sequences[layer] is not None and -1 in state.in_sequences[layer]
 
-    in_features = data.shape[0]
+    in_features = data.shape[-1]
     out_features = weight.shape[0]
 
     if state.verbose_all or verbose_input:
@@ -483,13 +551,13 @@ def linear_layer(
         print(f"INPUT DATA (size {in_features})", end='')
         if verbose_input:
             print(':')
-            print(data)
+            print_array(data)
         print('')
 
     if state.verbose_all:
         print(f"WEIGHTS (size {in_features * out_features})", end='')
         print(':')
-        print(weight)
+        print_array(weight)
         print_data1d(state.verbose_all, "BIAS", bias)
 
     out_buf = linear(
@@ -500,12 +568,13 @@ def linear_layer(
         in_features=in_features,
         out_features=out_features,
     )
-    out_buf = np.floor(0.5 + out_buf / 128).astype(np.int64). \
-        clip(-(2**(bits-1)), 2**(bits-1)-1)
+    # Fuse the activation into the requantization unless the output before activation is shown
+    activated = not (state.verbose and verbose_data)
+    requantize(out_buf, 0, bits, activation if activated else None)
 
     if state.verbose and verbose_data:
         print(f"OUTPUT (size {out_features}):")
-        print(out_buf)
+        print_array(out_buf)
         print('')
 
     stats.account(
@@ -513,17 +582,20 @@ def linear_layer(
         "sw_macc",
         in_features * out_features,
     )
+    stats.account(
+        layer,
+        "true_sw_macc",
+        in_features * out_features,
+    )
 
     if activation is not None:
-        if activation == op.ACT_RELU:
-            np.clip(out_buf, 0, 2**(bits-1)-1, out_buf)
-        elif activation == op.ACT_ABS:
-            out_buf = np.abs(out_buf).clip(0, 2**(bits-1)-1)
+        if not activated:
+            requantize(out_buf, None, bits, activation)
 
         if state.verbose and verbose_data:
             print(f"ACTIVATED OUTPUT (size {out_features})"
                   f" ({op.act_string(activation).upper()}):")
-            print(out_buf)
+            print_array(out_buf)
             print('')
 
         stats.account(
@@ -543,15 +615,13 @@ def passthrough_layer(
         layer,  # pylint: disable=unused-argument
         input_size,
         data,
-        datafile=None,
+        datafile=None,  # pylint: disable=unused-argument
 ):
     """
     2D passthrough for one layer.
     """
-    if datafile is not None:
-        np.save(datafile, np.empty((0)), allow_pickle=False, fix_imports=False)
-
-    return data, input_size
+    # The input may be stored in a narrower type
+    return np.asarray(data, dtype=np.int64), input_size
 
 
 def eltwise_layer(
@@ -565,8 +635,11 @@ def eltwise_layer(
 ):
     """
     Element-wise operators for one layer.
+    The operands may have an additional leading batch dimension; `input_size` is always the
+    size of a single sample, and ops are accounted per sample.
     """
     verbose_data = state.verbose_all or state.output_layer[layer]
+    size = int(np.prod(input_size))  # Elements per operand and sample
 
     bits = 8
     assert operands == len(data)
@@ -575,6 +648,7 @@ def eltwise_layer(
         print(f"{operands}-OPERAND {op.string(operator, elt=True).upper()}:\n")
 
     out_buf = eltwise(
+        layer,
         operator=operator,
         data=data,
         input_size=input_size,
@@ -583,43 +657,30 @@ def eltwise_layer(
     if state.verbose and verbose_data:
         print(f"{input_size[0]}x{input_size[1]}x{input_size[2]} FULL-RES OUTPUT:")
         if input_size[1] == input_size[2] == 1:
-            print(np.squeeze(out_buf))
+            print_array(np.squeeze(out_buf))
         else:
-            print(out_buf)
+            print_array(out_buf)
         print('')
 
-    if operator in [op.ELTWISE_ADD, op.ELTWISE_SUB]:
-        stats.account(
-            layer,
-            "add",
-            (operands - 1) * out_buf.size,
-        )
-    elif operator == op.ELTWISE_MUL:
+    if operator in _ELTWISE_STATS:
         stats.account(
             layer,
-            "mul",
-            (operands - 1) * out_buf.size,
-        )
-    elif operator in [op.ELTWISE_OR, op.ELTWISE_XOR]:
-        stats.account(
-            layer,
-            "bitwise",
-            (operands - 1) * out_buf.size,
+            _ELTWISE_STATS[operator],
+            (operands - 1) * size,
         )
 
     if output_width != 32:
         if operator == op.ELTWISE_MUL:
-            out_buf = np.floor(0.5 + out_buf / (128 / 2.0**output_shift)).astype(np.int64). \
-                clip(-(2**(bits-1)), 2**(bits-1)-1)
+            requantize(out_buf, output_shift, bits)
         else:
             np.clip(out_buf, -(2**(bits-1)), 2**(bits-1)-1, out_buf)
 
         if state.verbose and verbose_data:
             print(f"{input_size[0]}x{input_size[1]}x{input_size[2]} OUTPUT:")
             if input_size[1] == input_size[2] == 1:
-                print(np.squeeze(out_buf))
+                print_array(np.squeeze(out_buf))
             else:
-                print(out_buf)
+                print_array(out_buf)
             print('')
 
     if state.verbose and not verbose_data:
@@ -645,6 +706,8 @@ def pooling_layer(
 ):
     """
     Perform pooling for one layer.
+    `data` has a leading operands dimension, and may have an additional batch dimension after
+    it; `input_size` is always the size of a single operand and sample.
     """
     # Always apply stride
     if operation != op.CONV1D:
@@ -661,14 +724,16 @@ def pooling_layer(
     # Actual pooling operation?
     if pool[0] > 1 or pool[1] > 1:
         if operation != op.CONV1D:
-            pooled = np.empty((operands, pooled_size[0], pooled_size[1], pooled_size[2]),
+            pooled = np.empty((operands,) + data.shape[1:-3] + tuple(pooled_size),
                               dtype=np.int64)
             for i in range(operands):
                 if debug_data is not None:
                     for j in range(input_size[0]):
                         np.savetxt(os.path.join(debug_data, f"unpooled-{i}-L{layer}-ch{j}.csv"),
-                                   data[i][j, :, :], delimiter=",")
+                                   data[i][..., j, :, :].reshape(-1, input_size[2]),
+                                   delimiter=",")
                 pooled[i] = pool2d(
+                    layer,
                     data[i],
                     input_size,
                     pooled_size,
@@ -698,7 +763,8 @@ def pooling_layer(
                 if debug_data is not None:
                     for j in range(pooled_size[0]):
                         np.savetxt(os.path.join(debug_data, f"pooled-{i}-L{layer}-ch{j}.csv"),
-                                   pooled[i][j, :, :], delimiter=",")
+                                   pooled[i][..., j, :, :].reshape(-1, pooled_size[2]),
+                                   delimiter=",")
 
             st = pool[0] * pool[1] * pooled_size[0] * pooled_size[1] * pooled_size[2] * operands
             if pool_average:
@@ -715,6 +781,7 @@ def pooling_layer(
                 )
         else:
             pooled = pool1d(
+                layer,
                 data[0],
                 input_size,
                 pooled_size,
@@ -732,7 +799,7 @@ def pooling_layer(
                 print(f"{input_size} -> {pooled_size}", end='')
                 if state.verbose_all:
                     print(':')
-                    print(pooled)
+                    print_array(pooled)
                 print('')
 
             if pool_average:
@@ -753,7 +820,7 @@ def pooling_layer(
     else:
         # Use pool_stride only
         if operation != op.CONV1D:
-            pooled = data[:, :, ::pool_stride[0], ::pool_stride[1]]
+            pooled = data[..., ::pool_stride[0], ::pool_stride[1]]
             if pool_stride[0] > 1 or pool_stride[1] > 1:
                 if state.verbose:
                     print(f"{'AVERAGE' if pool_average else 'MAX'} "
@@ -761,10 +828,10 @@ def pooling_layer(
                           f" {input_size} -> {pooled_size}", end='')
                     if state.verbose_all:
                         print(':')
-                        print(pooled)
+                        print_array(pooled)
                     print('')
         else:
-            pooled = data[:, :, ::pool_stride[0]]
+            pooled = data[..., ::pool_stride[0]]
             if pool_stride[0] > 1:
                 if state.verbose:
                     print(f"{'AVERAGE' if pool_average else 'MAX'} "
@@ -772,7 +839,7 @@ def pooling_layer(
                           f"{input_size} -> {pooled_size}", end='')
                     if state.verbose_all:
                         print(':')
-                        print(pooled)
+                        print_array(pooled)
                     print('')
 
     return pooled, pooled_size
@@ -807,23 +874,24 @@ def show_data(
 
             if operands == 1:
                 print_data(verbose_input,
-                           f"{data.shape[1]}x{data.shape[2]}x{data.shape[3]} INPUT DATA",
+                           f"{data.shape[-3]}x{data.shape[-2]}x{data.shape[-1]} INPUT DATA",
                            data[0],
-                           [data.shape[1], data.shape[2], data.shape[3]],
+                           [data.shape[-3], data.shape[-2], data.shape[-1]],
                            expand,
                            expand_thresh)
             else:
                 for i in range(operands):
                     print_data(verbose_input,
-                               f"{data.shape[1]}x{data.shape[2]}x{data.shape[3]} INPUT DATA {i}",
+                               f"{data.shape[-3]}x{data.shape[-2]}x{data.shape[-1]} "
+                               f"INPUT DATA {i}",
                                data[i],
-                               [data.shape[1], data.shape[2], data.shape[3]],
+                               [data.shape[-3], data.shape[-2], data.shape[-1]],
                                expand,
                                expand_thresh)
         else:
             print(f"LAYER {layer_str(layer)} ({op.string(operation).upper()})...\n")
-            print(f"{input_size[1]}x{input_size[2]} INPUT DATA", end='')
+            print(f"{data.shape[-2]}x{data.shape[-1]} INPUT DATA", end='')
             if verbose_input:
                 print(':')
-                print(np.squeeze(data))
+                print_array(np.squeeze(data))
             print('')
@@ -35,11 +35,14 @@ clock_divider: Optional[int] = None
 clock_trim: Optional[List[int]] = None
 compact_data: bool = False
 compact_weights: bool = False
+compute_engine: str = 'numpy'
+compute_verify: Optional[str] = None
 conv_groups: List[int] = []
 data: Any = None
 data_buffer: Optional[List[List[Any]]] = None
 data_buffer_cfg: Optional[List[Dict]] = None
 debug_computation: bool = False
+debug_computation_format: str = 'csv'
 debug_latency: bool = False
 debug_log: Optional[TextIO] = None
 debug_new_streaming: bool = False
@@ -59,6 +62,7 @@ eclipse_openocd_args: str = ''
 eclipse_variables: str = ''
 eltwise: List[bool] = []
 embedded_code: bool = False
+emulate: bool = False
 enable_delay: int = 0
 energy_warning: bool = True
 ext_rdy: bool = False
@@ -107,6 +111,7 @@ legacy_test: bool = False
 link_layer: bool = False
 log_filename: str = ''
 log_intermediate: bool = False
+log_max_elements: Optional[int] = None
 log_pooling: bool = False
 log: bool = False
 max_count: Optional[int] = None
@@ -175,8 +180,18 @@ rtl_preload_weights: bool = False
 rtl_preload: bool = False
 runtest_filename: str = ''
 sample_filename: str = ''
+save_intermediates: Optional[str] = None
+seed_intermediates: Optional[str] = None
+sim_branch_threads: int = 1
+sim_cache: Optional[str] = None
+sim_cache_size: int = 4096 * 1024 * 1024
+sim_memory_budget: int = 256 * 1024 * 1024
+sim_stream_rows: bool = False
+sim_threads: int = 1
+sim_winograd: bool = True
 simple1b: bool = False
 simulated_sequence: List[Any] = []
+skip_yaml_layers: int = 0
 sleep: bool = False
 slow_load: bool = False
 snoop_loop: bool = False
@@ -33,6 +33,10 @@ resourcedict = {
     "kmem_used": 0,  # Used kernel memory
     "bmem_used": 0,  # Used bias memory
     "input_size": 0,  # Sample input size
+    "sim_data_bytes": 0,  # Simulator memory used to store activations between layers
+    "sim_data_saved": 0,  # Simulator memory saved by storing activations in narrow types
+    "sim_data_live": 0,  # Simulator memory used by activations that are still needed
+    "sim_data_peak": 0,  # Peak of sim_data_live
 }
 
 
@@ -68,6 +72,18 @@ def sw_ops() -> int:
     return sum(statsdict["sw_macc"]) + sum(statsdict["sw_comp"])
 
 
+def reserve(
+        layers: int,
+) -> None:
+    """
+    Extend the statistics to `layers` layers, so that different layers can be accounted
+    concurrently.
+    """
+    for values in statsdict.values():
+        if len(values) < layers:
+            values += [0] * (layers - len(values))
+
+
 def account(
         layer: int,
         operation: str,
@@ -86,6 +102,28 @@ def account(
     statsdict[operation][layer] += val
 
 
+def account_data(
+        data,
+) -> None:
+    """
+    Account for simulator activation storage of integer `data` (compared to int64).
+    """
+    resourcedict['sim_data_bytes'] += data.nbytes
+    resourcedict['sim_data_saved'] += data.size * 8 - data.nbytes
+    resourcedict['sim_data_live'] += data.nbytes
+    resourcedict['sim_data_peak'] = max(resourcedict['sim_data_peak'],
+                                        resourcedict['sim_data_live'])
+
+
+def release_data(
+        data,
+) -> None:
+    """
+    Account for releasing simulator activation storage of `data`.
+    """
+    resourcedict['sim_data_live'] -= data.nbytes
+
+
 def summary(
         factor: int = 1,
         spaces: int = 0,
@@ -145,3 +183,16 @@ def summary(
               f'({bmem_used * 100.0 / bmem:.1f}%)\n'
 
     return rv
+
+
+def sim_summary() -> str:
+    """
+    Return the simulator memory statistics (not part of the generated code, since they depend
+    on the simulator options).
+    """
+    if resourcedict['sim_data_bytes'] == 0:
+        return ''
+    return "SIMULATOR MEMORY\n" \
+        f"Activations: {resourcedict['sim_data_bytes']:,} bytes " \
+        f"({resourcedict['sim_data_saved']:,} bytes saved by compact storage, " \
+        f"peak {resourcedict['sim_data_peak']:,} bytes in use)\n"
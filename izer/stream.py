@@ -0,0 +1,199 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Row-by-row simulation of streaming layers.
+On the hardware, streaming layers read their input through circular buffers that hold only the
+rows that the pooling and convolution windows need. Here, each layer is a generator that pulls
+input rows (C, W) on demand and keeps a sliding window of rows, so that a chain of streaming
+layers is simulated without full-resolution input or intermediate frames.
+The results are identical to simulate.pooling_layer() and simulate.conv2d_layer().
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import stats
+from . import tornadocnn as tc
+from .engines import conv2d, pool2d
+from .simulate import requantize
+
+
+def rows(
+        data: np.ndarray,
+) -> Iterator[np.ndarray]:
+    """
+    Yield the rows (C, W) of the frame `data` (C, H, W).
+    """
+    for r in range(data.shape[1]):
+        yield data[:, r, :]
+
+
+def collect(
+        source: Iterable[np.ndarray],
+        frame: np.ndarray,
+) -> Iterator[np.ndarray]:
+    """
+    Store each row (C, W) from `source` in the frame `frame` (C, H, W), and pass it on.
+    """
+    for r, row in enumerate(source):
+        frame[:, r, :] = row
+        yield row
+
+
+def windows(
+        source: Iterable[np.ndarray],
+        height: int,
+        count: int,
+        size: int,
+        stride: int = 1,
+        dilation: int = 1,
+        pad: int = 0,
+) -> Iterator[List[Optional[np.ndarray]]]:
+    """
+    Yield `count` windows of `size` rows, `dilation` rows apart and moving by `stride` rows,
+    over the `height` rows from `source`, with `pad` rows of zero padding before and after the
+    data. Padding rows are None. Rows are pulled from `source` when a window first needs them,
+    and released when no later window contains them.
+    """
+    source = iter(source)
+    held: Dict[int, np.ndarray] = {}
+    received = 0
+    for r in range(count):
+        indices = [r * stride + j * dilation - pad for j in range(size)]
+        while received <= min(indices[-1], height - 1):
+            held[received] = next(source)
+            received += 1
+        yield [held.get(i) for i in indices]
+
+        first = (r + 1) * stride - pad
+        for i in [i for i in held if i < first]:
+            del held[i]
+
+
+def pool_rows(
+        layer: int,
+        source: Iterable[np.ndarray],
+        input_size: Sequence[int],
+        pool: Sequence[int],
+        pool_stride: Sequence[int],
+        pool_average: bool,
+        dilation: Sequence[int] = (1, 1),
+        rounding: bool = False,
+) -> Tuple[Iterator[np.ndarray], List[int]]:
+    """
+    Pool the rows from `source` of a frame of `input_size` like simulate.pooling_layer().
+    Return a generator of the pooled rows, and the pooled size.
+    Ops are accounted when the first row is pulled.
+    """
+    pooled_size = [input_size[0],
+                   (input_size[1] + pool_stride[0] - pool[0] - dilation[0] + 1) // pool_stride[0],
+                   (input_size[2] + pool_stride[1] - pool[1] - dilation[1] + 1) // pool_stride[1]]
+
+    def pooled():
+        if pool[0] > 1 or pool[1] > 1:
+            stats.account(
+                layer,
+                "add" if pool_average else "comp",
+                pool[0] * pool[1] * pooled_size[0] * pooled_size[1] * pooled_size[2],
+            )
+            for window in windows(source, input_size[1], pooled_size[1], pool[0],
+                                  pool_stride[0], dilation[0]):
+                # Windows at the bottom edge may contain fewer rows
+                data = np.stack([row for row in window if row is not None], axis=1)
+                yield pool2d(
+                    layer,
+                    data,
+                    data.shape,
+                    (pooled_size[0], 1, pooled_size[2]),
+                    [data.shape[1], pool[1]],
+                    [1, pool_stride[1]],
+                    pool_average,
+                    dilation=[1, dilation[1]],
+                    floor=not rounding,
+                )[:, 0, :]
+        else:
+            # Use pool_stride only
+            for window in windows(source, input_size[1], pooled_size[1], 1, pool_stride[0]):
+                yield window[0][:, ::pool_stride[1]]
+
+    return pooled(), pooled_size
+
+
+def conv2d_rows(
+        layer: int,
+        source: Iterable[np.ndarray],
+        input_size: Sequence[int],
+        kernel_size: Sequence[int],
+        output_shift: Optional[int],
+        output_channels: int,
+        padding: Sequence[int],
+        dilation: Sequence[int],
+        stride: Sequence[int],
+        activation: Optional[int],
+        kernel: np.ndarray,
+        bias: Optional[np.ndarray],
+        bits: int = 8,
+        output_width: int = 8,
+        groups: int = 1,
+) -> Tuple[Iterator[np.ndarray], List[int]]:
+    """
+    Perform the 2D convolution of simulate.conv2d_layer() on the rows from `source` of a frame
+    of `input_size`, one output row at a time from a window of `kernel_size[0]` input rows.
+    Return a generator of the output rows, and the output size.
+    Ops are accounted when the first row is pulled.
+    """
+    out_size = [output_channels,
+                (input_size[1] - dilation[0] * (kernel_size[0] - 1) - 1 +
+                 2 * padding[0]) // stride[0] + 1,
+                (input_size[2] - dilation[1] * (kernel_size[1] - 1) - 1 +
+                 2 * padding[1]) // stride[1] + 1]
+
+    if bias is not None:
+        bias = bias * tc.dev.BIAS_DIV
+
+    def output():
+        stats.account(
+            layer,
+            "macc",
+            (input_size[0] // groups) * kernel_size[0] * kernel_size[1] * out_size[0]
+            * out_size[1] * out_size[2],
+        )
+        if activation is not None:
+            stats.account(
+                layer,
+                "comp",
+                out_size[0] * out_size[1] * out_size[2],
+            )
+
+        zero = np.zeros((input_size[0], input_size[2]), dtype=np.int64)
+        for window in windows(source, input_size[1], out_size[1], kernel_size[0], stride[0],
+                              dilation[0], padding[0]):
+            # The window already contains the dilated rows and the row padding
+            data = np.stack([zero if row is None else row for row in window], axis=1)
+            out_buf = conv2d(
+                layer,
+                data=data,
+                weight=kernel,
+                bias=bias,
+                input_size=data.shape,
+                output_size=[out_size[0], 1, out_size[2]],
+                kernel_size=kernel_size,
+                stride=[1, stride[1]],
+                pad=[0, padding[1]],
+                dilation=[1, dilation[1]],
+                fractional_stride=[1, 1],
+                output_pad=[0, 0],
+                groups=groups,
+            )[:, 0, :]
+
+            if output_width != 32:
+                requantize(out_buf, output_shift, bits, activation)
+            elif activation is not None:
+                requantize(out_buf, None, bits, activation)
+            yield out_buf
+
+    return output(), out_size
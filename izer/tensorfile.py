@@ -0,0 +1,142 @@
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Indexed tensor container.
+The tensors are stored back to back (aligned) in one data file that can be memory-mapped, and
+a JSON manifest (same name, extension .json) lists the offset, type, shape and attributes of
+each named tensor. Reading a tensor only maps the part of the data file that contains it.
+"""
+import json
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+VERSION = 1
+_ALIGN = 64  # Alignment of each tensor in the data file
+_BUFFER_SIZE = 16 * 1024 * 1024  # Write buffer size; small tensors are written in large chunks
+
+
+def manifest_filename(
+        filename: str,
+) -> str:
+    """
+    Return the name of the manifest of the container data file `filename`.
+    """
+    return os.path.splitext(filename)[0] + '.json'
+
+
+class Writer:
+    """
+    Write a tensor container to `filename` and its manifest.
+    """
+    def __init__(
+            self,
+            filename: str,
+    ):
+        self.filename = filename
+        self._file = open(filename, mode='wb',  # pylint: disable=consider-using-with
+                          buffering=_BUFFER_SIZE)
+        self._offset = 0
+        self._tensors: Dict[str, Dict[str, Any]] = {}
+
+    def add(
+            self,
+            name: str,
+            data,
+            **attrs,
+    ) -> None:
+        """
+        Append tensor `data` as `name`, with optional attributes `attrs` for the manifest.
+        """
+        if name in self._tensors:
+            raise ValueError(f'Duplicate tensor name `{name}` in {self.filename}')
+        data = np.ascontiguousarray(data)
+        pad = -self._offset % _ALIGN
+        if pad:
+            self._file.write(bytes(pad))
+            self._offset += pad
+        self._file.write(data.data if data.size > 0 else b'')
+        self._tensors[name] = {
+            'offset': self._offset,
+            'dtype': data.dtype.str,
+            'shape': list(data.shape),
+            **attrs,
+        }
+        self._offset += data.nbytes
+
+    def close(self) -> None:
+        """
+        Close the data file and write the manifest.
+        """
+        if self._file.closed:
+            return
+        self._file.close()
+        with open(manifest_filename(self.filename), mode='w', encoding='utf-8') as f:
+            json.dump({
+                'version': VERSION,
+                'data': os.path.basename(self.filename),
+                'tensors': self._tensors,
+            }, f, indent=1)
+
+    def __enter__(self) -> 'Writer':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class Reader:
+    """
+    Read the tensor container `filename` (the data file or its manifest).
+    """
+    def __init__(
+            self,
+            filename: str,
+    ):
+        with open(manifest_filename(filename), mode='r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != VERSION:
+            raise ValueError(f'Unsupported tensor container version in {filename}')
+        self.filename = os.path.join(os.path.dirname(filename), manifest['data'])
+        self._tensors: Dict[str, Dict[str, Any]] = manifest['tensors']
+
+    def names(self) -> List[str]:
+        """
+        Return the names of all tensors, in the order they were written.
+        """
+        return list(self._tensors)
+
+    def attrs(
+            self,
+            name: str,
+    ) -> Dict[str, Any]:
+        """
+        Return the manifest entry of tensor `name` (offset, dtype, shape and attributes).
+        """
+        return self._tensors[name]
+
+    def __contains__(
+            self,
+            name: str,
+    ) -> bool:
+        return name in self._tensors
+
+    def __getitem__(
+            self,
+            name: str,
+    ) -> np.ndarray:
+        """
+        Return tensor `name`, memory-mapped read-only.
+        """
+        entry = self._tensors[name]
+        shape = tuple(entry['shape'])
+        dtype = np.dtype(entry['dtype'])
+        if dtype.itemsize * int(np.prod(shape)) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.filename, dtype=dtype, mode='r', offset=entry['offset'],
+                         shape=shape)
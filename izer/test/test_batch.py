@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test simulating a batch of inputs in one pass.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import izer.tornadocnn as tc  # noqa: E402 pylint: disable=wrong-import-position
+from izer import op, simulate, state  # noqa: E402 pylint: disable=wrong-import-position
+
+BATCH = 3
+
+
+def compare(name, func, data, batch_axis=0, out_axis=0):
+    """
+    Compare `func` on the whole batch against `func` on each sample. The samples are taken
+    from `batch_axis` of the input, and stacked along `out_axis` of the output.
+    """
+    batch_out, _ = func(data)
+    sample_out = np.stack([func(np.take(data, n, axis=batch_axis))[0] for n in range(BATCH)],
+                          axis=out_axis)
+
+    print(name, "BATCH OK" if np.array_equal(batch_out, sample_out) else "*** FAILURE ***")
+    assert np.array_equal(batch_out, sample_out)
+
+
+def test_batch():
+    """Main program to test batched simulation."""
+    state.debug = True
+    state.output_layer = [False]
+    tc.dev = tc.get_device(85)
+
+    rng = np.random.default_rng(seed=7)
+
+    d2 = rng.integers(-128, 128, (BATCH, 8, 12, 12), dtype=np.int64)
+    k2 = rng.integers(-128, 128, (16, 8, 3, 3), dtype=np.int64)
+    kdw = rng.integers(-128, 128, (8, 1, 3, 3), dtype=np.int64)
+    b2 = rng.integers(-128, 128, 16, dtype=np.int64)
+
+    compare('conv2d', lambda d: simulate.conv2d_layer(
+        0, d.shape[-3:], [3, 3], 1, 16, [1, 1], [1, 1], [1, 1], op.ACT_RELU, k2, b2, d,
+    ), d2)
+    compare('conv2d (depthwise)', lambda d: simulate.conv2d_layer(
+        0, d.shape[-3:], [3, 3], 0, 8, [1, 1], [1, 1], [1, 1], op.ACT_ABS, kdw, None, d,
+        groups=8,
+    ), d2)
+    compare('conv2d (32-bit output)', lambda d: simulate.conv2d_layer(
+        0, d.shape[-3:], [3, 3], 0, 16, [1, 1], [1, 1], [1, 1], None, k2, b2, d,
+        output_width=32,
+    ), d2)
+    compare('convtranspose2d', lambda d: simulate.convtranspose2d_layer(
+        0, d.shape[-3:], [3, 3], 1, 16, [1, 1], [1, 1], [2, 2], [1, 1], op.ACT_RELU, k2, b2, d,
+    ), d2)
+
+    d1 = rng.integers(-128, 128, (BATCH, 8, 50), dtype=np.int64)
+    k1 = rng.integers(-128, 128, (16, 8, 5), dtype=np.int64)
+    compare('conv1d', lambda d: simulate.conv1d_layer(
+        0, d.shape[-2:], 5, 2, 16, 2, 1, 1, op.ACT_ABS, k1, b2, d,
+    ), d1)
+
+    d0 = rng.integers(-128, 128, (BATCH, 64), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (10, 64), dtype=np.int64)
+    b0 = rng.integers(-128, 128, 10, dtype=np.int64)
+    compare('linear', lambda d: simulate.linear_layer(0, op.ACT_RELU, w0, b0, d), d0)
+
+    # Element-wise and pooling data have a leading operands axis before the batch axis. The
+    # element-wise output has no operands axis; the pooling output keeps it.
+    de = rng.integers(-128, 128, (2, BATCH, 8, 12, 12), dtype=np.int64)
+    for operator in [op.ELTWISE_ADD, op.ELTWISE_SUB, op.ELTWISE_MUL, op.ELTWISE_XOR]:
+        compare(f'eltwise {op.string(operator, elt=True)}', lambda d: simulate.eltwise_layer(
+            operator, 0, d.shape[-3:], 1, d, operands=2,  # pylint: disable=cell-var-from-loop
+        ), de, batch_axis=1)
+
+    for average in [False, True]:
+        compare(f'pool2d (average={average})', lambda d: simulate.pooling_layer(
+            0, d.shape[-3:], [2, 2], [2, 2], average, d,  # pylint: disable=cell-var-from-loop
+            operands=2,
+        ), de, batch_axis=1, out_axis=1)
+        compare(f'pool1d (average={average})', lambda d: simulate.pooling_layer(
+            0, d.shape[-2:], [3, 1], [2, 1], average, d,  # pylint: disable=cell-var-from-loop
+            operation=op.CONV1D,
+        ), d1[np.newaxis, ...], batch_axis=1, out_axis=1)
+
+
+if __name__ == '__main__':
+    test_batch()
@@ -233,6 +233,42 @@ def test_conv2d():
 
     convolve(d1, w1, 1, 1, e1)
 
+    # Winograd F(2x2, 3x3) on odd and even sizes, with row tiling and threads
+    rng = np.random.default_rng(seed=14)
+    for shape, pad in [((16, 17, 23), 1), ((8, 12, 12), 0), ((3, 9, 4), 2), ((64, 5, 6), 1)]:
+        winograd(rng.integers(-128, 128, shape, dtype=np.int64),
+                 rng.integers(-128, 128, (24, shape[0], 3, 3), dtype=np.int64), pad)
+
+
+def winograd(data, weight, pad):
+    """Compare the Winograd path against the direct path"""
+    def run(sim_winograd, budget=256 * 1024 * 1024, threads=1):
+        saved = state.sim_winograd, state.sim_memory_budget, state.sim_threads
+        state.sim_winograd, state.sim_memory_budget, state.sim_threads = \
+            sim_winograd, budget, threads
+        try:
+            return compute.conv2d(
+                data,
+                weight,
+                None,
+                data.shape,
+                (weight.shape[0], data.shape[1] + 2 * pad - 2, data.shape[2] + 2 * pad - 2),
+                kernel_size=[3, 3],
+                stride=[1, 1],
+                pad=[pad, pad],
+                dilation=[1, 1],
+                fractional_stride=[1, 1],
+                output_pad=[0, 0],
+                groups=1,
+            )
+        finally:
+            state.sim_winograd, state.sim_memory_budget, state.sim_threads = saved
+
+    expected = run(False)
+    for output in [run(True), run(True, budget=1), run(True, threads=5)]:
+        print("WINOGRAD OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+        assert np.array_equal(output, expected)
+
 
 if __name__ == '__main__':
     test_conv2d()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the row-tiled conv2d and convtranspose2d operators with a small memory budget.
+"""
+import os
+import sys
+
+import numpy as np
+import torch
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def convolve(data, weight, pad, stride, dilation, groups, budget):
+    """Convolve data using a memory budget of `budget` bytes"""
+    t = torch.nn.functional.conv2d(
+        torch.as_tensor(data, dtype=torch.float).unsqueeze(0),  # Add batch dimension
+        torch.as_tensor(weight, dtype=torch.float),
+        bias=None,
+        stride=stride,
+        padding=pad,
+        groups=groups,
+        dilation=dilation,
+    ).int().squeeze(0).numpy()
+
+    saved_budget = state.sim_memory_budget
+    state.sim_memory_budget = budget
+    try:
+        output = compute.conv2d(
+            data,
+            weight,
+            None,
+            data.shape,
+            t.shape,
+            kernel_size=[weight.shape[2], weight.shape[3]],
+            stride=[stride, stride],
+            pad=[pad, pad],
+            dilation=[dilation, dilation],
+            fractional_stride=[1, 1],
+            output_pad=[0, 0],
+            groups=groups,
+        )
+    finally:
+        state.sim_memory_budget = saved_budget
+
+    print(f'Budget {budget}:', "PYTORCH OK" if np.array_equal(output, t) else "*** FAILURE ***")
+    assert np.array_equal(output, t)
+
+
+def deconvolve(data, weight, pad, output_pad, budget):
+    """Upsample data using a memory budget of `budget` bytes"""
+    t = torch.nn.functional.conv_transpose2d(
+        torch.as_tensor(data, dtype=torch.float).unsqueeze(0),
+        torch.as_tensor(np.flip(weight, axis=(2, 3)).swapaxes(0, 1).copy(), dtype=torch.float),
+        bias=None,
+        stride=2,
+        padding=pad,
+        output_padding=output_pad,
+        groups=1,
+        dilation=1,
+    ).int().squeeze(0).numpy()
+
+    saved_budget = state.sim_memory_budget
+    state.sim_memory_budget = budget
+    try:
+        output = compute.convtranspose2d(
+            data,
+            weight,
+            None,
+            data.shape,
+            t.shape,
+            kernel_size=[3, 3],
+            stride=[1, 1],
+            pad=[pad, pad],
+            dilation=[1, 1],
+            fractional_stride=[2, 2],
+            output_pad=[output_pad, output_pad],
+            groups=1,
+        )
+    finally:
+        state.sim_memory_budget = saved_budget
+
+    print(f'Budget {budget}:', "PYTORCH OK" if np.array_equal(output, t) else "*** FAILURE ***")
+    assert np.array_equal(output, t)
+
+
+def test_conv2d_tiled():
+    """Main program to test tiling in compute.conv2d and compute.convtranspose2d."""
+    state.debug = True
+
+    rng = np.random.default_rng(seed=20240401)
+    d0 = rng.integers(-128, 128, (8, 37, 41), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (16, 8, 3, 3), dtype=np.int64)
+    w1 = rng.integers(-128, 128, (8, 1, 3, 3), dtype=np.int64)
+
+    # One row per tile, a few rows per tile, and a single tile
+    for budget in [1, 64 * 1024, 256 * 1024 * 1024]:
+        convolve(d0, w0, pad=1, stride=1, dilation=1, groups=1, budget=budget)
+        convolve(d0, w0, pad=2, stride=2, dilation=2, groups=1, budget=budget)
+        convolve(d0, w1, pad=1, stride=1, dilation=1, groups=8, budget=budget)
+        deconvolve(d0, w0, pad=1, output_pad=1, budget=budget)
+
+
+if __name__ == '__main__':
+    test_conv2d_tiled()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test dilated Conv1d/Conv2d against a convolution with a zero-stretched kernel.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def conv2d_stretched(data, weight, pad, stride, dilation):
+    """Reference: 2D convolution with a zero-stretched kernel"""
+    data = np.pad(data, pad_width=((0, 0), (pad[0], pad[0]), (pad[1], pad[1])))
+    nweight = np.zeros((weight.shape[0], weight.shape[1],
+                        (weight.shape[2] - 1) * dilation[0] + 1,
+                        (weight.shape[3] - 1) * dilation[1] + 1), dtype=np.int64)
+    nweight[:, :, ::dilation[0], ::dilation[1]] = weight
+    h = (data.shape[1] - nweight.shape[2]) // stride[0] + 1
+    w = (data.shape[2] - nweight.shape[3]) // stride[1] + 1
+    output = np.zeros((weight.shape[0], h, w), dtype=np.int64)
+    for r in range(nweight.shape[2]):
+        for s in range(nweight.shape[3]):
+            window = data[:, r:r + (h - 1) * stride[0] + 1:stride[0],
+                          s:s + (w - 1) * stride[1] + 1:stride[1]]
+            output += np.einsum('oc,chw->ohw', nweight[:, :, r, s], window)
+    return output
+
+
+def test_dilation():
+    """Main program to test dilation in compute.conv1d and compute.conv2d."""
+    rng = np.random.default_rng(seed=3)
+
+    # Shapes of test_conv1d_dilation_wide.py, and longer inputs
+    for channels, length, pad, stride, dilation in [(3, 16, 1, 1, 2), (3, 33, 1, 1, 11),
+                                                    (16, 200, 2, 2, 4), (8, 97, 0, 3, 7)]:
+        data = rng.integers(-128, 128, (channels, length), dtype=np.int64)
+        weight = rng.integers(-128, 128, (5, channels, 3), dtype=np.int64)
+        expected = conv2d_stretched(data[:, np.newaxis, :], weight[:, :, np.newaxis, :],
+                                    [0, pad], [1, stride], [1, dilation])[:, 0, :]
+        output = compute.conv1d(data, weight, None, data.shape, expected.shape, kernel_size=3,
+                                stride=stride, pad=pad, dilation=dilation)
+        ok = np.array_equal(output, expected)
+        print(f'conv1d {channels}x{length} dilation {dilation}:',
+              "DILATION OK" if ok else "*** FAILURE ***")
+        assert ok
+
+    # Square and non-square kernels
+    for kernel, pad, stride, dilation in [([3, 3], [1, 1], [1, 1], [2, 2]),
+                                          ([3, 3], [2, 1], [2, 1], [3, 2]),
+                                          ([1, 3], [0, 1], [1, 1], [1, 4]),
+                                          ([3, 2], [1, 0], [1, 2], [2, 3])]:
+        data = rng.integers(-128, 128, (6, 17, 19), dtype=np.int64)
+        weight = rng.integers(-128, 128, (4, 6) + tuple(kernel), dtype=np.int64)
+        expected = conv2d_stretched(data, weight, pad, stride, dilation)
+        output = compute.conv2d(data, weight, None, data.shape, expected.shape,
+                                kernel_size=kernel, stride=stride, pad=pad, dilation=dilation,
+                                fractional_stride=[1, 1], output_pad=[0, 0])
+        ok = np.array_equal(output, expected)
+        print(f'conv2d {kernel[0]}x{kernel[1]} dilation {dilation}:',
+              "DILATION OK" if ok else "*** FAILURE ***")
+        assert ok
+
+
+if __name__ == '__main__':
+    test_dilation()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the n-ary element-wise operator against a pairwise loop.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, op  # noqa: E402 pylint: disable=wrong-import-position
+
+FUNCS = {
+    op.ELTWISE_ADD: np.add,
+    op.ELTWISE_MUL: np.multiply,
+    op.ELTWISE_OR: np.bitwise_or,
+    op.ELTWISE_SUB: np.subtract,
+    op.ELTWISE_XOR: np.bitwise_xor,
+}
+
+
+def test_eltwise():
+    """Main program to test compute.eltwise."""
+    rng = np.random.default_rng(seed=15)
+
+    for shape in [(8, 12, 12), (3, 8, 5, 7)]:  # Single sample, and batch of 3
+        for operands in range(1, 5):
+            data = rng.integers(-128, 128, (operands,) + shape, dtype=np.int64)
+            for operator, func in FUNCS.items():
+                expected = data[0]
+                for i in range(1, operands):
+                    expected = func(expected, data[i])
+
+                saved = data.copy()
+                output = compute.eltwise(operator, data, shape[-3:])
+
+                print(f'{operands}-operand {op.string(operator, elt=True)} {shape}:',
+                      "OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+                assert output.shape == data[0].shape
+                assert np.array_equal(output, expected)
+
+                # The operands are not modified, and the output is a new array
+                assert np.array_equal(data, saved)
+                output += 1
+                assert np.array_equal(data, saved)
+
+
+if __name__ == '__main__':
+    test_eltwise()
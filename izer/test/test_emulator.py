@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the memory-level emulator of the register program.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import izer.tornadocnn as tc  # noqa: E402 pylint: disable=wrong-import-position
+from izer import emulator, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def pack(data, doffs, expand=0):
+    """Return the 32-bit data memory word of pass `expand` of `data` at pixel `doffs`"""
+    val = 0
+    for c in range(4):
+        if 4 * expand + c < data.shape[0]:
+            val |= (int(data[4 * expand + c].flat[doffs]) & 0xff) << 8 * c
+    return val
+
+
+def emulate(data, out_buf, rptr, wptr, ena, passes=1):
+    """
+    Emulate one layer from processors 0-3 to processors 4-7 using `passes` input and output
+    passes, and return the emulator
+    """
+    emu = emulator.Emulator()
+    for doffs in range(data[0].size):
+        for expand in range(passes):
+            emu.write(tc.dev.C_SRAM_BASE + (doffs * passes + expand) * 4,
+                      pack(data, doffs, expand))
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_ENA, 0), ena)
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_RPTR_BASE, 0), rptr)
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_WPTR_BASE, 0), wptr)
+    if passes > 1:
+        emu.write(tc.lreg_addr(0, tc.dev.LREG_LCTL2, 0), (passes - 1) << 4 | passes - 1)
+        emu.write(tc.lreg_addr(0, tc.dev.LREG_WPTR_CHOFFS, 0), 1)
+
+    emu.run_layer(0, 0, data, out_buf, 0x0f, 0xf0)
+    # Processors 4-7 use the second data memory
+    for doffs in range(out_buf[0].size):
+        for expand in range(passes):
+            emu.expect(tc.dev.C_SRAM_BASE
+                       + (tc.dev.INSTANCE_SIZE * 4 + 0x10 + doffs * passes + expand) * 4,
+                       pack(out_buf, doffs, expand))
+    emu.check(0)
+    return emu
+
+
+def test_emulator():
+    """Main program to test izer.emulator."""
+    state.layer_name = [None]
+    tc.dev = tc.get_device(85)
+
+    rng = np.random.default_rng(seed=25)
+    data = rng.integers(-128, 128, (4, 3, 5), dtype=np.int64)
+    out_buf = rng.integers(-128, 128, (4, 3, 5), dtype=np.int64)
+    wptr = 1 << tc.dev.WRITE_PTR_SHIFT | 0x10
+
+    emu = emulate(data, out_buf, 0, wptr, 0x0f000f)
+    assert emu.errors == 0 and emu.compared == 15, emu.summary()
+
+    # Conv1d data (C, L) uses the same layout
+    emu = emulate(data.reshape(4, 15), out_buf.reshape(4, 15), 0, wptr, 0x0f000f)
+    assert emu.errors == 0 and emu.compared == 15, emu.summary()
+
+    # Wrong write pointer (memory and offset), read pointer, and processor enables
+    for args in [(0, 0x10, 0x0f000f), (0, wptr + 1, 0x0f000f), (1, wptr, 0x0f000f),
+                 (0, wptr, 0x1f001f)]:
+        emu = emulate(data, out_buf, *args)
+        assert emu.errors > 0 and len(emu.messages) <= emulator.MAX_MESSAGES, args
+
+    # Two input and output passes (channels 4-7 use the same processors as channels 0-3)
+    data = rng.integers(-128, 128, (8, 3, 5), dtype=np.int64)
+    out_buf = rng.integers(-128, 128, (7, 3, 5), dtype=np.int64)
+    emu = emulate(data, out_buf, 0, wptr, 0x0f000f, passes=2)
+    assert emu.errors == 0 and emu.compared == 30, emu.summary()
+    emu = emulate(data, out_buf, 0, wptr, 0x0f000f)
+    assert emu.errors > 0
+
+    # Streaming layers check the rollover buffer, but not the data
+    emu = emulator.Emulator()
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_ENA, 0), 0xff00ff)
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_WPTR_BASE, 0), 1 << tc.dev.WRITE_PTR_SHIFT | 0x40)
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_FMAX, 0), 0x20)
+    emu.run_layer(0, 0, None, out_buf[:4], 0xff, 0xf0, streaming=True)
+    assert emu.errors == 0 and emu.streamed == 1 and not np.any(emu.valid), emu.summary()
+    emu.write(tc.lreg_addr(0, tc.dev.LREG_FMAX, 0), 0x41)
+    emu.run_layer(0, 0, None, out_buf[:4], 0xff, 0xf0, streaming=True)
+    assert emu.errors == 1, emu.summary()
+
+    # Unsupported layers store the expected output for the next layer
+    emu = emulator.Emulator()
+    emu.run_layer(0, 0, data, out_buf, 0x0f, 0xf0, supported=False)
+    emu.expect(tc.dev.C_SRAM_BASE + 8, 0x12345678, mask=0xff00ff00)
+    emu.check(0, supported=False)
+    ok = emu.errors == 0 and emu.skipped == 1 and int(emu.data[0, 0, 2]) == 0x12005600
+    print("EMULATOR OK" if ok else "*** FAILURE ***")
+    assert ok
+
+
+if __name__ == '__main__':
+    test_emulator()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the compute engines against the integer NumPy engine, and the engine verify mode.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import izer.tornadocnn as tc  # noqa: E402 pylint: disable=wrong-import-position
+from izer import engines, op, simulate, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def compare(name, operator, /, **kwargs):
+    """Run `operator` using all engines and compare against the NumPy engine"""
+    expected = getattr(engines.registry['numpy'], operator)(**kwargs)
+    for engine_name, engine in engines.registry.items():
+        output = getattr(engine, operator)(**kwargs)
+        print(f'{name} ({engine_name}):',
+              "ENGINE OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+        assert output.shape == expected.shape
+        assert np.array_equal(output, expected)
+
+
+def conv2d_args(data, weight, bias, pad, stride, dilation, groups):
+    """Return the compute.conv2d arguments for a convolution"""
+    out_size = (weight.shape[0],
+                (data.shape[-2] + 2 * pad - dilation * (weight.shape[2] - 1) - 1) // stride + 1,
+                (data.shape[-1] + 2 * pad - dilation * (weight.shape[3] - 1) - 1) // stride + 1)
+    return {'data': data, 'weight': weight, 'bias': bias, 'input_size': data.shape[-3:],
+            'output_size': out_size, 'kernel_size': weight.shape[2:], 'stride': [stride, stride],
+            'pad': [pad, pad], 'dilation': [dilation, dilation], 'fractional_stride': [1, 1],
+            'output_pad': [0, 0], 'groups': groups}
+
+
+def test_engines():
+    """Main program to test the compute engines."""
+    state.debug = True
+    state.output_layer = [False]
+    state.layer_name = [None]
+    tc.dev = tc.get_device(85)
+
+    rng = np.random.default_rng(seed=13)
+    d0 = rng.integers(-128, 128, (16, 20, 24), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (32, 16, 3, 3), dtype=np.int64)
+    w1 = rng.integers(-128, 128, (16, 1, 3, 3), dtype=np.int64)
+    w2 = rng.integers(-128, 128, (8, 4, 3, 3), dtype=np.int64)
+    b0 = rng.integers(-2**14, 2**14, 32, dtype=np.int64)
+
+    compare('conv2d', 'conv2d', **conv2d_args(d0, w0, b0, 1, 1, 1, 1))
+    compare('conv2d (stride, dilation)', 'conv2d', **conv2d_args(d0, w0, None, 2, 2, 2, 1))
+    compare('conv2d (depthwise)', 'conv2d', **conv2d_args(d0, w1, None, 1, 1, 1, 16))
+    compare('conv2d (groups)', 'conv2d', **conv2d_args(d0, w2, b0[:8], 0, 1, 1, 4))
+    compare('conv2d (batch)', 'conv2d',
+            **conv2d_args(np.stack([d0, -d0, d0 // 3]), w0, b0, 1, 1, 1, 1))
+
+    for weight, groups, dilation in [(w0, 1, 1), (w2, 4, 1), (w0, 1, 2)]:
+        out_dim = [(d0.shape[i + 1] - 1) * 2 - 2 + dilation * 2 + 1 + 1 for i in range(2)]
+        compare(f'convtranspose2d (groups {groups}, dilation {dilation})', 'convtranspose2d',
+                data=d0, weight=weight, bias=None, input_size=d0.shape,
+                output_size=(weight.shape[0], out_dim[0], out_dim[1]), kernel_size=[3, 3],
+                stride=[1, 1], pad=[1, 1], dilation=[dilation, dilation],
+                fractional_stride=[2, 2], output_pad=[1, 1], groups=groups)
+
+    d1 = rng.integers(-128, 128, (16, 100), dtype=np.int64)
+    w3 = rng.integers(-128, 128, (24, 16, 5), dtype=np.int64)
+    for stride, pad, dilation in [(1, 0, 1), (2, 2, 1), (1, 1, 3)]:
+        length = (d1.shape[1] + 2 * pad - dilation * 4 - 1) // stride + 1
+        compare(f'conv1d (stride {stride}, dilation {dilation})', 'conv1d',
+                data=d1, weight=w3, bias=b0[:24], input_size=d1.shape,
+                output_size=(24, length, 1), kernel_size=5, stride=stride, pad=pad,
+                dilation=dilation)
+
+    d2 = rng.integers(-128, 128, (3, 1024), dtype=np.int64)
+    w4 = rng.integers(-128, 128, (256, 1024), dtype=np.int64)
+    b1 = rng.integers(-128, 128, 256, dtype=np.int64)
+    compare('linear', 'linear', layer=0, data=d2[0], weight=w4, bias=b1,
+            in_features=1024, out_features=256)
+    compare('linear (batch)', 'linear', layer=0, data=d2, weight=w4, bias=None,
+            in_features=1024, out_features=256)
+
+    d4 = rng.integers(-128, 128, (3, 8, 6, 6), dtype=np.int64)
+    for operator in [op.ELTWISE_ADD, op.ELTWISE_SUB, op.ELTWISE_MUL, op.ELTWISE_XOR]:
+        compare(f'eltwise ({op.string(operator, elt=True)})', 'eltwise', operator=operator,
+                data=d4, input_size=d4.shape[1:])
+
+    # Values that exceed the exactness bound must fall back to integer arithmetic
+    d3 = rng.integers(2**40, 2**41, (16, 6, 6), dtype=np.int64)
+    w5 = np.full((4, 16, 3, 3), 127, dtype=np.int64)
+    compare('conv2d (large values)', 'conv2d', **conv2d_args(d3, w5, None, 1, 1, 1, 1))
+
+    # Verify mode runs both engines through simulate
+    saved = state.compute_engine, state.compute_verify
+    try:
+        state.compute_engine, state.compute_verify = 'torch', 'numpy'
+        simulate.conv2d_layer(0, d0.shape, [3, 3], 1, 32, [1, 1], [1, 1], [1, 1],
+                              op.ACT_RELU, w0, b0, d0)
+        simulate.linear_layer(0, op.ACT_RELU, w4, None, d2[0])
+        simulate.eltwise_layer(op.ELTWISE_ADD, 0, d4.shape[1:], 0, d4, operands=3)
+
+        # A mismatch stops the simulation
+        class BrokenEngine(engines.Engine):
+            """Engine with wrong results"""
+            def conv2d(self, *args, **kwargs):
+                return super().conv2d(*args, **kwargs) + 1
+
+        engines.registry['broken'] = BrokenEngine()
+        state.compute_verify = 'broken'
+        try:
+            simulate.conv2d_layer(0, d0.shape, [3, 3], 1, 32, [1, 1], [1, 1], [1, 1],
+                                  op.ACT_RELU, w0, b0, d0)
+            stopped = False
+        except SystemExit:
+            stopped = True
+        print("VERIFY OK" if stopped else "*** FAILURE ***")
+        assert stopped
+    finally:
+        state.compute_engine, state.compute_verify = saved
+        engines.registry.pop('broken', None)
+
+
+if __name__ == '__main__':
+    test_engines()
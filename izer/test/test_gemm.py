@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the exact float64 BLAS GEMM engine against the integer engine.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def run_engines(func):
+    """Run `func` using integer arithmetic and using BLAS and compare the results"""
+    expected = func(False)
+    output = func(True)
+
+    print("GEMM OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+    assert output.dtype == np.int64
+    assert np.array_equal(output, expected)
+
+
+def conv2d(data, weight, bias, out_size, pad, stride, dilation, groups, blas):
+    """Run compute.conv2d"""
+    return compute.conv2d(
+        data,
+        weight,
+        bias,
+        data.shape,
+        out_size,
+        kernel_size=weight.shape[2:],
+        stride=[stride, stride],
+        pad=[pad, pad],
+        dilation=[dilation, dilation],
+        fractional_stride=[1, 1],
+        output_pad=[0, 0],
+        groups=groups,
+        blas=blas,
+    )
+
+
+def test_gemm():
+    """Main program to test the blas compute engine."""
+    state.debug = True
+
+    rng = np.random.default_rng(seed=6)
+    d0 = rng.integers(-128, 128, (16, 20, 24), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (32, 16, 3, 3), dtype=np.int64)
+    w1 = rng.integers(-128, 128, (16, 1, 3, 3), dtype=np.int64)
+    w2 = rng.integers(-128, 128, (8, 4, 1, 1), dtype=np.int64)
+    b0 = rng.integers(-2**14, 2**14, 32, dtype=np.int64)
+
+    # Conv2d, with and without bias, stride, dilation, groups
+    run_engines(lambda blas: conv2d(d0, w0, None, (32, 20, 24), 1, 1, 1, 1, blas))
+    run_engines(lambda blas: conv2d(d0, w0, b0, (32, 10, 12), 2, 2, 2, 1, blas))
+    run_engines(lambda blas: conv2d(d0, w1, None, (16, 20, 24), 1, 1, 1, 16, blas))
+    run_engines(lambda blas: conv2d(d0, w2, None, (8, 20, 24), 0, 1, 1, 4, blas))
+
+    # ConvTranspose2d
+    run_engines(lambda blas: compute.convtranspose2d(
+        d0, w0, None, d0.shape, (32, 40, 48), kernel_size=[3, 3], stride=[1, 1], pad=[1, 1],
+        dilation=[1, 1], fractional_stride=[2, 2], output_pad=[1, 1], groups=1, blas=blas,
+    ))
+
+    # Conv1d
+    d1 = rng.integers(-128, 128, (16, 100), dtype=np.int64)
+    w3 = rng.integers(-128, 128, (24, 16, 5), dtype=np.int64)
+    run_engines(lambda blas: compute.conv1d(
+        d1, w3, None, d1.shape, (24, 96), kernel_size=5, stride=1, pad=0, dilation=1, blas=blas,
+    ))
+    run_engines(lambda blas: compute.conv1d(
+        d1, w3, None, d1.shape, (24, 92), kernel_size=5, stride=1, pad=0, dilation=2, blas=blas,
+    ))
+
+    # Linear
+    d2 = rng.integers(-128, 128, 1024, dtype=np.int64)
+    w4 = rng.integers(-128, 128, (256, 1024), dtype=np.int64)
+    b1 = rng.integers(-128, 128, 256, dtype=np.int64)
+    run_engines(lambda blas: compute.linear(0, d2, w4, b1, 1024, 256, blas=blas))
+
+    # Values that exceed the exactness bound must fall back to the integer path
+    d3 = rng.integers(2**40, 2**41, (16, 6, 6), dtype=np.int64)
+    w5 = np.full((4, 16, 3, 3), 127, dtype=np.int64)
+    run_engines(lambda blas: conv2d(d3, w5, None, (4, 6, 6), 1, 1, 1, 1, blas))
+
+
+if __name__ == '__main__':
+    test_gemm()
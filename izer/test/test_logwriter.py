@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the background log writer against printing directly.
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import logwriter, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def log(arrays):
+    """Print a header and each array (modifying it afterwards), and format options"""
+    for i, a in enumerate(arrays):
+        print(f'ARRAY #{i}', end='')
+        print(':')
+        logwriter.print_array(a)
+        a += 1  # Buffers are modified in place after printing
+    with np.printoptions(formatter={'int': '{0:4}'.format}):
+        logwriter.print_array(arrays[0])
+    print('DONE')
+
+
+def test_logwriter():
+    """Main program to test the background log writer."""
+    rng = np.random.default_rng(seed=17)
+
+    def arrays():
+        return [rng.integers(-128, 128, shape, dtype=np.int64)
+                for shape in [(4, 5), (16, 30, 30), (3,), (2, 8, 8)]]
+
+    saved = sys.stdout, state.log_max_elements
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'log.txt')
+            for max_elements in [None, 100]:
+                state.log_max_elements = max_elements
+                expected = io.StringIO()
+                data = arrays()
+                with contextlib.redirect_stdout(expected), \
+                        np.printoptions(threshold=max_elements or sys.maxsize):
+                    log([a.copy() for a in data])
+
+                sys.stdout = logwriter.open_log(filename)
+                with np.printoptions(threshold=sys.maxsize):
+                    log([a.copy() for a in data])
+                sys.stdout.close()
+                sys.stdout = saved[0]
+
+                with open(filename, encoding='utf-8') as f:
+                    output = f.read()
+                if max_elements is None:
+                    ok = output == expected.getvalue()
+                    assert not os.path.exists(os.path.join(directory, 'log.npz'))
+                else:
+                    # Large arrays are summarized, and saved in full
+                    ok = output.replace("(full data: log.npz['arr_0'])\n", '') \
+                        .replace("(full data: log.npz['arr_1'])\n", '') == expected.getvalue()
+                    with np.load(os.path.join(directory, 'log.npz')) as npz:
+                        assert sorted(npz.files) == ['arr_0', 'arr_1']
+                        ok = ok and np.array_equal(npz['arr_0'], data[1]) \
+                            and np.array_equal(npz['arr_1'], data[3])
+                print(f'Maximum elements {max_elements}:',
+                      "LOG OK" if ok else "*** FAILURE ***")
+                assert ok
+
+            # The output does not depend on the print options that the main thread uses while
+            # the background thread formats earlier arrays
+            state.log_max_elements = None
+            data = arrays()
+            outputs = []
+            for _ in range(2):
+                sys.stdout = logwriter.open_log(filename)
+                for i in range(200):
+                    with np.printoptions(formatter={'int': '{0:4}'.format} if i % 2 else None,
+                                         threshold=sys.maxsize):
+                        logwriter.print_array(data[i % len(data)])
+                    with np.printoptions(formatter={'int': '{0:x}'.format}, linewidth=40):
+                        pass
+                sys.stdout.close()
+                sys.stdout = saved[0]
+                with open(filename, encoding='utf-8') as f:
+                    outputs.append(f.read())
+            expected = io.StringIO()
+            with contextlib.redirect_stdout(expected):
+                for i in range(200):
+                    with np.printoptions(formatter={'int': '{0:4}'.format} if i % 2 else None,
+                                         threshold=sys.maxsize):
+                        print(data[i % len(data)])
+            ok = outputs[0] == outputs[1] == expected.getvalue()
+            print("LOG DETERMINISTIC" if ok else "*** FAILURE ***")
+            assert ok
+    finally:
+        sys.stdout, state.log_max_elements = saved
+
+
+if __name__ == '__main__':
+    test_logwriter()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test compact activation storage, and that the compute functions widen narrow inputs.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def compare(name, func, data):
+    """Run `func` on int64 `data` and on the narrowed `data` and compare the results"""
+    expected = func(data)
+    output = func(compute.narrow(data))
+    print(f'{name}:', "NARROW OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+    assert output.dtype == np.int64
+    assert np.array_equal(output, expected)
+
+
+def test_narrow():
+    """Main program to test compute.narrow."""
+    state.debug = True
+
+    for low, high, dtype in [(-128, 128, np.int8), (0, 1, np.int8), (-129, 0, np.int32),
+                             (-2**31, 2**31, np.int32), (0, 2**31 + 1, np.int64)]:
+        data = np.array([low, high - 1], dtype=np.int64)
+        assert compute.narrow(data).dtype == dtype, (low, high)
+        assert np.array_equal(compute.narrow(data), data)
+
+    rng = np.random.default_rng(seed=18)
+    d0 = rng.integers(-128, 128, (16, 12, 12), dtype=np.int64)
+    d0[0, :4, :4] = 127  # Sums of windows that overflow int8
+    d0[1, :4, :4] = -128
+    w0 = rng.integers(-128, 128, (8, 16, 3, 3), dtype=np.int64)
+
+    compare('conv2d', lambda d: compute.conv2d(
+        d, w0, None, d0.shape, (8, 12, 12), kernel_size=[3, 3], stride=[1, 1], pad=[1, 1],
+        dilation=[1, 1], fractional_stride=[1, 1], output_pad=[0, 0],
+    ), d0)
+    compare('convtranspose2d', lambda d: compute.convtranspose2d(
+        d, w0, None, d0.shape, (8, 24, 24), kernel_size=[3, 3], stride=[1, 1], pad=[1, 1],
+        dilation=[1, 1], fractional_stride=[2, 2], output_pad=[1, 1],
+    ), d0)
+    for average in [False, True]:
+        compare(f'pool2d (average {average})', lambda d, a=average: compute.pool2d(
+            d, d0.shape, (16, 3, 3), [4, 4], [4, 4], a,
+        ), d0)
+        compare(f'pool1d (average {average})', lambda d, a=average: compute.pool1d(
+            d, (16, 144), (16, 36), 4, 4, a,
+        ), d0.reshape(16, 144))
+    compare('conv1d', lambda d: compute.conv1d(
+        d, w0.reshape(8, 16, 9)[:, :, :5], None, (16, 144), (8, 140), kernel_size=5, stride=1,
+        pad=0, dilation=1,
+    ), d0.reshape(16, 144))
+
+
+if __name__ == '__main__':
+    test_narrow()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the vectorized 1D pooling operator against the previous loop implementation.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def pool1d_loop(data, output_size, pool, stride, average, dilation, floor):
+    """Reference: the previous element-by-element loop, with dilation applied to max pooling"""
+    pooled = np.empty(shape=output_size, dtype=np.int64)
+    for c in range(data.shape[0]):
+        for x in range(0, output_size[1]*stride, stride):
+            window = data[c][x:x+pool*dilation:dilation]
+            if average:
+                avg = np.average(window)
+                if floor:
+                    avg = np.ceil(avg) if avg < 0 else np.floor(avg)
+                else:
+                    avg = np.ceil(avg - 0.5) if avg < 0 else np.floor(avg + 0.5)
+                val = np.int64(avg).clip(min=-128, max=127)
+            else:
+                val = np.amax(window)
+            pooled[c][x//stride] = val
+
+    return pooled
+
+
+def pool(data, pool_size, stride, average, dilation=1, floor=True):
+    """Pool data using compute.pool1d and compare against the loop"""
+    # Same output length as simulate.pooling_layer()
+    length = (data.shape[1] + stride - pool_size - dilation + 1) // stride
+    output_size = (data.shape[0], length)
+
+    output = compute.pool1d(data, data.shape, output_size, pool_size, stride, average,
+                            dilation=dilation, floor=floor)
+    expected = pool1d_loop(data, output_size, pool_size, stride, average, dilation, floor)
+
+    print(f'pool={pool_size} stride={stride} dilation={dilation} average={average} '
+          f'floor={floor}:', "LOOP OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+    assert output.shape == output_size
+    assert np.array_equal(output, expected)
+
+
+def test_pool1d():
+    """Main program to test compute.pool1d."""
+    state.debug = True
+
+    rng = np.random.default_rng(seed=8)
+    data = rng.integers(-128, 128, (16, 97), dtype=np.int64)
+
+    for average in [False, True]:
+        for floor in [True, False]:
+            for pool_size, stride, dilation in [(1, 1, 1), (2, 2, 1), (3, 1, 1), (3, 2, 1),
+                                                (4, 3, 1), (16, 16, 1), (2, 1, 2), (3, 2, 2),
+                                                (3, 1, 4), (5, 3, 3)]:
+                pool(data, pool_size, stride, average, dilation, floor)
+
+    # Windows that average to exactly -x.5 and x.5 exercise the rounding direction
+    halves = np.array([[-3, -2, -1, 0, 1, 2, 3, 4]], dtype=np.int64)
+    for floor in [True, False]:
+        pool(halves, 2, 1, True, floor=floor)
+
+
+if __name__ == '__main__':
+    test_pool1d()
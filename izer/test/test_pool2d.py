@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the 2D pooling operator, including large (summed-area table) pools.
+"""
+import os
+import sys
+
+import numpy as np
+import torch
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def pool(data, pool_size, stride, dilation, average, floor=True):
+    """Pool data using compute.pool2d and compare against PyTorch or the exact mean"""
+    # Same output size as simulate.pooling_layer()
+    output_size = (data.shape[0],
+                   (data.shape[1] + stride - pool_size - dilation + 1) // stride,
+                   (data.shape[2] + stride - pool_size - dilation + 1) // stride)
+
+    output = compute.pool2d(data, data.shape, output_size, [pool_size, pool_size],
+                            [stride, stride], average, dilation=[dilation, dilation],
+                            floor=floor)
+    assert output.shape == output_size
+
+    if average:
+        # PyTorch does not support dilated average pooling; use the exact float mean
+        expected = np.empty(output_size, dtype=np.int64)
+        for row in range(output_size[1]):
+            for col in range(output_size[2]):
+                avg = data[:, row*stride:row*stride+pool_size*dilation:dilation,
+                           col*stride:col*stride+pool_size*dilation:dilation].mean(axis=(1, 2))
+                if not floor:
+                    avg += np.where(avg < 0., -0.5, 0.5)
+                expected[:, row, col] = np.trunc(avg).clip(min=-128, max=127)
+    else:
+        expected = torch.nn.functional.max_pool2d(
+            torch.as_tensor(data, dtype=torch.float).unsqueeze(0),  # Add batch dimension
+            kernel_size=pool_size,
+            stride=stride,
+            dilation=dilation,
+        ).int().squeeze(0).numpy()
+        # PyTorch only returns complete windows
+        output = output[:, :expected.shape[1], :expected.shape[2]]
+
+    print(f'pool={pool_size} stride={stride} dilation={dilation} average={average} '
+          f'floor={floor}:', "OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+    assert np.array_equal(output, expected)
+
+
+def test_pool2d():
+    """Main program to test compute.pool2d."""
+    state.debug = True
+
+    rng = np.random.default_rng(seed=9)
+    data = rng.integers(-128, 128, (8, 35, 29), dtype=np.int64)
+
+    for average in [False, True]:
+        for floor in [True, False]:
+            for pool_size, stride, dilation in [(2, 2, 1), (3, 1, 1), (3, 3, 2), (4, 4, 1),
+                                                (4, 2, 2), (8, 8, 1), (8, 3, 1), (5, 1, 3)]:
+                pool(data, pool_size, stride, dilation, average, floor)
+
+
+if __name__ == '__main__':
+    test_pool2d()
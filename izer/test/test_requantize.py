@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the fused integer requantization and activation against the floating point version.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import op, simulate  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def requantize_float(buf, output_shift, bits, activation):
+    """Reference: the previous floating point requantization followed by the activation"""
+    buf = np.floor(0.5 + buf / (128 / 2.0**output_shift)).astype(np.int64). \
+        clip(-(2**(bits-1)), 2**(bits-1)-1)
+    if activation == op.ACT_RELU:
+        np.clip(buf, 0, 2**(bits-1)-1, buf)
+    elif activation == op.ACT_ABS:
+        buf = np.abs(buf).clip(0, 2**(bits-1)-1)
+    return buf
+
+
+def test_requantize():
+    """Main program to test simulate.requantize."""
+    rng = np.random.default_rng(seed=11)
+    acc = np.concatenate((
+        rng.integers(-2**24, 2**24, 10000, dtype=np.int64),
+        rng.integers(-512, 512, 10000, dtype=np.int64),
+        np.arange(-2048, 2048, dtype=np.int64),  # All rounding cases for small shifts
+    ))
+
+    for bits in [8, 16]:
+        for output_shift in range(-15, 16):
+            for activation in [None, op.ACT_RELU, op.ACT_ABS]:
+                expected = requantize_float(acc, output_shift, bits, activation)
+
+                # Fused
+                output = simulate.requantize(acc.copy(), np.int64(output_shift), bits,
+                                             activation)
+                assert np.array_equal(output, expected), (bits, output_shift, activation)
+
+                # Requantization and activation in two steps, as used for verbose output
+                output = simulate.requantize(acc.copy(), output_shift, bits)
+                simulate.requantize(output, None, bits, activation)
+                assert np.array_equal(output, expected), (bits, output_shift, activation)
+
+    # In place
+    buf = acc.copy()
+    assert simulate.requantize(buf, 0, 8, op.ACT_RELU) is buf
+
+    print("REQUANTIZE OK")
+
+
+if __name__ == '__main__':
+    test_requantize()
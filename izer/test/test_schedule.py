@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the simulation order and the last reads of the simulation data buffer.
+"""
+import os
+import sys
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import schedule  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def test_schedule():
+    """Main program to test izer.schedule."""
+    # Residual network: 0 -> 1 -> 2 -> 3 (adds outputs of 0 and 2) -> 4
+    layers = 5
+    next_sequence = [1, 2, 3, 4, -1]
+    in_sequences = [None, None, None, [0, 2], None]
+    order = schedule.simulation_order(0, layers, next_sequence, [None] * layers)
+    assert order == [0, 1, 2, 3, 4]
+    assert schedule.buffer_reads(3, in_sequences) == [1, 3]
+    # The output of layer 0 (entry 1) is needed until layer 3
+    assert schedule.last_reads(order, in_sequences) == {0: 0, 1: 3, 2: 2, 3: 3, 4: 4}
+
+    # Partial simulation, simulated sequence, and the network input read by a later layer
+    simulated_sequence = [None, 3, None, None, None]
+    in_sequences = [None, None, None, [-1, 0], [-2]]
+    order = schedule.simulation_order(0, layers, next_sequence, simulated_sequence)
+    assert order == [0, 1, 3, 4]
+    assert schedule.last_reads(order, in_sequences) == {0: 2, 1: 2}
+    assert schedule.simulation_order(3, layers, next_sequence, simulated_sequence) == [3, 4]
+
+    # Two branches from layer 0 (1 -> 2 and 3) joined by layer 4
+    next_sequence = [1, 2, 3, 4, -1]
+    in_sequences = [None, None, None, [0], [2, 3]]
+    order = schedule.simulation_order(0, layers, next_sequence, [None] * layers)
+    assert schedule.dependencies(order, in_sequences) == [set(), {0}, {1}, {0}, {2, 3}]
+    # Reading the output of a layer that is simulated later is not supported
+    assert schedule.dependencies(order, [None, [3], None, None, None]) is None
+
+    print("SCHEDULE OK")
+
+
+if __name__ == '__main__':
+    test_schedule()
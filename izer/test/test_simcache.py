@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the simulation cache keys, entries and LRU eviction.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import simcache, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def test_simcache():
+    """Main program to test izer.simcache."""
+    rng = np.random.default_rng(seed=21)
+    data = rng.integers(-128, 128, (16, 8, 8), dtype=np.int64)
+    weight = rng.integers(-128, 128, (32, 16, 3, 3), dtype=np.int64)
+
+    # Keys depend on all values, types and shapes, but not on the memory layout
+    k = simcache.key([data, weight, None], [3, [1, 1]])
+    assert k == simcache.key([np.asfortranarray(data), weight, None], [3, [1, 1]])
+    modified = data.copy()
+    modified[3, 4, 5] += 1
+    for other in [simcache.key([modified, weight, None], [3, [1, 1]]),
+                  simcache.key([data.astype(np.int8), weight, None], [3, [1, 1]]),
+                  simcache.key([data.reshape(16, 64), weight, None], [3, [1, 1]]),
+                  simcache.key([data, weight, np.zeros(32)], [3, [1, 1]]),
+                  simcache.key([data, weight, None], [3, [2, 1]])]:
+        assert other != k
+
+    saved = state.sim_cache, state.sim_cache_size
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            state.sim_cache = directory
+            assert simcache.load(k) is None
+
+            output = rng.integers(-128, 128, (32, 8, 8), dtype=np.int64).astype(np.int8)
+            simcache.store(k, output, (32, 8, 8), {'macc': 1000})
+            cached, output_size, ops = simcache.load(k)
+            assert np.array_equal(cached, output) and cached.dtype == np.int8
+            assert output_size == [32, 8, 8] and ops == {'macc': 1000}
+            del cached  # Release the memory map
+
+            # Evict the least recently used entries first
+            keys = [simcache.key([output], [i]) for i in range(4)]
+            for i, ki in enumerate(keys):
+                simcache.store(ki, output, (32, 8, 8), {})
+                for ext in ('.npy', '.json'):
+                    t = time.time() - 100 + i
+                    os.utime(os.path.join(directory, ki[:2], ki + ext), (t, t))
+            simcache.load(keys[0])  # Most recently used
+            size = sum(os.path.getsize(os.path.join(directory, ki[:2], ki + ext))
+                       for ki in (k, keys[0]) for ext in ('.npy', '.json'))
+            state.sim_cache_size = size
+            simcache.evict()
+            present = [simcache.load(ki) is not None for ki in keys]
+            ok = present == [True, False, False, False] and simcache.load(k) is not None
+            print("SIMCACHE OK" if ok else "*** FAILURE ***")
+            assert ok
+    finally:
+        state.sim_cache, state.sim_cache_size = saved
+
+
+if __name__ == '__main__':
+    test_simcache()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the row-by-row simulation of chains of streaming layers.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import izer.tornadocnn as tc  # noqa: E402 pylint: disable=wrong-import-position
+from izer import op, simulate, state, stream  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def frame_layer(layer, data, pool, pool_stride, pool_average, pool_dilation, kernel_size,
+                padding, dilation, stride, activation, kernel, bias, output_width):
+    """Simulate a layer on the whole frame `data`"""
+    pooled, pooled_size = simulate.pooling_layer(layer, data.shape, pool, pool_stride,
+                                                 pool_average, np.expand_dims(data, 0),
+                                                 dilation=pool_dilation)
+    return simulate.conv2d_layer(layer, pooled_size, kernel_size, 1, kernel.shape[0], padding,
+                                 dilation, stride, activation, kernel, bias,
+                                 np.squeeze(pooled, axis=0), output_width=output_width)
+
+
+def row_layer(layer, rows, size, pool, pool_stride, pool_average, pool_dilation, kernel_size,
+              padding, dilation, stride, activation, kernel, bias, output_width):
+    """Simulate a layer row by row"""
+    pooled, pooled_size = stream.pool_rows(layer, rows, size, pool, pool_stride, pool_average,
+                                           dilation=pool_dilation)
+    return stream.conv2d_rows(layer, pooled, pooled_size, kernel_size, 1, kernel.shape[0],
+                              padding, dilation, stride, activation, kernel, bias,
+                              output_width=output_width)
+
+
+def test_stream():
+    """Main program to test izer.stream."""
+    state.debug = True
+    state.output_layer = [False] * 4
+    tc.dev = tc.get_device(85)
+
+    rng = np.random.default_rng(seed=24)
+
+    # pool, pool_stride, pool_average, pool_dilation, kernel_size, padding, dilation, stride,
+    # activation, output_width
+    chain = [
+        ([2, 2], [2, 2], False, [1, 1], [3, 3], [1, 1], [1, 1], [1, 1], op.ACT_RELU, 8),
+        ([3, 3], [1, 1], True, [2, 2], [3, 3], [2, 2], [2, 2], [1, 1], None, 8),
+        ([1, 1], [2, 2], False, [1, 1], [1, 1], [0, 0], [1, 1], [1, 1], op.ACT_ABS, 8),
+        ([2, 2], [1, 1], True, [1, 1], [3, 3], [0, 1], [1, 1], [1, 1], None, 32),
+    ]
+    channels = [4, 8, 8, 16, 8]
+    kernels = [rng.integers(-128, 128, (channels[i + 1], channels[i]) + tuple(c[4]),
+                            dtype=np.int64) for i, c in enumerate(chain)]
+    biases = [rng.integers(-128, 128, channels[i + 1], dtype=np.int64) if i % 2 else None
+              for i in range(len(chain))]
+    data = rng.integers(-128, 128, (channels[0], 61, 20), dtype=np.int64)
+
+    expected = []
+    d = data
+    for ll, c in enumerate(chain):
+        d, _ = frame_layer(ll, d, *c[:9], kernels[ll], biases[ll], c[9])
+        expected.append(d)
+
+    frames = []
+    collectors = []
+    rows, size = stream.rows(data.astype(np.int8)), data.shape
+    for ll, c in enumerate(chain):
+        rows, size = row_layer(ll, rows, size, *c[:9], kernels[ll], biases[ll], c[9])
+        frames.append(np.empty(size, dtype=np.int64))
+        rows = stream.collect(rows, frames[-1])
+        collectors.append(rows)
+    for rows in reversed(collectors):
+        for _ in rows:
+            pass
+
+    for ll, frame in enumerate(frames):
+        ok = np.array_equal(frame, expected[ll])
+        print(f'Layer {ll}:', "STREAM OK" if ok else "*** FAILURE ***")
+        assert ok
+
+    # Windows pull rows only when needed
+    pulled = []
+
+    def source():
+        for r in range(10):
+            pulled.append(r)
+            yield r
+
+    windows = stream.windows(source(), 10, 4, 3, stride=3, dilation=1, pad=1)
+    assert next(windows) == [None, 0, 1] and pulled == [0, 1]
+    assert list(windows) == [[2, 3, 4], [5, 6, 7], [8, 9, None]]
+
+
+if __name__ == '__main__':
+    test_stream()
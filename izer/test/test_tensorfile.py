@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test the indexed tensor container, and saving intermediate data to it.
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import izer.tornadocnn as tc  # noqa: E402 pylint: disable=wrong-import-position
+from izer import op, simulate, state  # noqa: E402 pylint: disable=wrong-import-position
+from izer import tensorfile  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def test_tensorfile():
+    """Main program to test izer.tensorfile."""
+    rng = np.random.default_rng(seed=22)
+    tensors = {
+        'buffer-0': rng.integers(-128, 128, (3, 32, 32), dtype=np.int64).astype(np.int8),
+        'buffer-1': rng.integers(-2**31, 2**31, (64, 7), dtype=np.int64).astype(np.int32),
+        'buffer-2': np.zeros((0, 4), dtype=np.int8),
+        'buffer-3': np.asfortranarray(rng.integers(-2**40, 2**40, (5, 3), dtype=np.int64)),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'run.bin')
+        with tensorfile.Writer(filename) as writer:
+            for i, (name, data) in enumerate(tensors.items()):
+                writer.add(name, data, index=i)
+            try:
+                writer.add('buffer-0', tensors['buffer-0'])
+                assert False, 'Duplicate name was accepted'
+            except ValueError:
+                pass
+
+        # The container can be opened using the data file or the manifest
+        for container in (filename, tensorfile.manifest_filename(filename)):
+            reader = tensorfile.Reader(container)
+            assert reader.names() == list(tensors)
+            assert 'buffer-4' not in reader
+            ok = True
+            for i, (name, data) in enumerate(tensors.items()):
+                saved = reader[name]
+                ok &= saved.dtype == data.dtype and np.array_equal(saved, data)
+                ok &= reader.attrs(name)['index'] == i
+                ok &= reader.attrs(name)['offset'] % 64 == 0
+            del saved  # Release the memory map
+            print("TENSORFILE OK" if ok else "*** FAILURE ***")
+            assert ok
+
+    # Intermediate data of a simulated layer (--log-intermediate)
+    state.debug = True
+    state.output_layer = [False, False]
+    state.layer_name = [None, 'conv1']
+    tc.dev = tc.get_device(85)
+    data = rng.integers(-128, 128, (4, 6, 6), dtype=np.int64)
+    kernel = rng.integers(-128, 128, (8, 4, 3, 3), dtype=np.int64)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'data.bin')
+        with tensorfile.Writer(filename) as datafile:
+            simulate.save_data(datafile, 1, 'input', data)
+            output, _ = simulate.conv2d_layer(1, data.shape, [3, 3], 1, 8, [1, 1], [1, 1],
+                                              [1, 1], op.ACT_RELU, kernel, None, data,
+                                              datafile=datafile)
+            simulate.save_data(datafile, 1, 'output', output)
+
+        reader = tensorfile.Reader(filename)
+        ok = reader.names() == ['layer-1/input', 'layer-1/full-res', 'layer-1/output']
+        ok &= np.array_equal(reader['layer-1/input'], data)
+        ok &= np.array_equal(reader['layer-1/output'], output)
+        ok &= reader['layer-1/full-res'].shape == (8, 6, 6)
+        for name in reader.names():
+            attrs = reader.attrs(name)
+            ok &= attrs['layer'] == 1 and attrs['layer_name'] == 'conv1'
+            ok &= name == f'layer-1/{attrs["stage"]}'
+        print("LOG INTERMEDIATE OK" if ok else "*** FAILURE ***")
+        assert ok
+
+
+if __name__ == '__main__':
+    test_tensorfile()
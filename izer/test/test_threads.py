@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test that multi-threaded convolutions and linear layers match the serial path.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def run_threads(func):
+    """Run `func` serially and with several thread counts, with and without BLAS"""
+    saved = state.sim_threads
+    try:
+        for blas in [False, True]:
+            state.sim_threads = 1
+            expected = func(blas)
+            for threads in [2, 3, 8, 64]:
+                state.sim_threads = threads
+                output = func(blas)
+                print(f'BLAS {blas}, {threads} threads:',
+                      "THREADS OK" if np.array_equal(output, expected) else "*** FAILURE ***")
+                assert np.array_equal(output, expected)
+    finally:
+        state.sim_threads = saved
+
+
+def conv2d(data, weight, out_size, pad, stride, groups, blas):
+    """Run compute.conv2d"""
+    return compute.conv2d(
+        data,
+        weight,
+        None,
+        data.shape,
+        out_size,
+        kernel_size=weight.shape[2:],
+        stride=[stride, stride],
+        pad=[pad, pad],
+        dilation=[1, 1],
+        fractional_stride=[1, 1],
+        output_pad=[0, 0],
+        groups=groups,
+        blas=blas,
+    )
+
+
+def test_threads():
+    """Main program to test state.sim_threads."""
+    state.debug = True
+
+    rng = np.random.default_rng(seed=12)
+    d0 = rng.integers(-128, 128, (16, 20, 24), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (32, 16, 3, 3), dtype=np.int64)
+    w1 = rng.integers(-128, 128, (16, 1, 3, 3), dtype=np.int64)
+    w2 = rng.integers(-128, 128, (12, 4, 1, 1), dtype=np.int64)
+
+    run_threads(lambda blas: conv2d(d0, w0, (32, 20, 24), 1, 1, 1, blas))
+    run_threads(lambda blas: conv2d(d0, w0, (32, 10, 12), 1, 2, 1, blas))
+    run_threads(lambda blas: conv2d(d0, w1, (16, 20, 24), 1, 1, 16, blas))
+    run_threads(lambda blas: conv2d(d0, w2, (12, 20, 24), 0, 1, 4, blas))
+    run_threads(lambda blas: compute.convtranspose2d(
+        d0, w0, None, d0.shape, (32, 40, 48), kernel_size=[3, 3], stride=[1, 1], pad=[1, 1],
+        dilation=[1, 1], fractional_stride=[2, 2], output_pad=[1, 1], groups=1, blas=blas,
+    ))
+
+    d1 = rng.integers(-128, 128, (16, 100), dtype=np.int64)
+    w3 = rng.integers(-128, 128, (24, 16, 5), dtype=np.int64)
+    run_threads(lambda blas: compute.conv1d(
+        d1, w3, None, d1.shape, (24, 96), kernel_size=5, stride=1, pad=0, dilation=1, blas=blas,
+    ))
+
+    d2 = rng.integers(-128, 128, (4, 1024), dtype=np.int64)
+    w4 = rng.integers(-128, 128, (250, 1024), dtype=np.int64)
+    b0 = rng.integers(-128, 128, 250, dtype=np.int64)
+    run_threads(lambda blas: compute.linear(0, d2, w4, b0, 1024, 250, blas=blas))
+
+
+if __name__ == '__main__':
+    test_threads()
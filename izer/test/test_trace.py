@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Test that the binary computation trace renders to the same text as the csv trace.
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Allow test to run outside of pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from izer import compute, state  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def trace(directory, trace_format, data, weight, bias):
+    """Run compute.linear with the computation trace in `trace_format`, return the file name"""
+    state.debug_computation_format = trace_format
+    compute.debug_open(0, directory, trace_format, 'log.txt')
+    output = compute.linear(0, data, weight, bias, weight.shape[1], weight.shape[0])
+    compute.debug_close()
+    return output, os.path.join(directory, trace_format, f'compute-0.{trace_format}')
+
+
+def test_trace():
+    """Main program to test the binary computation trace."""
+    state.debug = True
+    rng = np.random.default_rng(seed=16)
+    d0 = rng.integers(-128, 128, (2, 40), dtype=np.int64)
+    w0 = rng.integers(-128, 128, (30, 40), dtype=np.int64)
+    b0 = rng.integers(-128, 128, 30, dtype=np.int64)
+
+    saved = state.debug_computation, state.debug_computation_format
+    try:
+        state.debug_computation = True
+        with tempfile.TemporaryDirectory() as directory:
+            for trace_format in ['csv', 'npy']:
+                os.makedirs(os.path.join(directory, trace_format))
+            for data, bias in [(d0, b0), (d0[0], None)]:
+                output, csv = trace(directory, 'csv', data, weight=w0, bias=bias)
+                _, npy = trace(directory, 'npy', data, weight=w0, bias=bias)
+
+                with open(csv, encoding='utf-8') as f:
+                    expected = f.read().splitlines()
+                records = np.concatenate(list(compute.load_trace(npy)))
+                lines = list(compute.trace_lines(records))
+                print(f'Trace (bias {bias is not None}):',
+                      "TRACE OK" if lines == expected else "*** FAILURE ***")
+                assert lines == expected
+                assert len(records) == np.size(data) // 40 * 30 * (40 + (bias is not None))
+
+                # The final accumulator of each output is the result
+                last = records[records['in'] == (39 if bias is None else -1)]
+                assert np.array_equal(last['accumulator'], np.reshape(output, -1))
+    finally:
+        state.debug_computation, state.debug_computation_format = saved
+
+
+if __name__ == '__main__':
+    test_trace()
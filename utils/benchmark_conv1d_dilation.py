@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+###################################################################################################
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+###################################################################################################
+"""
+Benchmark dilated Conv1d/Conv2d (strided kernel window) against the previous implementation
+(zero-stretched kernel), using the shapes from test_conv1d_dilation_wide.py.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Allow benchmark to run from the utils directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from izer import compute  # noqa: E402 pylint: disable=wrong-import-position
+
+REPEAT = 5
+
+
+def conv1d_stretched(data, weight, pad, dilation):
+    """Reference: 1D convolution with a zero-stretched kernel (the previous implementation)"""
+    data = np.pad(data, pad_width=((0, 0), (pad, pad)), mode='constant', constant_values=0)
+    nweight = np.zeros((weight.shape[0], weight.shape[1], (weight.shape[2] - 1) * dilation + 1),
+                       dtype=weight.dtype)
+    nweight[:, :, 0::dilation] = weight
+    ll = data.shape[1] - nweight.shape[2] + 1
+    view = as_strided(data,
+                      shape=(ll, data.shape[0], nweight.shape[2]),
+                      strides=(data.strides[1], data.strides[0], data.strides[1]),
+                      writeable=False)
+    return np.tensordot(view, nweight, axes=((1, 2), (1, 2))).transpose(1, 0)
+
+
+def conv2d_stretched(data, weight, pad, dilation):
+    """Reference: 2D convolution with a zero-stretched kernel (the previous implementation)"""
+    data = np.pad(data, pad_width=((0, 0), (pad, pad), (pad, pad)),
+                  mode='constant', constant_values=0)
+    nweight = np.zeros((weight.shape[0], weight.shape[1],
+                        (weight.shape[2] - 1) * dilation + 1,
+                        (weight.shape[3] - 1) * dilation + 1),
+                       dtype=weight.dtype)
+    nweight[:, :, 0::dilation, 0::dilation] = weight
+    h = data.shape[1] - nweight.shape[2] + 1
+    w = data.shape[2] - nweight.shape[3] + 1
+    view = as_strided(data,
+                      shape=(h, w, data.shape[0], nweight.shape[2], nweight.shape[3]),
+                      strides=(data.strides[1], data.strides[2],
+                               data.strides[0], data.strides[1], data.strides[2]),
+                      writeable=False)
+    return np.tensordot(view, nweight, axes=((2, 3, 4), (1, 2, 3))).transpose(2, 0, 1)
+
+
+def bench(name, stmt_old, stmt_new, number):
+    """Time both implementations and print the speedup"""
+    t_old = min(timeit.repeat(stmt_old, number=number, repeat=REPEAT)) / number
+    t_new = min(timeit.repeat(stmt_new, number=number, repeat=REPEAT)) / number
+    print(f'{name:40} stretched {t_old * 1e6:10.1f} us   strided {t_new * 1e6:10.1f} us   '
+          f'speedup {t_old / t_new:5.1f}x')
+
+
+def bench_conv1d(channels, length, out_channels, pad, dilation, number):
+    """Benchmark one Conv1d shape"""
+    rng = np.random.default_rng(0)
+    data = rng.integers(-128, 128, (channels, length), dtype=np.int64)
+    weight = rng.integers(-128, 128, (out_channels, channels, 3), dtype=np.int64)
+    out_len = length + 2 * pad - 2 * dilation
+
+    def new():
+        return compute.conv1d(data, weight, None, data.shape, (out_channels, out_len),
+                              kernel_size=3, stride=1, pad=pad, dilation=dilation)
+
+    assert np.array_equal(new(), conv1d_stretched(data, weight, pad, dilation))
+    bench(f'conv1d {channels}x{length}->{out_channels} d={dilation}',
+          lambda: conv1d_stretched(data, weight, pad, dilation), new, number)
+
+
+def bench_conv2d(channels, dim, out_channels, pad, dilation, number):
+    """Benchmark one Conv2d shape"""
+    rng = np.random.default_rng(0)
+    data = rng.integers(-128, 128, (channels, dim, dim), dtype=np.int64)
+    weight = rng.integers(-128, 128, (out_channels, channels, 3, 3), dtype=np.int64)
+    out_dim = dim + 2 * pad - 2 * dilation
+
+    def new():
+        return compute.conv2d(data, weight, None, data.shape, (out_channels, out_dim, out_dim),
+                              kernel_size=[3, 3], stride=[1, 1], pad=[pad, pad],
+                              dilation=[dilation, dilation], fractional_stride=[1, 1],
+                              output_pad=[0, 0])
+
+    assert np.array_equal(new(), conv2d_stretched(data, weight, pad, dilation))
+    bench(f'conv2d {channels}x{dim}x{dim}->{out_channels} d={dilation}',
+          lambda: conv2d_stretched(data, weight, pad, dilation), new, number)
+
+
+def benchmark_dilation():
+    """Main program to benchmark dilation in compute.conv1d and compute.conv2d."""
+    # Shapes used in test_conv1d_dilation_wide.py (3x16 and 3x33 input, 5x3x3 weights)
+    for dilation in (2, 4):
+        bench_conv1d(3, 16, 5, 1, dilation, 2000)
+    for dilation in (4, 6, 8, 9, 11):
+        bench_conv1d(3, 33, 5, 1, dilation, 2000)
+
+    # The same kernels on realistic (long, wide) inputs
+    for dilation in (2, 4, 8, 11):
+        bench_conv1d(64, 4096, 64, 1, dilation, 5)
+
+    # The folded Conv2d equivalent with a dilated 3x3 kernel
+    for dilation in (2, 4):
+        bench_conv2d(32, 64, 32, 1, dilation, 3)
+
+
+if __name__ == '__main__':
+    benchmark_dilation()
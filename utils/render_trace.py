@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+###################################################################################################
+#
+# Copyright (C) 2024 Maxim Integrated Products, Inc. All Rights Reserved.
+#
+# Maxim Integrated Products, Inc. Default Copyright Notice:
+# https://www.maximintegrated.com/en/aboutus/legal/copyrights.html
+#
+###################################################################################################
+"""
+Render a slice of a binary compute trace (compute-N.npy, created by
+`--debug-computation --debug-computation-format npy`) in the text format of the csv logs
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from izer import compute  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def main():
+    """
+    Print the selected trace records
+    """
+    parser = argparse.ArgumentParser(description="Render a binary compute trace as text")
+    parser.add_argument('trace', help="binary trace file (compute-N.npy)")
+    parser.add_argument('--sample', type=int, help="only show this sample of a batch")
+    parser.add_argument('--out', type=int, nargs=2, metavar=('START', 'STOP'),
+                        help="only show outputs START <= out < STOP")
+    parser.add_argument('--in', dest='inp', type=int, nargs=2, metavar=('START', 'STOP'),
+                        help="only show inputs START <= in < STOP (bias records are always "
+                             "shown)")
+    parser.add_argument('--head', type=int, help="stop after this many lines")
+    args = parser.parse_args()
+
+    remaining = args.head
+    for records in compute.load_trace(args.trace):
+        if args.sample is not None:
+            records = records[records['sample'] == args.sample]
+        if args.out is not None:
+            records = records[(records['out'] >= args.out[0]) & (records['out'] < args.out[1])]
+        if args.inp is not None:
+            records = records[(records['in'] < 0)
+                              | (records['in'] >= args.inp[0]) & (records['in'] < args.inp[1])]
+        if remaining is not None:
+            records = records[:remaining]
+            remaining -= len(records)
+        for line in compute.trace_lines(records):
+            print(line)
+        if remaining == 0:
+            break
+
+
+if __name__ == '__main__':
+    main()